@@ -12,7 +12,7 @@ def calculate_profit(
     purchase_tax: float = 0.1,
     grading_cost: float = 40,
 ) -> float:
-    log.info("Starting profit calculation")
+    log.debug("Starting profit calculation")
 
     log.debug(
         "Inputs: ungraded_price=%.2f expected_value=%.2f "
@@ -35,6 +35,6 @@ def calculate_profit(
         profit,
     )
 
-    log.info("Profit calculated: %.2f", profit)
+    log.debug("Profit calculated: %.2f", profit)
 
     return profit
\ No newline at end of file
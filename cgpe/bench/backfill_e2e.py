@@ -0,0 +1,168 @@
+# cgpe/bench/backfill_e2e.py
+#
+# End-to-end backfill against the local mock origin: throughput, retry
+# overhead and memory, with no traffic to pricecharting.com. The origin
+# runs in its own process so its CPU and memory stay out of the numbers.
+#
+#   python -m cgpe.bench.backfill_e2e --sets 20 --cards-per-set 200 --latency-ms 80 --p429 0.02 --rps 50
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+from pathlib import Path
+from typing import Any, Dict, List
+
+from cgpe.bench.common import format_table, quiet_logs
+from cgpe.bench.mock_origin import add_origin_args, make_self_signed_cert
+from cgpe.config.prescreen import PrescreenConfig
+from cgpe.config.scraper import ScraperConfig
+from cgpe.config.storage import StorageConfig
+from cgpe.config.tracing import TraceConfig
+from cgpe.http.concurrency import CONCURRENCY, AdaptiveConfig
+from cgpe.http.rate_limit import RATE_LIMITER
+from cgpe.logging.logger import init_logging
+from cgpe.metrics.tracing import format_stages, peak_rss_kb
+from cgpe.scrape.sources.base import SourceConfig
+from cgpe.services.backfill_sets import backfill_sets
+from cgpe.storage.run_repo import recent_runs
+from cgpe.storage.sqlite_db import connect_sqlite
+
+_ORIGIN_FLAGS = (
+    "sets", "cards_per_set", "filler_kb", "tail_kb", "pages_dir", "latency_ms", "rtt_ms", "tls_cert", "tls_key",
+    "jitter_ms", "bandwidth_kbps",
+    "p429", "p5xx", "origin_rps", "origin_burst", "retry_after", "seed",
+)
+
+
+def _start_origin(args: argparse.Namespace) -> tuple[subprocess.Popen, str]:
+    cmd = [sys.executable, "-m", "cgpe.bench.mock_origin"]
+    for name in _ORIGIN_FLAGS:
+        value = getattr(args, name)
+        if value is not None:
+            cmd += [f"--{name.replace('_', '-')}", str(value)]
+    proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, text=True)
+    line = proc.stdout.readline().strip()
+    if not line.startswith("READY "):
+        proc.kill()
+        raise SystemExit(f"mock origin failed to start: {line!r}")
+    return proc, line.split(" ", 1)[1]
+
+
+def _get_json(url: str) -> Any:
+    with urllib.request.urlopen(url, timeout=10) as r:
+        return json.loads(r.read())
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="backfill_sets against a local mock origin")
+    add_origin_args(ap)
+    ap.add_argument("--rps", type=float, default=50.0, help="scraper rate limit (RATE_LIMITER.rps)")
+    ap.add_argument("--jitter-s", type=float, default=0.0, help="scraper rate-limit jitter")
+    ap.add_argument("--concurrency", type=int, default=4, help="starting per-host in-flight limit")
+    ap.add_argument("--max-concurrency", type=int, default=50, help="ceiling for the adaptive limit")
+    ap.add_argument("--tls", action="store_true", help="serve the origin over HTTPS (self-signed, trusted via SSL_CERT_FILE)")
+    ap.add_argument("--discover", action="store_true", help="find sets via the category page, not /__sets")
+    ap.add_argument("--prescreen", action="store_true", help="skip cards the set listing rules out (off: fetch all)")
+    ap.add_argument("--trace-sample-every", type=int, default=0, help="cProfile 1 in N detail parses")
+    ap.add_argument("--json", type=Path, default=None, help="also write the report here")
+    ap.add_argument("--verbose", action="store_true", help="keep per-card INFO logs")
+    args = ap.parse_args()
+
+    init_logging()
+    if not args.verbose:
+        quiet_logs()
+
+    RATE_LIMITER.configure(rps=args.rps, jitter_s=args.jitter_s)
+    CONCURRENCY.configure(AdaptiveConfig.from_scraper(
+        ScraperConfig(concurrency=args.concurrency, max_concurrency=args.max_concurrency)
+    ))
+    tls_dir = None
+    if args.tls:
+        tls_dir = tempfile.TemporaryDirectory(prefix="cgpe-e2e-tls-")
+        args.tls_cert, args.tls_key = make_self_signed_cert(Path(tls_dir.name))
+        # read by ssl.create_default_context(), so the scraper's session and urllib trust it
+        os.environ["SSL_CERT_FILE"] = str(args.tls_cert)
+
+    proc, base_url = _start_origin(args)
+    try:
+        set_links: List[str] = _get_json(f"{base_url}/__sets")
+        source = SourceConfig(
+            source="Mock PriceCharting",
+            category_link=f"{base_url}/category/pokemon-cards",
+            base_url=base_url,
+            sets_to_scrape=[] if args.discover else set_links,
+        )
+
+        with tempfile.TemporaryDirectory(prefix="cgpe-e2e-") as tmp:
+            storage = StorageConfig(db_path=os.path.join(tmp, "cgpe.sqlite3"))
+            trace = TraceConfig(
+                sample_every=args.trace_sample_every,
+                cprofile=args.trace_sample_every > 0,
+                profile_dir=os.path.join(tmp, "profiles"),
+                release=os.getenv("CGPE_RELEASE"),
+            )
+
+            rss_before = peak_rss_kb() or 0
+            t0 = time.perf_counter()
+            prescreen = PrescreenConfig(enabled=args.prescreen)
+            asyncio.run(backfill_sets(source, storage=storage, trace=trace, prescreen=prescreen))
+            wall = time.perf_counter() - t0
+
+            conn = connect_sqlite(storage.db_path)
+            try:
+                run = recent_runs(conn, limit=1)[0]
+            finally:
+                conn.close()
+
+        origin = _get_json(f"{base_url}/__stats")
+        limits = CONCURRENCY.snapshot()
+    finally:
+        proc.terminate()
+        proc.wait(timeout=10)
+        if tls_dir is not None:
+            tls_dir.cleanup()
+
+    expected = args.sets * args.cards_per_set
+    report: Dict[str, Any] = {
+        "cards_expected": expected,
+        "cards_queued": run.links,
+        "cards_persisted": run.persisted,
+        "wall_s": wall,
+        "cards_per_s": run.persisted / wall if wall else 0.0,
+        "http_requests": run.http_requests,
+        "http_retries": run.http_retries,
+        "retry_overhead_pct": 100.0 * run.http_retries / max(run.http_requests - run.http_retries, 1),
+        "requests_per_card": run.requests_per_card or 0.0,
+        "kb_per_card": (run.bytes_per_card or 0.0) / 1024,
+        "conn_new": run.stages.get("http_connect", {}).get("items", 0),
+        "conn_reused": run.stages.get("http_conn_reused", {}).get("items", 0),
+        "origin_requests": origin["requests"],
+        "origin_max_in_flight": origin["max_in_flight"],
+        "concurrency_limit_end": max((l["limit"] for l in limits.values()), default=0.0),
+        "origin_by_status": origin["by_status"],
+        "rss_before_mb": rss_before / 1024,
+        "peak_rss_mb": (run.peak_rss_kb or 0) / 1024,
+        "stages": run.stages,
+    }
+
+    print(f"== backfill_sets vs mock origin: {args.sets} sets x {args.cards_per_set} cards, scraper rps={args.rps:g}")
+    summary = {k: v for k, v in report.items() if k not in ("stages", "origin_by_status")}
+    print(format_table([{"metric": k, "value": v} for k, v in summary.items()], ["metric", "value"]))
+    print(f"origin statuses: {origin['by_status']}")
+    print()
+    print(format_stages(run.stages))
+
+    if args.json:
+        args.json.write_text(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+# cgpe/bench/bytes_path.py
+#
+# Per-page cost of the str path (decode the body, then parse) against the
+# bytes path (json.loads / lxml straight from the body) for set JSON pages
+# and card detail pages.
+#
+#   python -m cgpe.bench.bytes_path --pages 100 --filler-kb 200
+
+from __future__ import annotations
+
+import argparse
+import json
+from typing import Any, Callable, Dict, List
+
+from bs4 import BeautifulSoup
+
+from cgpe.bench.common import Timing, format_table, quiet_logs
+from cgpe.bench.mock_origin import MockCatalog
+from cgpe.bench.pages import detail_page_html
+from cgpe.bench.synthetic import synthetic_details
+from cgpe.scrape.pricecharting.detail import parse_detail
+from cgpe.scrape.pricecharting.detail.parse_detail import _PARSE_ONLY, parse_detail_page
+from cgpe.scrape.sources.base import SourceConfig
+
+SOURCE = SourceConfig(source="bench", category_link="", base_url="", sets_to_scrape=[])
+
+
+def _set_json_before(body: bytes) -> List[dict]:
+    text = body.decode("utf-8")
+    return json.loads("[" + text + "]")[0]["products"]
+
+
+def _set_json_after(body: bytes) -> List[dict]:
+    return json.loads(body)["products"]
+
+
+def _detail_before(body: bytes, link: str) -> Any:
+    # the previous parse: whole page through BeautifulSoup from a decoded str
+    real = parse_detail.section_soup
+    parse_detail.section_soup = lambda html, encoding="utf-8": BeautifulSoup(html, "lxml", parse_only=_PARSE_ONLY)
+    try:
+        return parse_detail_page(body.decode("utf-8"), link, SOURCE)
+    finally:
+        parse_detail.section_soup = real
+
+
+def _detail_after(body: bytes, link: str) -> Any:
+    return parse_detail_page(body, link, SOURCE)
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="str vs bytes fetch-to-parse path")
+    ap.add_argument("--pages", type=int, default=100)
+    ap.add_argument("--filler-kb", type=int, default=200)
+    ap.add_argument("--rounds", type=int, default=3)
+    args = ap.parse_args()
+    quiet_logs()
+
+    # one full 50-product cursor page per detail page
+    catalog = MockCatalog(sets=1, cards_per_set=50 * args.pages, filler_kb=0)
+    slug = catalog.set_slugs[0]
+    set_bodies = [
+        json.dumps({"cursor": c, "products": catalog.set_products(slug, c)}).encode()
+        for c in range(0, 50 * args.pages, 50)
+    ]
+    details = synthetic_details(args.pages, seed=11)
+    detail_bodies = [
+        (d.card_link, detail_page_html(d, filler_kb=args.filler_kb, seed=i).encode())
+        for i, d in enumerate(details)
+    ]
+
+    cases: List[tuple[str, int, Callable[[], object]]] = [
+        ("set json: decode + wrap + loads", len(set_bodies), lambda: [_set_json_before(b) for b in set_bodies]),
+        ("set json: loads(bytes)", len(set_bodies), lambda: [_set_json_after(b) for b in set_bodies]),
+        ("detail: decode + soup(page)", len(detail_bodies), lambda: [_detail_before(b, l) for l, b in detail_bodies]),
+        ("detail: lxml(bytes) + soup(sections)", len(detail_bodies), lambda: [_detail_after(b, l) for l, b in detail_bodies]),
+    ]
+
+    results: List[Dict[str, Any]] = []
+    for name, n, fn in cases:
+        t = Timing(name)
+        for _ in range(args.rounds):
+            t.time(fn, items=n)
+        best_ms = 1000.0 * min(t.samples_s) / n
+        results.append({"path": name, "pages": n, "ms_per_page": best_ms})
+
+    avg_kb = sum(len(b) for _, b in detail_bodies) / len(detail_bodies) / 1024
+    print(f"== fetch-to-parse per page ({args.pages} detail pages of ~{avg_kb:.0f} KB, best of {args.rounds})")
+    print(format_table(results, ["path", "pages", "ms_per_page"]))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+# cgpe/bench/common.py
+
+from __future__ import annotations
+
+import logging
+import time
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List
+
+
+def quiet_logs(level: int = logging.WARNING) -> None:
+    """Hot paths log per item at INFO; keep that out of the numbers."""
+    for name in list(logging.root.manager.loggerDict):
+        if name.startswith("cgpe") or name == "__main__":
+            logging.getLogger(name).setLevel(level)
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    if not sorted_values:
+        return 0.0
+    k = (len(sorted_values) - 1) * pct / 100.0
+    lo = int(k)
+    hi = min(lo + 1, len(sorted_values) - 1)
+    return sorted_values[lo] + (sorted_values[hi] - sorted_values[lo]) * (k - lo)
+
+
+@dataclass
+class Timing:
+    name: str
+    samples_s: List[float] = field(default_factory=list)
+    items: int = 0
+
+    def time(self, fn: Callable[[], object], items: int = 1) -> object:
+        t0 = time.perf_counter()
+        out = fn()
+        self.samples_s.append(time.perf_counter() - t0)
+        self.items += items
+        return out
+
+    def summary(self) -> Dict[str, float]:
+        s = sorted(self.samples_s)
+        total = sum(s)
+        return {
+            "ops": len(s),
+            "p50_ms": percentile(s, 50) * 1000,
+            "p95_ms": percentile(s, 95) * 1000,
+            "p99_ms": percentile(s, 99) * 1000,
+            "items_per_s": self.items / total if total else 0.0,
+        }
+
+
+def format_table(rows: List[Dict[str, object]], columns: List[str]) -> str:
+    def fmt(v: object) -> str:
+        return f"{v:,.2f}" if isinstance(v, float) else str(v)
+
+    cells = [[fmt(r.get(c, "")) for c in columns] for r in rows]
+    widths = [max(len(c), *(len(row[i]) for row in cells)) for i, c in enumerate(columns)]
+    lines = ["  ".join(c.rjust(w) for c, w in zip(columns, widths))]
+    lines.append("  ".join("-" * w for w in widths))
+    lines += ["  ".join(v.rjust(w) for v, w in zip(row, widths)) for row in cells]
+    return "\n".join(lines)
@@ -0,0 +1,124 @@
+# cgpe/bench/log_pipeline.py
+#
+# Scraper parse throughput (parse_detail_page + EV/profit) under different
+# logging setups, at INFO and DEBUG.
+#
+#   python -m cgpe.bench.log_pipeline --cards 300
+
+from __future__ import annotations
+
+import argparse
+import logging
+import os
+import tempfile
+import time
+from logging.handlers import RotatingFileHandler
+from pathlib import Path
+from typing import Any, Callable, Dict, List
+
+from cgpe.bench.common import format_table
+from cgpe.bench.pages import detail_page_html
+from cgpe.bench.synthetic import synthetic_details
+from cgpe.logging.logger import (
+    BASE_FMT,
+    ROOT_LOGGER,
+    ColorFormatter,
+    init_logging,
+    shutdown_logging,
+)
+from cgpe.scrape.pricecharting.detail.parse_detail import parse_detail_page
+from cgpe.scrape.sources.base import SourceConfig
+
+SOURCE = SourceConfig(
+    source="Synthetic PriceCharting",
+    category_link="https://www.pricecharting.com/category/pokemon-cards",
+    base_url="https://www.pricecharting.com",
+    sets_to_scrape=[],
+)
+
+
+def _reset() -> None:
+    shutdown_logging()
+    root = logging.getLogger(ROOT_LOGGER)
+    for h in list(root.handlers):
+        root.removeHandler(h)
+        h.close()
+
+
+def _sync_handlers(level: int, log_file: Path, devnull) -> None:
+    """The previous setup: console + file handler written on the caller's thread."""
+    root = logging.getLogger(ROOT_LOGGER)
+    console = logging.StreamHandler(devnull)
+    console.setFormatter(ColorFormatter(BASE_FMT))
+    file_handler = RotatingFileHandler(log_file, maxBytes=5_000_000, backupCount=3, encoding="utf-8")
+    file_handler.setFormatter(logging.Formatter(BASE_FMT))
+    root.addHandler(console)
+    root.addHandler(file_handler)
+    root.setLevel(level)
+    root.propagate = False
+
+
+def _count_lines(log_file: Path) -> int:
+    return sum(
+        sum(1 for _ in p.open(encoding="utf-8"))
+        for p in log_file.parent.glob(log_file.name + "*")
+    )
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="logging pipeline throughput benchmark")
+    ap.add_argument("--cards", type=int, default=300)
+    ap.add_argument("--rounds", type=int, default=3)
+    ap.add_argument("--filler-kb", type=int, default=0, help="page padding; real pages are ~200 KB (parse then dominates)")
+    args = ap.parse_args()
+
+    pages = [
+        (d.card_link, detail_page_html(d, filler_kb=args.filler_kb, seed=i))
+        for i, d in enumerate(synthetic_details(args.cards, seed=7))
+    ]
+
+    results: List[Dict[str, Any]] = []
+    devnull = open(os.devnull, "w")
+
+    with tempfile.TemporaryDirectory(prefix="cgpe-logbench-") as tmp:
+        setups: Dict[str, Callable[[int, Path], None]] = {
+            "sync handlers": lambda lvl, f: _sync_handlers(lvl, f, devnull),
+            "queue": lambda lvl, f: init_logging(lvl, rate_limit=0, stream=devnull, log_file=f),
+            "queue + rate limit": lambda lvl, f: init_logging(lvl, rate_limit=10, stream=devnull, log_file=f),
+            "queue json + rate limit": lambda lvl, f: init_logging(lvl, fmt="json", rate_limit=10, stream=devnull, log_file=f),
+        }
+
+        for level in (logging.INFO, logging.DEBUG):
+            for name, setup in setups.items():
+                log_file = Path(tmp) / f"{name.replace(' ', '_')}_{level}.log"
+                _reset()
+                setup(level, log_file)
+
+                best = float("inf")
+                for _ in range(args.rounds):
+                    t0 = time.perf_counter()
+                    for link, html in pages:
+                        parse_detail_page(html, link, SOURCE)
+                    best = min(best, time.perf_counter() - t0)
+
+                # queue modes: time to drain what the callers enqueued
+                t0 = time.perf_counter()
+                shutdown_logging()
+                drain = time.perf_counter() - t0
+
+                results.append({
+                    "level": logging.getLevelName(level),
+                    "setup": name,
+                    "cards_per_s": args.cards / best,
+                    "ms_per_card": 1000.0 * best / args.cards,
+                    "drain_s": drain,
+                    "lines": _count_lines(log_file),
+                })
+
+    _reset()
+    print(f"== parse_detail_page x {args.cards} cards (best of {args.rounds})")
+    print(format_table(results, ["level", "setup", "cards_per_s", "ms_per_card", "drain_s", "lines"]))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+# cgpe/bench/metrics.py
+#
+# Per-observation cost of the metrics registry, next to a bare loop and an
+# unlocked attribute add for scale.
+#
+#   python -m cgpe.bench.metrics --n 1000000
+
+from __future__ import annotations
+
+import argparse
+import time
+from typing import Any, Callable, Dict, List
+
+from cgpe.bench.common import format_table
+from cgpe.metrics.registry import Registry
+
+
+class _Bare:
+    __slots__ = ("value",)
+
+    def __init__(self) -> None:
+        self.value = 0.0
+
+    def inc(self) -> None:
+        self.value += 1.0
+
+
+def _timed(child) -> None:
+    with child.time():
+        pass
+
+
+def _ns_per_op(fn: Callable[[], None], n: int) -> float:
+    t0 = time.perf_counter()
+    for _ in range(n):
+        fn()
+    return (time.perf_counter() - t0) / n * 1e9
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="metrics registry overhead")
+    ap.add_argument("--n", type=int, default=1_000_000)
+    args = ap.parse_args()
+
+    reg = Registry()
+    counter = reg.counter("bench_total", "bench", ("route",))
+    hist = reg.histogram("bench_seconds", "bench", ("route",))
+    gauge = reg.gauge("bench_gauge", "bench")
+    c_child, h_child = counter.labels("/api/card"), hist.labels("/api/card")
+    bare = _Bare()
+
+    cases: Dict[str, Callable[[], None]] = {
+        "empty call": lambda: None,
+        "unlocked attr add": bare.inc,
+        "counter child inc": c_child.inc,
+        "counter labels().inc": lambda: counter.labels("/api/card").inc(),
+        "gauge inc": gauge.inc,
+        "histogram child observe": lambda: h_child.observe(0.003),
+        "histogram child time()": lambda: _timed(h_child),
+    }
+
+    rows: List[Dict[str, Any]] = [{"op": name, "ns_per_op": _ns_per_op(fn, args.n)} for name, fn in cases.items()]
+    for _ in range(200):
+        counter.labels(f"/route/{_}").inc()
+    t0 = time.perf_counter()
+    body = reg.render()
+    rows.append({"op": "render (203 series)", "ns_per_op": (time.perf_counter() - t0) * 1e9})
+
+    print(f"== {args.n:,} ops each ({len(body):,} byte exposition)")
+    print(format_table(rows, ["op", "ns_per_op"]))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,413 @@
+# cgpe/bench/mock_origin.py
+#
+# Local stand-in for pricecharting.com: category page, set JSON cursor pages
+# and card detail pages in the shapes cgpe/scrape/pricecharting parses, with
+# injectable latency, bandwidth limits, 429/5xx errors and Retry-After.
+# Optionally served over TLS behind a proxy that adds network round-trip time,
+# so connection setup (TCP + TLS handshake) costs what it does on the internet.
+#
+#   python -m cgpe.bench.mock_origin --sets 20 --cards-per-set 200 --latency-ms 80 --p429 0.02
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import hashlib
+import json
+import random
+import ssl
+import subprocess
+import time
+from collections import Counter
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from aiohttp import web
+
+from cgpe.bench.pages import detail_page_html
+from cgpe.bench.synthetic import SET_SLUGS, synthetic_detail
+from cgpe.models.detail import Detail
+
+SET_PAGE_SIZE = 50  # fetch_set_json_pages advances the cursor by 50
+
+
+@dataclass
+class OriginFaults:
+    # per-response delay before the first byte: latency_ms +- jitter_ms
+    latency_ms: float = 0.0
+    jitter_ms: float = 0.0
+    # body write throttle in KiB/s (0 = unthrottled)
+    bandwidth_kbps: float = 0.0
+    # random error injection, per request
+    p429: float = 0.0
+    p5xx: float = 0.0
+    # origin-side rate limit: beyond this many req/s a request gets 429 (0 = off)
+    origin_rps: float = 0.0
+    origin_burst: int = 10
+    # Retry-After on 429/503 responses: seconds, or None to omit the header
+    retry_after: Optional[float] = 1.0
+
+
+@dataclass
+class OriginStats:
+    requests: int = 0
+    bytes_sent: int = 0
+    in_flight: int = 0
+    max_in_flight: int = 0
+    by_status: Counter = field(default_factory=Counter)
+    by_kind: Counter = field(default_factory=Counter)
+
+
+class MockCatalog:
+    """Deterministic sets and cards; detail pages are rendered on request."""
+
+    def __init__(self, *, sets: int, cards_per_set: int, seed: int = 0, filler_kb: int = 200, tail_kb: int = 0) -> None:
+        self.filler_kb = filler_kb
+        self.tail_kb = tail_kb
+        self.set_slugs: List[str] = [f"pokemon-{SET_SLUGS[i % len(SET_SLUGS)]}-{i}" for i in range(sets)]
+        self.cards: Dict[str, List[Detail]] = {}
+        self.by_path: Dict[str, Detail] = {}
+        self._seeds: Dict[str, int] = {}
+
+        rng = random.Random(seed)
+        n = 0
+        for slug in self.set_slugs:
+            cards = []
+            for _ in range(cards_per_set):
+                d = synthetic_detail(n, rng, source="Mock PriceCharting")
+                card_slug = f"{d.card_name.replace(' ', '-')}-{n}"
+                path = f"/game/{slug}/{card_slug}"
+                d.card_link = path
+                d.set_link = f"/console/{slug}"
+                cards.append(d)
+                self.by_path[path] = d
+                self._seeds[path] = n
+                n += 1
+            self.cards[slug] = cards
+
+    def set_products(self, slug: str, cursor: int) -> List[dict]:
+        out = []
+        for d in self.cards.get(slug, [])[cursor:cursor + SET_PAGE_SIZE]:
+            graded = d.graded_prices_by_grade or {}
+            out.append({
+                "id": self._seeds[d.card_link],
+                "productName": f"{d.card_name.title()} #{d.card_num}",
+                "productUri": d.card_link.rsplit("/", 1)[-1],
+                "consoleUri": slug,
+                # the card set table's columns: Ungraded, Grade 9, PSA 10
+                "price1": _money(d.ungraded_price),
+                "price2": _money(graded.get("grade 9")),
+                "price3": _money(graded.get("psa 10")),
+            })
+        return out
+
+    def detail_html(self, path: str, base_url: str) -> Optional[str]:
+        d = self.by_path.get(path)
+        if d is None:
+            return None
+        page = Detail(**{**asdict(d), "set_link": base_url + d.set_link})
+        return detail_page_html(page, filler_kb=self.filler_kb, tail_kb=self.tail_kb, seed=self._seeds[path])
+
+    def category_html(self) -> str:
+        items = "".join(f'<li><a href="/console/{s}">{s.replace("-", " ").title()}</a></li>' for s in self.set_slugs)
+        return f'<html><body><div class="home-box all"><ul>{items}</ul></div></body></html>'
+
+
+def _money(p: Optional[float]) -> str:
+    return f"${p:,.2f}" if p is not None else ""
+
+
+class MockOrigin:
+    def __init__(self, catalog: MockCatalog, faults: OriginFaults, *, pages_dir: Optional[Path] = None, seed: int = 0) -> None:
+        self.catalog = catalog
+        self.faults = faults
+        self.stats = OriginStats()
+        self.rng = random.Random(seed)
+        self.base_url = ""
+        # recorded detail pages (real HTML saved from the site), served by card path hash
+        self.recorded: List[str] = (
+            [p.read_text(encoding="utf-8") for p in sorted(pages_dir.glob("*.html"))] if pages_dir else []
+        )
+        self._tokens = float(faults.origin_burst)
+        self._refill_at = time.monotonic()
+
+    # ---- fault injection ----
+
+    def _over_rate(self) -> bool:
+        rps = self.faults.origin_rps
+        if rps <= 0:
+            return False
+        now = time.monotonic()
+        self._tokens = min(float(self.faults.origin_burst), self._tokens + (now - self._refill_at) * rps)
+        self._refill_at = now
+        if self._tokens < 1.0:
+            return True
+        self._tokens -= 1.0
+        return False
+
+    def _error_response(self) -> Optional[web.Response]:
+        headers = {}
+        if self.faults.retry_after is not None:
+            headers["Retry-After"] = f"{self.faults.retry_after:g}"
+        if self._over_rate() or self.rng.random() < self.faults.p429:
+            return web.Response(status=429, text="Too Many Requests", headers=headers)
+        if self.rng.random() < self.faults.p5xx:
+            status = self.rng.choice((500, 502, 503, 504))
+            return web.Response(status=status, text="upstream error", headers=headers if status == 503 else {})
+        return None
+
+    async def _delay(self) -> None:
+        f = self.faults
+        if f.latency_ms or f.jitter_ms:
+            ms = max(0.0, f.latency_ms + self.rng.uniform(-f.jitter_ms, f.jitter_ms))
+            await asyncio.sleep(ms / 1000.0)
+
+    async def _send(self, request: web.Request, body: bytes, content_type: str) -> web.StreamResponse:
+        resp = web.StreamResponse(headers={"Content-Type": content_type})
+        resp.content_length = len(body)
+        await resp.prepare(request)
+        kbps = self.faults.bandwidth_kbps
+        if kbps > 0:
+            chunk = 16 * 1024
+            for i in range(0, len(body), chunk):
+                part = body[i:i + chunk]
+                await resp.write(part)
+                await asyncio.sleep(len(part) / (kbps * 1024))
+        else:
+            await resp.write(body)
+        await resp.write_eof()
+        self.stats.bytes_sent += len(body)
+        return resp
+
+    @web.middleware
+    async def middleware(self, request: web.Request, handler) -> web.StreamResponse:
+        if request.path.startswith("/__"):
+            return await handler(request)
+
+        s = self.stats
+        s.requests += 1
+        s.in_flight += 1
+        s.max_in_flight = max(s.max_in_flight, s.in_flight)
+        try:
+            await self._delay()
+            resp = self._error_response() or await handler(request)
+        finally:
+            s.in_flight -= 1
+        s.by_status[resp.status] += 1
+        return resp
+
+    # ---- routes ----
+
+    async def category(self, request: web.Request) -> web.StreamResponse:
+        self.stats.by_kind["category"] += 1
+        return await self._send(request, self.catalog.category_html().encode(), "text/html; charset=utf-8")
+
+    async def set_json(self, request: web.Request) -> web.StreamResponse:
+        self.stats.by_kind["set_json"] += 1
+        slug = request.match_info["slug"]
+        if slug not in self.catalog.cards:
+            raise web.HTTPNotFound()
+        if request.query.get("format") != "json":
+            body = f'<html><body><div id="console-header"><h1>{slug}</h1></div></body></html>'
+            return await self._send(request, body.encode(), "text/html; charset=utf-8")
+
+        cursor = int(request.query.get("cursor", 0))
+        body = json.dumps({"cursor": cursor, "products": self.catalog.set_products(slug, cursor)})
+        return await self._send(request, body.encode(), "application/json")
+
+    async def detail(self, request: web.Request) -> web.StreamResponse:
+        self.stats.by_kind["detail"] += 1
+        path = request.path
+        if self.recorded and path in self.catalog.by_path:
+            i = int(hashlib.md5(path.encode()).hexdigest(), 16) % len(self.recorded)
+            html = self.recorded[i]
+        else:
+            html = self.catalog.detail_html(path, self.base_url)
+        if html is None:
+            raise web.HTTPNotFound()
+        return await self._send(request, html.encode(), "text/html; charset=utf-8")
+
+    async def stats_endpoint(self, request: web.Request) -> web.Response:
+        s = self.stats
+        return web.json_response({
+            "requests": s.requests,
+            "bytes_sent": s.bytes_sent,
+            "max_in_flight": s.max_in_flight,
+            "by_status": {str(k): v for k, v in s.by_status.items()},
+            "by_kind": dict(s.by_kind),
+        })
+
+    async def sets_endpoint(self, request: web.Request) -> web.Response:
+        return web.json_response([f"{self.base_url}/console/{s}" for s in self.catalog.set_slugs])
+
+    def app(self) -> web.Application:
+        app = web.Application(middlewares=[self.middleware])
+        app.router.add_get("/category/pokemon-cards", self.category)
+        app.router.add_get("/console/{slug}", self.set_json)
+        app.router.add_get("/game/{slug}/{card}", self.detail)
+        app.router.add_get("/__stats", self.stats_endpoint)
+        app.router.add_get("/__sets", self.sets_endpoint)
+        return app
+
+
+def make_self_signed_cert(directory: Path, host: str = "127.0.0.1") -> tuple[Path, Path]:
+    """(cert, key) for `host`, via the openssl CLI; clients trust it through SSL_CERT_FILE."""
+    cert, key = directory / "origin.crt", directory / "origin.key"
+    subprocess.run(
+        [
+            "openssl", "req", "-x509", "-newkey", "rsa:2048", "-nodes", "-days", "2",
+            "-keyout", str(key), "-out", str(cert), "-subj", f"/CN={host}",
+            "-addext", f"subjectAltName=IP:{host}",
+        ],
+        check=True, capture_output=True,
+    )
+    return cert, key
+
+
+class DelayProxy:
+    """
+    TCP proxy adding `rtt_ms` of round-trip time: every chunk is delivered
+    rtt/2 after it was read, in order, and a new connection waits one extra
+    RTT before anything flows (the TCP handshake loopback doesn't pay).
+    """
+
+    def __init__(self, upstream: tuple[str, int], rtt_ms: float) -> None:
+        self.upstream = upstream
+        self.one_way_s = rtt_ms / 2000.0
+        self.connections = 0
+
+    async def _pump(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        loop = asyncio.get_running_loop()
+        queue: asyncio.Queue = asyncio.Queue()
+
+        async def deliver() -> None:
+            while True:
+                due, data = await queue.get()
+                delay = due - loop.time()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                if not data:
+                    break
+                writer.write(data)
+                await writer.drain()
+
+        sender = asyncio.create_task(deliver())
+        try:
+            while True:
+                data = await reader.read(64 * 1024)
+                queue.put_nowait((loop.time() + self.one_way_s, data))
+                if not data:
+                    break
+            await sender
+        except (ConnectionError, asyncio.CancelledError):
+            sender.cancel()
+        finally:
+            writer.close()
+
+    async def _handle(self, client_r: asyncio.StreamReader, client_w: asyncio.StreamWriter) -> None:
+        self.connections += 1
+        await asyncio.sleep(2 * self.one_way_s)
+        try:
+            up_r, up_w = await asyncio.open_connection(*self.upstream)
+        except OSError:
+            client_w.close()
+            return
+        await asyncio.gather(self._pump(client_r, up_w), self._pump(up_r, client_w), return_exceptions=True)
+
+    async def start(self, host: str, port: int) -> asyncio.AbstractServer:
+        return await asyncio.start_server(self._handle, host, port)
+
+
+async def serve(
+    origin: MockOrigin,
+    host: str,
+    port: int,
+    *,
+    tls: Optional[tuple[Path, Path]] = None,
+    rtt_ms: float = 0.0,
+) -> tuple[web.AppRunner, Optional[asyncio.AbstractServer]]:
+    ssl_ctx = None
+    if tls is not None:
+        ssl_ctx = ssl.create_default_context(ssl.Purpose.CLIENT_AUTH)
+        ssl_ctx.load_cert_chain(*tls)
+
+    runner = web.AppRunner(origin.app(), access_log=None)
+    await runner.setup()
+    site = web.TCPSite(runner, host, 0 if rtt_ms > 0 else port, ssl_context=ssl_ctx)
+    await site.start()
+    actual_port = runner.addresses[0][1]
+
+    proxy = None
+    if rtt_ms > 0:
+        # clients talk to the proxy; TLS passes through it end to end
+        proxy = await DelayProxy((host, actual_port), rtt_ms).start(host, port)
+        actual_port = proxy.sockets[0].getsockname()[1]
+
+    origin.base_url = f"{'https' if tls else 'http'}://{host}:{actual_port}"
+    return runner, proxy
+
+
+def add_origin_args(ap: argparse.ArgumentParser) -> None:
+    ap.add_argument("--sets", type=int, default=10)
+    ap.add_argument("--cards-per-set", type=int, default=100)
+    ap.add_argument("--filler-kb", type=int, default=200, help="padding per detail page (real pages are ~200 KB)")
+    ap.add_argument("--tail-kb", type=int, default=0, help="footer after the data sections")
+    ap.add_argument("--pages-dir", type=Path, default=None, help="serve recorded detail HTML from this dir instead")
+    ap.add_argument("--latency-ms", type=float, default=0.0, help="server think time per response")
+    ap.add_argument("--rtt-ms", type=float, default=0.0, help="network round trip added by a proxy (handshakes pay it too)")
+    ap.add_argument("--tls-cert", type=Path, default=None, help="serve HTTPS with this cert (and --tls-key)")
+    ap.add_argument("--tls-key", type=Path, default=None)
+    ap.add_argument("--jitter-ms", type=float, default=0.0)
+    ap.add_argument("--bandwidth-kbps", type=float, default=0.0)
+    ap.add_argument("--p429", type=float, default=0.0)
+    ap.add_argument("--p5xx", type=float, default=0.0)
+    ap.add_argument("--origin-rps", type=float, default=0.0, help="answer 429 above this request rate")
+    ap.add_argument("--origin-burst", type=int, default=10)
+    ap.add_argument("--retry-after", type=float, default=1.0, help="Retry-After seconds (negative = omit header)")
+    ap.add_argument("--seed", type=int, default=0)
+
+
+def origin_from_args(args: argparse.Namespace) -> MockOrigin:
+    faults = OriginFaults(
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        bandwidth_kbps=args.bandwidth_kbps,
+        p429=args.p429,
+        p5xx=args.p5xx,
+        origin_rps=args.origin_rps,
+        origin_burst=args.origin_burst,
+        retry_after=args.retry_after if args.retry_after >= 0 else None,
+    )
+    catalog = MockCatalog(sets=args.sets, cards_per_set=args.cards_per_set, seed=args.seed, filler_kb=args.filler_kb, tail_kb=args.tail_kb)
+    return MockOrigin(catalog, faults, pages_dir=args.pages_dir, seed=args.seed)
+
+
+async def _main(args: argparse.Namespace) -> None:
+    origin = origin_from_args(args)
+    tls = (args.tls_cert, args.tls_key) if args.tls_cert else None
+    runner, proxy = await serve(origin, args.host, args.port, tls=tls, rtt_ms=args.rtt_ms)
+    # the harness waits for this line
+    print(f"READY {origin.base_url}", flush=True)
+    try:
+        await asyncio.Event().wait()
+    finally:
+        if proxy is not None:
+            proxy.close()
+        await runner.cleanup()
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="Mock PriceCharting origin for offline load tests")
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=0, help="0 = pick a free port")
+    add_origin_args(ap)
+    args = ap.parse_args()
+    try:
+        asyncio.run(_main(args))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
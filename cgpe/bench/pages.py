@@ -0,0 +1,73 @@
+# cgpe/bench/pages.py
+#
+# PriceCharting-shaped HTML for synthetic details, close enough to the real
+# markup that parse_detail_page() reads every field back.
+
+from __future__ import annotations
+
+import json
+import random
+from html import escape
+from typing import Optional
+
+from cgpe.models.detail import Detail
+
+# real detail pages carry ~250 KB of nav, scripts and ads around the data
+_FILLER_ROW = '<li class="nav-item"><a href="/category/pokemon-cards">Pokemon Cards</a> <span class="count">1,234</span></li>\n'
+
+
+def _money(p: Optional[float]) -> str:
+    return f"${p:,.2f}" if p is not None else "-"
+
+
+def _sales_table(cls: str, dist: tuple[Optional[float], Optional[float]], rng: random.Random) -> str:
+    mean, std = dist
+    rows = ["<tr><th>Date</th><th>Title</th><th>Seller</th><th>Price</th></tr>"]
+    if mean is not None:
+        for _ in range(rng.randint(3, 12)):
+            p = max(0.5, rng.gauss(mean, std or 0.0))
+            rows.append(f'<tr><td>2026-01-01</td><td>listing</td><td>seller</td><td><span class="js-price">{_money(p)}</span></td></tr>')
+    return f'<div class="{cls}"><table>{"".join(rows)}</table></div>'
+
+
+def detail_page_html(d: Detail, *, filler_kb: int = 200, tail_kb: int = 0, seed: int = 0) -> str:
+    """`filler_kb` of nav before the data sections, `tail_kb` of footer after them."""
+    rng = random.Random(seed)
+    graded = d.graded_prices_by_grade or {}
+
+    price_rows = [f"<tr><td>Ungraded</td><td>{_money(d.ungraded_price)}</td></tr>"]
+    for g in range(1, 10):
+        price_rows.append(f"<tr><td>Grade {g}</td><td>{_money(graded.get(f'grade {g}'))}</td></tr>")
+    price_rows.append(f"<tr><td>PSA 10</td><td>{_money(graded.get('psa 10'))}</td></tr>")
+
+    variant = f" [{escape(d.variant.title())}]" if d.variant else ""
+    set_name = (d.set_link or "").rsplit("/", 1)[-1].replace("-", " ").title()
+    filler = _FILLER_ROW * max(0, filler_kb * 1024 // len(_FILLER_ROW))
+    tail = _FILLER_ROW * max(0, tail_kb * 1024 // len(_FILLER_ROW))
+
+    return f"""<!DOCTYPE html>
+<html><head><title>{escape(d.card_name)} Prices</title></head>
+<body>
+<ul class="nav">
+{filler}</ul>
+<h1 id="product_name">{escape(d.card_name.title())} #{escape(d.card_num)}{variant} <a href="{d.set_link or ''}">{escape(set_name)}</a></h1>
+<div id="product_details"><div class="cover"><img src="{d.card_img_link or ''}" alt=""/></div></div>
+<div id="full-prices"><table>{"".join(price_rows)}</table></div>
+<div id="price_comparison"><div class="tab-frame">
+{_sales_table("completed-auctions-cib", d.grade7_dist, rng)}
+{_sales_table("completed-auctions-new", d.grade8_dist, rng)}
+{_sales_table("completed-auctions-graded", d.grade9_dist, rng)}
+{_sales_table("completed-auctions-manual-only", d.grade10_dist, rng)}
+</div></div>
+<div id="full_details">
+<h2>{escape(d.card_name.title())} #{escape(d.card_num)} Details</h2>
+<table><tr><td class="title">Card Number</td><td class="details" itemprop="model-number">{escape(d.card_num)}</td></tr></table>
+<p>TCGPlayer ID: <a id="js-tcg-id-link" href="#">{d.tcg_id or ''}</a></p>
+</div>
+<script>
+VGPC.pop_data = {json.dumps(d.pop or {})};
+</script>
+<ul class="footer">
+{tail}</ul>
+</body></html>
+"""
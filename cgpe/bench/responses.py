@@ -0,0 +1,74 @@
+# cgpe/bench/responses.py
+#
+# Encode time and bytes-on-the-wire for API payloads.
+#
+#   python -m cgpe.bench.responses --rows 500
+
+from __future__ import annotations
+
+import argparse
+import gzip
+from typing import Any, Callable, Dict, List
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+from cgpe.bench.common import Timing, format_table
+from cgpe.bench.synthetic import synthetic_details
+from cgpe.web import responses
+from cgpe.web.responses import dumps_json, to_columnar
+
+
+def _profit_payload(n: int) -> Dict[str, Any]:
+    rows = []
+    for i, d in enumerate(synthetic_details(n, seed=1)):
+        rows.append({"id": i + 1, **d.to_db_row()})
+    return {"count": len(rows), "scanned": n * 100, "rows": rows}
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="JSON encode + compression benchmark")
+    ap.add_argument("--rows", type=int, default=500)
+    ap.add_argument("--repeat", type=int, default=50)
+    args = ap.parse_args()
+
+    payload = _profit_payload(args.rows)
+    columnar = to_columnar(payload)
+
+    encoders: Dict[str, Callable[[], bytes]] = {
+        "fastapi default (jsonable_encoder)": lambda: JSONResponse(jsonable_encoder(payload)).body,
+        f"dumps_json ({'orjson' if responses.orjson else 'stdlib'})": lambda: dumps_json(payload),
+        "dumps_json shape=columns": lambda: dumps_json(to_columnar(payload)),
+    }
+
+    results: List[Dict[str, Any]] = []
+    for name, fn in encoders.items():
+        t = Timing(name)
+        for _ in range(args.repeat):
+            body = t.time(fn)
+        results.append({"encoder": name, **t.summary(), "bytes": len(body)})
+
+    print(f"== encode /api/profit payload ({args.rows} rows)")
+    print(format_table(results, ["encoder", "p50_ms", "p95_ms", "bytes"]))
+
+    wire: List[Dict[str, Any]] = []
+    for shape, body in (("rows", dumps_json(payload)), ("columns", dumps_json(columnar))):
+        codecs: Dict[str, Callable[[], bytes]] = {
+            "identity": lambda: body,
+            "gzip-6": lambda: gzip.compress(body, compresslevel=6, mtime=0),
+        }
+        if responses.brotli is not None:
+            codecs["br-5"] = lambda: responses.compress(body, "br")
+
+        for codec, fn in codecs.items():
+            t = Timing(codec)
+            for _ in range(max(1, args.repeat // 5)):
+                out = t.time(fn)
+            wire.append({"shape": shape, "coding": codec, "p50_ms": t.summary()["p50_ms"], "bytes": len(out)})
+
+    print("\n== bytes over the wire")
+    print(format_table(wire, ["shape", "coding", "p50_ms", "bytes"]))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,171 @@
+# cgpe/bench/storage.py
+#
+# Storage + API benchmark over a synthetic catalog.
+#
+#   python -m cgpe.bench.storage --scales 100000,1000000,5000000 --json bench.json
+
+from __future__ import annotations
+
+import argparse
+import itertools
+import json
+import random
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, List
+
+from cgpe.bench.common import Timing, format_table, quiet_logs
+from cgpe.bench.synthetic import CARD_NAMES, synthetic_details
+from cgpe.config.storage import StorageConfig
+from cgpe.storage.detail_repo import get_detail_by_link, upsert_detail, upsert_details
+from cgpe.storage.migrations import migrate
+from cgpe.storage.queries.web_search import search_card_details
+from cgpe.storage.sqlite_db import connect_sqlite
+from cgpe.web.services.profit_board import iter_all_details, top_by_profit
+
+INSERT_CHUNK = 50_000
+
+
+def _db_size(path: Path) -> int:
+    return sum(p.stat().st_size for p in path.parent.glob(path.name + "*"))
+
+
+def _queries(rng: random.Random, n: int) -> List[str]:
+    out = []
+    for _ in range(n):
+        name = rng.choice(CARD_NAMES)
+        kind = rng.random()
+        if kind < 0.4:
+            out.append(name)
+        elif kind < 0.8:
+            out.append(f"{name} {rng.randint(1, 200)}/{rng.randint(60, 250)}")
+        else:
+            out.append(f"#{rng.randint(1, 200)}")
+    return out
+
+
+def bench_scale(
+    scale: int,
+    workdir: Path,
+    *,
+    lookups: int,
+    searches: int,
+    profit_runs: int,
+    api_calls: int,
+    seed: int,
+) -> List[Dict[str, Any]]:
+    rng = random.Random(seed)
+    db_path = workdir / f"bench_{scale}.sqlite3"
+    conn = connect_sqlite(db_path)
+    migrate(conn)
+
+    results: List[Dict[str, Any]] = []
+
+    def add(t: Timing, **extra: Any) -> None:
+        results.append({"scale": scale, "op": t.name, **t.summary(), **extra})
+
+    # ---- bulk insert ----
+    bulk = Timing("bulk_insert(50k/txn)")
+    details = synthetic_details(scale, seed=seed)
+    while True:
+        chunk = list(itertools.islice(details, INSERT_CHUNK))
+        if not chunk:
+            break
+        bulk.time(lambda: upsert_details(conn, chunk), items=len(chunk))
+    add(bulk)
+
+    links = [r[0] for r in conn.execute("SELECT card_link FROM card_details ORDER BY RANDOM() LIMIT ?;", (lookups,))]
+
+    # ---- single-row upserts (commit per row, like the scraper) ----
+    single = Timing("upsert_detail")
+    for d in synthetic_details(min(lookups, 1000), seed=seed + 1, start=scale):
+        single.time(lambda: upsert_detail(conn, d))
+    add(single)
+
+    lookup = Timing("get_detail_by_link")
+    for link in links:
+        lookup.time(lambda: get_detail_by_link(conn, card_link=link))
+    add(lookup)
+
+    search = Timing("search_card_details")
+    for q in _queries(rng, searches):
+        search.time(lambda: search_card_details(conn=conn, q=q))
+    add(search)
+
+    board = Timing("iter_all_details+top_by_profit")
+    for _ in range(profit_runs):
+        def run_board():
+            scanned, it = iter_all_details(conn)
+            return top_by_profit(it, limit=100)
+        board.time(run_board, items=scale)
+    add(board)
+
+    conn.close()
+
+    # ---- API through an in-process client ----
+    if api_calls:
+        from fastapi.testclient import TestClient
+        import cgpe.web.app as web
+
+        web.configure(StorageConfig(db_path=str(db_path)))
+        with TestClient(web.app) as client:
+            api = {
+                "GET /api/card": lambda: client.get("/api/card", params={"link": rng.choice(links)}),
+                "GET /api/search": lambda: client.get("/api/search", params={"q": _queries(rng, 1)[0]}),
+            }
+            for name, call in api.items():
+                t = Timing(name)
+                for _ in range(api_calls):
+                    t.time(call)
+                add(t)
+
+            t = Timing("GET /api/profit")
+            for _ in range(profit_runs):
+                t.time(lambda: client.get("/api/profit", params={"limit": 100}))
+            add(t)
+
+    size = _db_size(db_path)
+    for r in results:
+        r["db_mb"] = size / 1e6
+    return results
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="card_details storage/API benchmark")
+    ap.add_argument("--scales", default="100000,1000000", help="comma separated row counts")
+    ap.add_argument("--lookups", type=int, default=2000)
+    ap.add_argument("--searches", type=int, default=200)
+    ap.add_argument("--profit-runs", type=int, default=3)
+    ap.add_argument("--api-calls", type=int, default=200, help="0 skips the API section")
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--workdir", help="keep the generated DBs here (default: temp dir)")
+    ap.add_argument("--json", help="also write raw results to this file")
+    args = ap.parse_args()
+
+    quiet_logs()
+
+    scales = [int(s) for s in args.scales.split(",") if s]
+    all_rows: List[Dict[str, Any]] = []
+
+    with tempfile.TemporaryDirectory(prefix="cgpe-bench-") as tmp:
+        workdir = Path(args.workdir or tmp)
+        workdir.mkdir(parents=True, exist_ok=True)
+
+        for scale in scales:
+            t0 = time.perf_counter()
+            rows = bench_scale(
+                scale, workdir,
+                lookups=args.lookups, searches=args.searches,
+                profit_runs=args.profit_runs, api_calls=args.api_calls, seed=args.seed,
+            )
+            all_rows.extend(rows)
+            print(f"\n== {scale:,} rows ({time.perf_counter() - t0:.1f}s, db {rows[0]['db_mb']:.1f} MB)")
+            print(format_table(rows, ["op", "ops", "p50_ms", "p95_ms", "p99_ms", "items_per_s"]))
+
+    if args.json:
+        Path(args.json).write_text(json.dumps(all_rows, indent=2))
+
+
+if __name__ == "__main__":
+    main()
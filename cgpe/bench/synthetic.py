@@ -0,0 +1,82 @@
+# cgpe/bench/synthetic.py
+#
+# Realistic-looking synthetic catalog rows for storage / API benchmarks.
+
+from __future__ import annotations
+
+import random
+from typing import Iterator, Optional
+
+from cgpe.models.detail import Detail
+
+# base card names; benchmarks draw search terms from these
+CARD_NAMES = (
+    "pikachu", "charizard", "blastoise", "venusaur", "mewtwo", "mew", "gengar", "eevee",
+    "umbreon", "espeon", "lugia", "ho-oh", "rayquaza", "gyarados", "dragonite", "snorlax",
+    "jigglypuff", "lucario", "greninja", "sylveon", "tyranitar", "zapdos", "moltres", "articuno",
+    "alakazam", "machamp", "arcanine", "ninetales", "lapras", "vaporeon", "jolteon", "flareon",
+)
+_SUFFIXES = ("", "", "", " ex", " gx", " v", " vmax", " vstar", " holo", " delta species")
+_VARIANTS = (None, None, None, "reverse holo", "1st edition", "shadowless", "staff", "prerelease")
+# set slugs as they appear in PriceCharting URLs
+SET_SLUGS = (
+    "base-set", "jungle", "fossil", "team-rocket", "neo-genesis", "evolving-skies",
+    "brilliant-stars", "crown-zenith", "obsidian-flames", "151", "paldea-evolved", "celebrations",
+)
+
+
+def synthetic_detail(i: int, rng: random.Random, *, source: str = "Synthetic PriceCharting") -> Detail:
+    set_slug = rng.choice(SET_SLUGS)
+    set_size = rng.randint(60, 250)
+    num = rng.randint(1, set_size)
+    name = rng.choice(CARD_NAMES) + rng.choice(_SUFFIXES)
+
+    # long-tailed ungraded price; graded prices scale with it
+    ungraded = round(rng.lognormvariate(1.0, 1.4), 2)
+    grade_prices = [round(ungraded * (0.6 + 0.35 * g) * rng.uniform(0.8, 1.2), 2) for g in range(1, 10)]
+    psa10 = round(grade_prices[-1] * rng.uniform(1.5, 6.0), 2)
+
+    graded: dict[str, Optional[float]] = {"ungraded": ungraded}
+    for g, p in enumerate(grade_prices, start=1):
+        graded[f"grade {g}"] = p if rng.random() > 0.1 else None
+    graded["psa 10"] = psa10
+
+    # population skews toward 8-10
+    psa = [rng.randint(0, 40) for _ in range(6)] + [rng.randint(5, 400) for _ in range(3)] + [rng.randint(0, 300)]
+    pop = {"psa": psa, "cgc": [rng.randint(0, 50) for _ in range(10)]}
+
+    def dist(p: float) -> tuple[Optional[float], Optional[float]]:
+        if rng.random() < 0.2:
+            return (None, None)
+        return (round(p * rng.uniform(0.9, 1.1), 2), round(p * rng.uniform(0.02, 0.3), 2))
+
+    ev = sum(n * (p or 0) for n, p in zip(psa, [*grade_prices, psa10])) / max(sum(psa), 1)
+    profit = ev * 0.85 - (ungraded * 1.1 + 40)
+
+    return Detail(
+        card_link=f"https://www.pricecharting.com/game/pokemon-{set_slug}/{name.replace(' ', '-')}-{num}-{i}",
+        source=source,
+        tcg_id=str(100000 + i),
+        set_link=f"https://www.pricecharting.com/console/pokemon-{set_slug}",
+        variant=rng.choice(_VARIANTS),
+        card_name=name,
+        card_num=f"{num}/{set_size}" if rng.random() < 0.8 else f"SV{num:03d}",
+        card_img_link=f"https://storage.googleapis.com/images.pricecharting.com/{i:x}/240.jpg",
+        ungraded_price=ungraded,
+        graded_prices_by_grade=graded,
+        grades_1_to_10=[graded.get(f"grade {g}") for g in range(1, 10)] + [psa10],
+        grade7_dist=dist(grade_prices[6]),
+        grade8_dist=dist(grade_prices[7]),
+        grade9_dist=dist(grade_prices[8]),
+        grade10_dist=dist(psa10),
+        pop=pop,
+        expected_value=round(ev, 4),
+        expected_profit=round(profit, 4),
+        scraped_at=f"2026-{rng.randint(1, 9):02d}-{rng.randint(1, 28):02d}T{rng.randint(0, 23):02d}:00:00+00:00",
+    )
+
+
+def synthetic_details(n: int, *, seed: int = 0, start: int = 0, source: str = "Synthetic PriceCharting") -> Iterator[Detail]:
+    rng = random.Random(seed)
+    for i in range(start, start + n):
+        yield synthetic_detail(i, rng, source=source)
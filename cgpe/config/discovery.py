@@ -0,0 +1,25 @@
+# cgpe/config/discovery.py
+
+import os
+from dataclasses import dataclass
+
+from cgpe.config.env import load_env
+
+
+@dataclass
+class DiscoveryConfig:
+    # category pages are re-crawled at most this often; runs in between read
+    # the stored discovered_sets instead of fetching the index
+    recrawl_interval_hours: float = 24.0
+    # a crawl listing fewer sets is treated as a failed parse (markup change,
+    # error page) and not merged, so it can't mark the whole catalog removed
+    min_sets: int = 1
+
+    @classmethod
+    def from_env(cls) -> "DiscoveryConfig":
+        load_env()
+        defaults = cls()
+        return cls(
+            recrawl_interval_hours=float(os.getenv("CGPE_DISCOVERY_RECRAWL_HOURS", defaults.recrawl_interval_hours)),
+            min_sets=int(os.getenv("CGPE_DISCOVERY_MIN_SETS", defaults.min_sets)),
+        )
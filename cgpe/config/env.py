@@ -0,0 +1,14 @@
+# cgpe/config/env.py
+
+_loaded = False
+
+
+def load_env() -> None:
+    """Load `.env` into os.environ once per process (python-dotenv imported on first use)."""
+    global _loaded
+    if _loaded:
+        return
+    _loaded = True
+
+    from dotenv import load_dotenv
+    load_dotenv()
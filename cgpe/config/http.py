@@ -0,0 +1,93 @@
+# cgpe/config/http.py
+
+import os
+from dataclasses import dataclass
+from typing import Optional
+
+from cgpe.config.env import load_env
+from cgpe.config.storage import env_flag
+
+
+@dataclass
+class HttpConfig:
+    # connection pool: total sockets and sockets per origin host
+    limit: int = 200
+    limit_per_host: int = 50
+
+    # idle keep-alive sockets are closed after this long; longer than the gap
+    # between rate-limited requests so the pool is not torn down mid-run
+    keepalive_timeout_seconds: float = 60.0
+
+    # resolved addresses are cached for this long (aiohttp's default is 10s)
+    dns_cache_ttl_seconds: int = 600
+
+    # RFC 8305: head start of the first address before the next one is tried
+    # (None = connect to addresses one at a time)
+    happy_eyeballs_delay_seconds: Optional[float] = 0.25
+
+    # close sockets to servers that never finish the TLS shutdown
+    cleanup_closed: bool = False
+
+    @classmethod
+    def from_env(cls) -> "HttpConfig":
+        load_env()
+        defaults = cls()
+        eyeballs = os.getenv("CGPE_HTTP_HAPPY_EYEBALLS_DELAY_SECONDS")
+        return cls(
+            limit=int(os.getenv("CGPE_HTTP_LIMIT", defaults.limit)),
+            limit_per_host=int(os.getenv("CGPE_HTTP_LIMIT_PER_HOST", defaults.limit_per_host)),
+            keepalive_timeout_seconds=float(
+                os.getenv("CGPE_HTTP_KEEPALIVE_TIMEOUT_SECONDS", defaults.keepalive_timeout_seconds)
+            ),
+            dns_cache_ttl_seconds=int(os.getenv("CGPE_HTTP_DNS_CACHE_TTL_SECONDS", defaults.dns_cache_ttl_seconds)),
+            happy_eyeballs_delay_seconds=(
+                defaults.happy_eyeballs_delay_seconds if eyeballs is None
+                else (float(eyeballs) if eyeballs.strip() else None)
+            ),
+            cleanup_closed=env_flag("CGPE_HTTP_CLEANUP_CLOSED", defaults.cleanup_closed),
+        )
+
+
+@dataclass
+class ResilienceConfig:
+    # retries allowed per successful request, across all fetches to a host
+    retry_budget_ratio: float = 0.2
+    # ...plus this many retries/s regardless, so a quiet host can still retry
+    retry_budget_min_per_second: float = 1.0
+    # retry tokens banked at most (and at start)
+    retry_budget_max_tokens: float = 20.0
+
+    # trip when this share of the last `breaker_window` attempts failed
+    breaker_failure_ratio: float = 0.5
+    breaker_window: int = 20
+    breaker_min_requests: int = 10
+    # first cool-down; doubles each time a half-open probe fails
+    breaker_open_seconds: float = 15.0
+    breaker_max_open_seconds: float = 300.0
+    # while open: park requests until the host recovers (True) or fail them at once
+    breaker_park: bool = True
+    # parked requests give up after this long
+    breaker_max_park_seconds: float = 900.0
+
+    @classmethod
+    def from_env(cls) -> "ResilienceConfig":
+        load_env()
+        defaults = cls()
+        return cls(
+            retry_budget_ratio=float(os.getenv("CGPE_RETRY_BUDGET_RATIO", defaults.retry_budget_ratio)),
+            retry_budget_min_per_second=float(
+                os.getenv("CGPE_RETRY_BUDGET_MIN_PER_SECOND", defaults.retry_budget_min_per_second)
+            ),
+            retry_budget_max_tokens=float(os.getenv("CGPE_RETRY_BUDGET_MAX_TOKENS", defaults.retry_budget_max_tokens)),
+            breaker_failure_ratio=float(os.getenv("CGPE_BREAKER_FAILURE_RATIO", defaults.breaker_failure_ratio)),
+            breaker_window=int(os.getenv("CGPE_BREAKER_WINDOW", defaults.breaker_window)),
+            breaker_min_requests=int(os.getenv("CGPE_BREAKER_MIN_REQUESTS", defaults.breaker_min_requests)),
+            breaker_open_seconds=float(os.getenv("CGPE_BREAKER_OPEN_SECONDS", defaults.breaker_open_seconds)),
+            breaker_max_open_seconds=float(
+                os.getenv("CGPE_BREAKER_MAX_OPEN_SECONDS", defaults.breaker_max_open_seconds)
+            ),
+            breaker_park=env_flag("CGPE_BREAKER_PARK", defaults.breaker_park),
+            breaker_max_park_seconds=float(
+                os.getenv("CGPE_BREAKER_MAX_PARK_SECONDS", defaults.breaker_max_park_seconds)
+            ),
+        )
@@ -0,0 +1,31 @@
+# cgpe/config/metrics.py
+
+import os
+from dataclasses import dataclass
+from typing import Optional
+
+from cgpe.config.env import load_env
+
+
+@dataclass
+class MetricsConfig:
+    # batch runs: serve /metrics on this port while running (0 = off)
+    port: int = 0
+    addr: str = "127.0.0.1"
+
+    # batch runs: rewrite this file (node_exporter textfile format) periodically and at exit
+    textfile: Optional[str] = None
+    textfile_interval_seconds: float = 15.0
+
+    @classmethod
+    def from_env(cls) -> "MetricsConfig":
+        load_env()
+        defaults = cls()
+        return cls(
+            port=int(os.getenv("CGPE_METRICS_PORT", defaults.port)),
+            addr=os.getenv("CGPE_METRICS_ADDR", defaults.addr),
+            textfile=os.getenv("CGPE_METRICS_TEXTFILE") or defaults.textfile,
+            textfile_interval_seconds=float(
+                os.getenv("CGPE_METRICS_TEXTFILE_INTERVAL_SECONDS", defaults.textfile_interval_seconds)
+            ),
+        )
@@ -0,0 +1,37 @@
+# cgpe/config/prescreen.py
+
+import os
+from dataclasses import dataclass
+
+from cgpe.config.env import load_env
+from cgpe.config.storage import env_flag
+
+
+@dataclass
+class PrescreenConfig:
+    # skip detail fetches for cards whose set-listing prices rule out a profit
+    enabled: bool = True
+    # slack for stale listing prices: the best graded price is scaled up and
+    # the ungraded price down by this fraction before bounding the profit
+    margin: float = 0.25
+    # a card passes when its profit upper bound reaches this
+    min_profit: float = 0.0
+    # screened-out cards are still fetched once their stored row (or, never
+    # fetched, their first set listing) is this old, so every listed card
+    # gets a full sweep on this period
+    sweep_interval_hours: float = 168.0
+    # diff set listings against the stored catalog and only queue cards that
+    # are new or whose listing moved (plus the sweep)
+    diff_sets: bool = True
+
+    @classmethod
+    def from_env(cls) -> "PrescreenConfig":
+        load_env()
+        defaults = cls()
+        return cls(
+            enabled=env_flag("CGPE_PRESCREEN", defaults.enabled),
+            margin=float(os.getenv("CGPE_PRESCREEN_MARGIN", defaults.margin)),
+            min_profit=float(os.getenv("CGPE_PRESCREEN_MIN_PROFIT", defaults.min_profit)),
+            sweep_interval_hours=float(os.getenv("CGPE_PRESCREEN_SWEEP_HOURS", defaults.sweep_interval_hours)),
+            diff_sets=env_flag("CGPE_DIFF_SETS", defaults.diff_sets),
+        )
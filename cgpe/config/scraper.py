@@ -1,9 +1,35 @@
+import os
 from dataclasses import dataclass
 
+from cgpe.config.env import load_env
+from cgpe.config.storage import env_flag
+
 @dataclass
 class ScraperConfig:
+    # starting in-flight requests per host; the adaptive limiter moves it within [min, max]
     concurrency: int = 4
+    min_concurrency: int = 1
+    max_concurrency: int = 50
     timeout_seconds: int = 30
     max_retries: int = 3
     header_pool_size: int = 6
-    max_cursor: int = 1000
\ No newline at end of file
+    max_cursor: int = 1000
+    # detail pages: stop reading once the sections the parser uses have arrived.
+    # Off by default: an early stop closes the keep-alive connection, and the
+    # next fetch pays a TCP + TLS handshake that usually costs more than the
+    # unread tail (see cgpe.bench.backfill_e2e --tls --rtt-ms)
+    stream_detail_pages: bool = False
+    # ... and only when at least this much of the body would be left unread
+    stream_min_skip_kb: int = 256
+
+    @classmethod
+    def from_env(cls) -> "ScraperConfig":
+        load_env()
+        defaults = cls()
+        return cls(
+            concurrency=int(os.getenv("CGPE_CONCURRENCY", defaults.concurrency)),
+            min_concurrency=int(os.getenv("CGPE_MIN_CONCURRENCY", defaults.min_concurrency)),
+            max_concurrency=int(os.getenv("CGPE_MAX_CONCURRENCY", defaults.max_concurrency)),
+            stream_detail_pages=env_flag("CGPE_STREAM_DETAIL_PAGES", defaults.stream_detail_pages),
+            stream_min_skip_kb=int(os.getenv("CGPE_STREAM_MIN_SKIP_KB", defaults.stream_min_skip_kb)),
+        )
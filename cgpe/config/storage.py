@@ -0,0 +1,50 @@
+# cgpe/config/storage.py
+
+import os
+from dataclasses import dataclass
+
+from cgpe.config.env import load_env
+
+
+def env_flag(name: str, default: bool = False) -> bool:
+    load_env()
+    value = os.getenv(name)
+    if value is None:
+        return default
+    return value.strip().lower() in ("1", "true", "yes", "on")
+
+
+@dataclass
+class StorageConfig:
+    db_path: str = "data/cgpe.sqlite3"
+
+    # web tier reads a published, read-only copy instead of the working DB
+    read_from_snapshot: bool = False
+    # scraper publishes a snapshot every N persisted details (0 = only at end of run)
+    snapshot_every: int = 0
+    snapshot_mmap_bytes: int = 256 * 1024 * 1024
+
+    # one DB file per source under shard_dir; reads federate them via ATTACH
+    sharded: bool = False
+    shard_dir: str = "data/shards"
+
+    # card_changes rows older than this are pruned at the end of a scrape run
+    change_retention_hours: float = 24.0
+
+    # keep raw detail pages here for offline re-parses (None = don't archive)
+    archive_dir: str | None = None
+
+    @classmethod
+    def from_env(cls) -> "StorageConfig":
+        load_env()
+        defaults = cls()
+        return cls(
+            db_path=os.getenv("CGPE_DB_PATH", defaults.db_path),
+            read_from_snapshot=env_flag("CGPE_READ_SNAPSHOT", defaults.read_from_snapshot),
+            snapshot_every=int(os.getenv("CGPE_SNAPSHOT_EVERY", defaults.snapshot_every)),
+            snapshot_mmap_bytes=int(os.getenv("CGPE_SNAPSHOT_MMAP_BYTES", defaults.snapshot_mmap_bytes)),
+            sharded=env_flag("CGPE_SHARDED", defaults.sharded),
+            shard_dir=os.getenv("CGPE_SHARD_DIR", defaults.shard_dir),
+            change_retention_hours=float(os.getenv("CGPE_CHANGE_RETENTION_HOURS", defaults.change_retention_hours)),
+            archive_dir=os.getenv("CGPE_ARCHIVE_DIR") or defaults.archive_dir,
+        )
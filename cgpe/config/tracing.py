@@ -0,0 +1,32 @@
+# cgpe/config/tracing.py
+
+import os
+from dataclasses import dataclass
+from typing import Optional
+
+from cgpe.config.env import load_env
+from cgpe.config.storage import env_flag
+
+
+@dataclass
+class TraceConfig:
+    # profile 1 in N items of the sampled stages (0 = stage timings only)
+    sample_every: int = 0
+    cprofile: bool = False
+    tracemalloc: bool = False
+    # merged cProfile stats per run land here as run_<id>.prof
+    profile_dir: str = "data/profiles"
+    # free-form build label stored on each scrape_runs row (git sha, tag, ...)
+    release: Optional[str] = None
+
+    @classmethod
+    def from_env(cls) -> "TraceConfig":
+        load_env()
+        defaults = cls()
+        return cls(
+            sample_every=int(os.getenv("CGPE_TRACE_SAMPLE_EVERY", defaults.sample_every)),
+            cprofile=env_flag("CGPE_TRACE_CPROFILE", defaults.cprofile),
+            tracemalloc=env_flag("CGPE_TRACE_TRACEMALLOC", defaults.tracemalloc),
+            profile_dir=os.getenv("CGPE_TRACE_PROFILE_DIR", defaults.profile_dir),
+            release=os.getenv("CGPE_RELEASE") or defaults.release,
+        )
@@ -0,0 +1,42 @@
+# cgpe/config/web.py
+
+import os
+from dataclasses import dataclass
+from typing import Optional
+
+from cgpe.config.env import load_env
+
+
+@dataclass
+class WebConfig:
+    # in-process JSON response cache (invalidated on any DB change)
+    response_cache_bytes: int = 64 * 1024 * 1024
+    response_cache_entries: int = 10_000
+
+    # max card links per POST /api/cards body, and per GET (`?link=` repeated;
+    # ~100-byte links keep 50 under the 8 KB URL limit of common proxies)
+    batch_max_links: int = 500
+    batch_max_get_links: int = 50
+
+    # /api/profit/stream: card_changes poll interval, per-client buffer, top-K cap
+    change_poll_seconds: float = 0.5
+    sse_queue_size: int = 256
+    sse_max_top_k: int = 100
+
+    # bearer token for /admin/*; unset = the admin routes are not served
+    admin_token: Optional[str] = None
+
+    @classmethod
+    def from_env(cls) -> "WebConfig":
+        load_env()
+        defaults = cls()
+        return cls(
+            response_cache_bytes=int(os.getenv("CGPE_RESPONSE_CACHE_BYTES", defaults.response_cache_bytes)),
+            response_cache_entries=int(os.getenv("CGPE_RESPONSE_CACHE_ENTRIES", defaults.response_cache_entries)),
+            batch_max_links=int(os.getenv("CGPE_BATCH_MAX_LINKS", defaults.batch_max_links)),
+            batch_max_get_links=int(os.getenv("CGPE_BATCH_MAX_GET_LINKS", defaults.batch_max_get_links)),
+            change_poll_seconds=float(os.getenv("CGPE_CHANGE_POLL_SECONDS", defaults.change_poll_seconds)),
+            sse_queue_size=int(os.getenv("CGPE_SSE_QUEUE_SIZE", defaults.sse_queue_size)),
+            sse_max_top_k=int(os.getenv("CGPE_SSE_MAX_TOP_K", defaults.sse_max_top_k)),
+            admin_token=os.getenv("CGPE_ADMIN_TOKEN") or defaults.admin_token,
+        )
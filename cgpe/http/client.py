@@ -2,13 +2,20 @@
 
 import asyncio
 import random
-from typing import Awaitable, TypeVar, Dict, Any, Literal
+import time
+from typing import Any, Awaitable, Callable, Dict, Literal, NamedTuple, Optional, TypeVar
+from urllib.parse import urlsplit
 
 import aiohttp
 
+from cgpe.http.concurrency import CONCURRENCY, AdaptiveLimiter, Outcome
 from cgpe.http.headers import build_headers
 from cgpe.http.rate_limit import RATE_LIMITER, backoff_seconds
+from cgpe.http.resilience import HOST_GUARDS, CircuitOpenError, RetryBudgetExceeded
+from cgpe.http.stream import BodyScanner
 from cgpe.logging.logger import setup_logger
+from cgpe.metrics.registry import REGISTRY
+from cgpe.metrics.tracing import record
 
 log = setup_logger(__name__)
 
@@ -16,9 +23,47 @@ T = TypeVar("T")
 
 _RETRYABLE_STATUSES = {429, 500, 502, 503, 504}
 
+# streamed reads are scanned in chunks of this size (one worker-thread hop each)
+_STREAM_CHUNK_BYTES = 64 * 1024
 
-async def _backoff(attempt: int, resp: aiohttp.ClientResponse) -> None:
-    retry_after = resp.headers.get("Retry-After")
+HTTP_REQUESTS = REGISTRY.counter(
+    "cgpe_http_requests_total", "HTTP responses received, per attempt", ("host", "method", "status"),
+)
+HTTP_SECONDS = REGISTRY.histogram(
+    "cgpe_http_request_seconds", "Send to body read (or to headers for retried statuses), per attempt", ("host", "method"),
+)
+HTTP_RETRIES = REGISTRY.counter(
+    "cgpe_http_retries_total", "Attempts that were retried", ("host", "reason"),
+)
+HTTP_FAILURES = REGISTRY.counter(
+    "cgpe_http_failures_total", "Fetches that gave up", ("host", "reason"),
+)
+HTTP_RESPONSE_BYTES = REGISTRY.counter(
+    "cgpe_http_response_bytes_total", "Response body bytes read (after content decoding)", ("host",),
+)
+HTTP_STREAM_STOPS = REGISTRY.counter(
+    "cgpe_http_stream_early_stops_total", "Streamed fetches that stopped before the end of the body", ("host",),
+)
+HTTP_STREAM_SKIPPED = REGISTRY.counter(
+    "cgpe_http_stream_skipped_bytes_total", "Body bytes left unread by early stops (when Content-Length is known)", ("host",),
+)
+HTTP_IN_FLIGHT = REGISTRY.gauge("cgpe_http_in_flight", "Requests sent and not yet finished")
+
+
+class _Response(NamedTuple):
+    status: Optional[int]  # None = timed out
+    reason: str
+    retry_after: Optional[str]
+    body: bytes
+    charset: Optional[str] = None
+
+    def text(self) -> str:
+        # no charset header: utf-8 rather than aiohttp's content sniffing
+        return self.body.decode(self.charset or "utf-8", errors="replace")
+
+
+async def _backoff(attempt: int, r: _Response, url: str) -> None:
+    retry_after = r.retry_after
     if retry_after:
         try:
             wait_s = float(retry_after)
@@ -29,16 +74,120 @@ async def _backoff(attempt: int, resp: aiohttp.ClientResponse) -> None:
 
     wait_s += random.uniform(0.0, 0.5)
 
-    reason = resp.reason or "Unknown"
-    log.warning("HTTP %d %s for %s; backing off %.2fs (attempt=%d)", resp.status, reason, str(resp.url), wait_s, attempt)
+    reason = r.reason or "Unknown"
+    log.warning("HTTP %d %s for %s; backing off %.2fs (attempt=%d)", r.status, reason, url, wait_s, attempt)
 
     try:
         await asyncio.sleep(wait_s)
     except asyncio.CancelledError:
-        log.debug("Backoff sleep cancelled for %s", str(resp.url))
+        log.debug("Backoff sleep cancelled for %s", url)
         raise
 
 
+async def _read_until(
+    resp: aiohttp.ClientResponse,
+    scanner: BodyScanner,
+    host: str,
+    min_skip_bytes: int,
+) -> bytes:
+    """
+    Read the body in chunks until `scanner` has what it needs. Stopping early
+    closes the connection (HTTP/1.1 cannot abandon a body and keep the
+    socket), and the next request to the host pays a new TCP + TLS handshake,
+    so it only happens when at least `min_skip_bytes` would be left unread;
+    bodies of unknown length are always read to the end. The scanner parses,
+    so it runs on a worker thread, not the event loop.
+    """
+    plain_length = None if resp.headers.get("Content-Encoding") else resp.content_length
+    if plain_length is None or plain_length < min_skip_bytes:
+        return await resp.read()
+
+    chunks = []
+    read = 0
+    async for chunk in resp.content.iter_chunked(_STREAM_CHUNK_BYTES):
+        chunks.append(chunk)
+        read += len(chunk)
+        if plain_length - read < min_skip_bytes:
+            # too little left to be worth a reconnect
+            chunks.append(await resp.content.read())
+            break
+        if await asyncio.to_thread(scanner.feed, chunk):
+            HTTP_STREAM_STOPS.labels(host).inc()
+            HTTP_STREAM_SKIPPED.labels(host).inc(plain_length - read)
+            record("http_stream_skipped", items=1, nbytes=plain_length - read)
+            break
+    return b"".join(chunks)
+
+
+async def _send(
+    session: aiohttp.ClientSession,
+    method: str,
+    url: str,
+    kwargs: Dict[str, Any],
+    limiter: AdaptiveLimiter,
+    seconds,
+    stop_when: Optional[Callable[[], BodyScanner]] = None,
+    min_skip_bytes: int = 0,
+) -> _Response:
+    """
+    One attempt. Holds a concurrency slot for the host from the rate-limit
+    wait to the end of the body read, and reports the outcome to the limiter
+    on the way out; backoff sleeps happen after the slot is released.
+    """
+    host = limiter.host
+    t_wait = time.perf_counter()
+    in_flight = await limiter.acquire()
+    record("concurrency_wait", wall_s=time.perf_counter() - t_wait, items=1)
+
+    outcome: Outcome = "dropped"
+    rtt: Optional[float] = None
+    try:
+        await RATE_LIMITER.wait()
+        t0 = time.perf_counter()
+        HTTP_IN_FLIGHT.inc()
+        try:
+            async with session.request(method, url, **kwargs) as resp:
+                HTTP_REQUESTS.labels(host, method, str(resp.status)).inc()
+                if resp.status in _RETRYABLE_STATUSES:
+                    elapsed = time.perf_counter() - t0
+                    seconds.observe(elapsed)
+                    record("http", wall_s=elapsed, items=1)
+                    outcome = "throttled" if resp.status == 429 else "error"
+                    return _Response(resp.status, resp.reason or "", resp.headers.get("Retry-After"), b"")
+
+                try:
+                    resp.raise_for_status()
+                except aiohttp.ClientResponseError:
+                    # a prompt 4xx says nothing about load: keep it as a latency sample
+                    rtt = time.perf_counter() - t0
+                    outcome = "ok"
+                    record("http", wall_s=rtt, items=1)
+                    raise
+                if stop_when is None:
+                    body = await resp.read()
+                else:
+                    body = await _read_until(resp, stop_when(), host, min_skip_bytes)
+                rtt = time.perf_counter() - t0
+                outcome = "ok"
+                seconds.observe(rtt)
+                record("http", wall_s=rtt, items=1, nbytes=len(body))
+                return _Response(resp.status, resp.reason or "", None, body, resp.charset)
+        except asyncio.TimeoutError:
+            HTTP_REQUESTS.labels(host, method, "timeout").inc()
+            record("http", wall_s=time.perf_counter() - t0, items=1)
+            outcome = "timeout"
+            return _Response(None, "timeout", None, b"")
+        except (aiohttp.ClientResponseError, asyncio.CancelledError):
+            raise
+        except Exception:
+            outcome = "error"
+            raise
+        finally:
+            HTTP_IN_FLIGHT.dec()
+    finally:
+        limiter.release(in_flight=in_flight, rtt_s=rtt, outcome=outcome)
+
+
 async def _fetch(
     session: aiohttp.ClientSession,
     method: Literal["GET", "POST"],
@@ -48,8 +197,15 @@ async def _fetch(
     *,
     timeout_s: int = 30,
     retries: int = 6,
-) -> str:
-    """Core fetch logic shared by fetch_html and fetch_json_post."""
+    stop_when: Optional[Callable[[], BodyScanner]] = None,
+    min_skip_bytes: int = 256 * 1024,
+) -> _Response:
+    """
+    Core fetch logic shared by fetch_bytes, fetch_html and fetch_post. With
+    `stop_when`, each attempt streams the body into a fresh scanner and
+    returns only what was read by the time it reported done, provided that
+    leaves at least `min_skip_bytes` unread (see _read_until).
+    """
     timeout = aiohttp.ClientTimeout(total=timeout_s)
     headers = headers or {}
 
@@ -60,52 +216,102 @@ async def _fetch(
     if method == "POST" and payload is not None:
         kwargs["json"] = payload
 
+    host = urlsplit(url).netloc
+    retried = HTTP_RETRIES.labels(host, "timeout"), HTTP_RETRIES.labels(host, "429"), HTTP_RETRIES.labels(host, "5xx")
+    seconds = HTTP_SECONDS.labels(host, method)
+    limiter = CONCURRENCY.for_host(host)
+    breaker, budget = HOST_GUARDS.breaker(host), HOST_GUARDS.budget(host)
+
+    def spend_retry(why: str) -> None:
+        if not budget.withdraw():
+            HTTP_FAILURES.labels(host, "retry_budget").inc()
+            log.warning("Retry budget for %s spent; not retrying %s after %s", host, url, why)
+            raise RetryBudgetExceeded(f"Retry budget for {host} spent ({why}): {url}")
+        record("http_retry", items=1)
+
     for attempt in range(retries + 1):
         try:
-            await RATE_LIMITER.wait()
-            resp = await session.request(method, url, **kwargs).__aenter__()
-        except asyncio.TimeoutError:
-            if attempt < retries:
-                wait_s = backoff_seconds(attempt)
-                log.warning("Timeout while fetching %s; retrying in %.2fs (attempt=%d/%d)", url, wait_s, attempt, retries)
-                await asyncio.sleep(wait_s)
-                continue
-            log.warning("Timeout while fetching %s (giving up)", url)
+            probe = await breaker.admit()
+        except CircuitOpenError:
+            HTTP_FAILURES.labels(host, "circuit_open").inc()
+            raise
+
+        ok = None
+        try:
+            r = await _send(session, method, url, kwargs, limiter, seconds, stop_when, min_skip_bytes)
+            ok = r.status is not None and r.status not in _RETRYABLE_STATUSES
+        except aiohttp.ClientResponseError as e:
+            ok = True  # the host answered; the request was wrong
+            HTTP_FAILURES.labels(host, str(e.status)).inc()
+            log.warning("HTTP error %s for %s", e.status, url)
             raise
         except Exception:
+            ok = False
+            HTTP_FAILURES.labels(host, "error").inc()
             log.exception("Unexpected error while fetching %s", url)
             raise
+        finally:
+            breaker.settle(probe, ok)
 
-        try:
-            if resp.status == 429:
-                await _backoff(attempt, resp)
-                continue
-
-            if resp.status in (500, 502, 503, 504):
+        if r.status is None:
+            if attempt < retries:
+                spend_retry("timeout")
+                retried[0].inc()
                 wait_s = backoff_seconds(attempt)
-                log.warning("Server error %d for %s; retrying in %.2fs (attempt=%d)", resp.status, url, wait_s, attempt)
+                log.warning("Timeout while fetching %s; retrying in %.2fs (attempt=%d/%d)", url, wait_s, attempt, retries)
                 await asyncio.sleep(wait_s)
                 continue
+            HTTP_FAILURES.labels(host, "timeout").inc()
+            log.warning("Timeout while fetching %s (giving up)", url)
+            raise asyncio.TimeoutError(f"Timed out after {retries} retries: {url}")
+
+        if r.status == 429:
+            if attempt < retries:
+                spend_retry("429")
+                retried[1].inc()
+                await _backoff(attempt, r, url)
+                continue
+            log.warning("Rate-limited (429) fetching %s (giving up)", url)
+            break
 
-            resp.raise_for_status()
-            text = await resp.text()
-        except aiohttp.ClientResponseError as e:
-            if e.status in _RETRYABLE_STATUSES and attempt < retries:
+        if r.status in _RETRYABLE_STATUSES:
+            if attempt < retries:
+                spend_retry(str(r.status))
+                retried[2].inc()
                 wait_s = backoff_seconds(attempt)
-                log.warning("HTTP error %s for %s; retrying in %.2fs (attempt=%d/%d)", e.status, url, wait_s, attempt, retries)
+                log.warning("Server error %d for %s; retrying in %.2fs (attempt=%d)", r.status, url, wait_s, attempt)
                 await asyncio.sleep(wait_s)
                 continue
-            log.warning("HTTP error %s for %s", e.status, url)
-            raise
-        finally:
-            await resp.__aexit__(None, None, None)
+            log.warning("Server error %d for %s (giving up)", r.status, url)
+            break
 
-        log.debug("Fetched %d characters from %s (status=%d, method=%s)", len(text), url, resp.status, method)
-        return text
+        budget.deposit()
+        HTTP_RESPONSE_BYTES.labels(host).inc(len(r.body))
+        log.debug("Fetched %d bytes from %s (status=%d, method=%s)", len(r.body), url, r.status, method)
+        return r
 
+    HTTP_FAILURES.labels(host, "retries_exhausted").inc()
     raise RuntimeError(f"Failed to fetch after {retries} retries: {url}")
 
 
+async def fetch_bytes(
+    session: aiohttp.ClientSession,
+    url: str,
+    headers: Dict[str, str] | None = None,
+    *,
+    timeout_s: int = 30,
+    retries: int = 6,
+    stop_when: Optional[Callable[[], BodyScanner]] = None,
+    min_skip_bytes: int = 256 * 1024,
+) -> bytes:
+    """The raw body, for parsers that take bytes (json.loads, lxml) and skip the str copy."""
+    r = await _fetch(
+        session, "GET", url, headers,
+        timeout_s=timeout_s, retries=retries, stop_when=stop_when, min_skip_bytes=min_skip_bytes,
+    )
+    return r.body
+
+
 async def fetch_html(
     session: aiohttp.ClientSession,
     url: str,
@@ -113,11 +319,14 @@ async def fetch_html(
     *,
     timeout_s: int = 30,
     retries: int = 6,
+    stop_when: Optional[Callable[[], BodyScanner]] = None,
+    min_skip_bytes: int = 256 * 1024,
 ) -> str:
-    return await _fetch(
+    r = await _fetch(
         session, "GET", url, headers,
-        timeout_s=timeout_s, retries=retries,
+        timeout_s=timeout_s, retries=retries, stop_when=stop_when, min_skip_bytes=min_skip_bytes,
     )
+    return r.text()
 
 
 async def fetch_post(
@@ -129,10 +338,11 @@ async def fetch_post(
     timeout_s: int = 30,
     retries: int = 6,
 ) -> str:
-    return await _fetch(
+    r = await _fetch(
         session, "POST", url, headers, payload,
         timeout_s=timeout_s, retries=retries,
     )
+    return r.text()
 
 
 async def limited(sem: asyncio.Semaphore, coro: Awaitable[T]) -> T:
@@ -0,0 +1,195 @@
+# cgpe/http/concurrency.py
+
+from __future__ import annotations
+
+import asyncio
+import math
+from collections import deque
+from dataclasses import dataclass
+from typing import Deque, Dict, Literal, Optional
+
+from cgpe.config.scraper import ScraperConfig
+from cgpe.metrics.registry import REGISTRY
+from cgpe.logging.logger import setup_logger
+
+log = setup_logger(__name__)
+
+# "dropped": the attempt ended without telling us anything (cancelled)
+Outcome = Literal["ok", "throttled", "error", "timeout", "dropped"]
+
+CONCURRENCY_LIMIT = REGISTRY.gauge(
+    "cgpe_http_concurrency_limit", "Current adaptive in-flight limit per host", ("host",),
+)
+CONCURRENCY_IN_FLIGHT = REGISTRY.gauge(
+    "cgpe_http_concurrency_in_flight", "Slots held per host", ("host",),
+)
+CONCURRENCY_QUEUED = REGISTRY.gauge(
+    "cgpe_http_concurrency_queued", "Requests waiting for a slot per host", ("host",),
+)
+CONCURRENCY_DECREASES = REGISTRY.counter(
+    "cgpe_http_concurrency_decreases_total", "Multiplicative limit cuts per host", ("host", "reason"),
+)
+
+
+@dataclass
+class AdaptiveConfig:
+    initial: int = 4
+    min_limit: int = 1
+    max_limit: int = 50
+    # how much slower than the long-term RTT the short-term RTT may get before
+    # the limit shrinks (gradient = tolerance * long / short, capped at 1)
+    tolerance: float = 1.5
+    # EWMA windows, in samples
+    long_window: int = 100
+    short_window: int = 10
+    # weight of each new estimate in the limit
+    smoothing: float = 0.2
+    # multiplicative cut on 429 / 5xx / timeout
+    backoff_ratio: float = 0.8
+
+    @classmethod
+    def from_scraper(cls, cfg: ScraperConfig) -> "AdaptiveConfig":
+        return cls(
+            initial=cfg.concurrency,
+            min_limit=cfg.min_concurrency,
+            max_limit=cfg.max_concurrency,
+        )
+
+
+class AdaptiveLimiter:
+    """
+    Per-host in-flight limit, resized from observed latency (gradient
+    style) and cut multiplicatively on throttling or errors.
+
+    Each successful request contributes an RTT sample. While the short-term
+    RTT stays within `tolerance` of the long-term baseline the limit grows by
+    about sqrt(limit) per update; once the origin starts queueing (RTT rises)
+    the gradient drops below 1 and the limit shrinks toward what the origin
+    serves without delay. 429/5xx/timeouts cut it by `backoff_ratio`, so a
+    wave of throttling turns into fewer requests rather than a retry storm.
+    Samples taken while less than half the limit was in use do not grow it:
+    a limit that is not being exercised says nothing about the origin.
+    """
+
+    def __init__(self, host: str, config: AdaptiveConfig) -> None:
+        self.host = host
+        self.config = config
+        self.limit = float(min(config.max_limit, max(config.min_limit, config.initial)))
+        self.in_flight = 0
+        self._waiters: Deque[asyncio.Future] = deque()
+        self._long_rtt: Optional[float] = None
+        self._short_rtt: Optional[float] = None
+
+        CONCURRENCY_LIMIT.labels(host).set_function(lambda: self.limit)
+        CONCURRENCY_IN_FLIGHT.labels(host).set_function(lambda: self.in_flight)
+        CONCURRENCY_QUEUED.labels(host).set_function(lambda: len(self._waiters))
+
+    @property
+    def queued(self) -> int:
+        return len(self._waiters)
+
+    def _capacity(self) -> int:
+        return max(self.config.min_limit, int(self.limit))
+
+    async def acquire(self) -> int:
+        """Wait for a slot; returns the in-flight count including this request."""
+        if self.in_flight < self._capacity() and not self._waiters:
+            self.in_flight += 1
+            return self.in_flight
+
+        fut = asyncio.get_running_loop().create_future()
+        self._waiters.append(fut)
+        try:
+            await fut
+        except asyncio.CancelledError:
+            if fut.done() and not fut.cancelled():
+                # granted and cancelled in the same tick: hand the slot back
+                self.in_flight -= 1
+                self._wake()
+            else:
+                try:
+                    self._waiters.remove(fut)
+                except ValueError:
+                    pass
+            raise
+        return self.in_flight
+
+    def release(self, *, in_flight: int, rtt_s: Optional[float], outcome: Outcome) -> None:
+        self.in_flight -= 1
+        self._update(in_flight, rtt_s, outcome)
+        self._wake()
+
+    def _wake(self) -> None:
+        while self._waiters and self.in_flight < self._capacity():
+            fut = self._waiters.popleft()
+            if fut.done():
+                continue
+            self.in_flight += 1
+            fut.set_result(None)
+
+    def _update(self, in_flight: int, rtt_s: Optional[float], outcome: Outcome) -> None:
+        cfg = self.config
+
+        if outcome == "dropped":
+            return
+        if outcome != "ok":
+            before = self.limit
+            self.limit = max(float(cfg.min_limit), self.limit * cfg.backoff_ratio)
+            CONCURRENCY_DECREASES.labels(self.host, outcome).inc()
+            log.debug("Concurrency for %s cut %.1f -> %.1f (%s)", self.host, before, self.limit, outcome)
+            return
+        if rtt_s is None:
+            return
+
+        a_long, a_short = 1.0 / cfg.long_window, 1.0 / cfg.short_window
+        if self._long_rtt is None:
+            self._long_rtt = self._short_rtt = rtt_s
+        else:
+            self._long_rtt += (rtt_s - self._long_rtt) * a_long
+            self._short_rtt += (rtt_s - self._short_rtt) * a_short
+            # after a sustained slowdown, let the baseline follow the new normal
+            if self._long_rtt > 2 * self._short_rtt:
+                self._long_rtt *= 0.95
+
+        if in_flight < self.limit / 2:
+            return  # app-limited sample
+
+        gradient = max(0.5, min(1.0, cfg.tolerance * self._long_rtt / self._short_rtt))
+        estimate = self.limit * gradient + math.sqrt(self.limit)
+        new_limit = self.limit * (1.0 - cfg.smoothing) + estimate * cfg.smoothing
+        self.limit = min(float(cfg.max_limit), max(float(cfg.min_limit), new_limit))
+
+    def snapshot(self) -> Dict[str, float]:
+        return {
+            "limit": self.limit,
+            "in_flight": self.in_flight,
+            "queued": len(self._waiters),
+            "long_rtt_ms": (self._long_rtt or 0.0) * 1000,
+            "short_rtt_ms": (self._short_rtt or 0.0) * 1000,
+        }
+
+
+class ConcurrencyControl:
+    """One AdaptiveLimiter per host, created on first use."""
+
+    def __init__(self, config: AdaptiveConfig) -> None:
+        self.config = config
+        self._limiters: Dict[str, AdaptiveLimiter] = {}
+
+    def for_host(self, host: str) -> AdaptiveLimiter:
+        limiter = self._limiters.get(host)
+        if limiter is None:
+            limiter = self._limiters[host] = AdaptiveLimiter(host, self.config)
+        return limiter
+
+    def configure(self, config: AdaptiveConfig) -> None:
+        """New settings for hosts seen from now on, and a fresh start for known ones."""
+        self.config = config
+        self._limiters.clear()
+
+    def snapshot(self) -> Dict[str, Dict[str, float]]:
+        return {host: l.snapshot() for host, l in sorted(self._limiters.items())}
+
+
+# Global shared controller (every fetch goes through cgpe.http.client._fetch)
+CONCURRENCY = ConcurrencyControl(AdaptiveConfig.from_scraper(ScraperConfig.from_env()))
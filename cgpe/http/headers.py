@@ -1,13 +1,19 @@
-from browserforge.headers import HeaderGenerator
+from functools import lru_cache
+
 from cgpe.logging.logger import setup_logger
 
 log = setup_logger(__name__)
 
-_gen = HeaderGenerator()
+
+@lru_cache(maxsize=1)
+def _generator():
+    # browserforge loads its header network on import; only pay for it when fetching
+    from browserforge.headers import HeaderGenerator
+    return HeaderGenerator()
 
 
 def build_headers(extra: dict[str, str] | None = None) -> dict[str, str]:
-    headers = _gen.generate()
+    headers = _generator().generate()
 
     headers["Accept-Encoding"] = "gzip, deflate"
     headers["Accept-Language"] = "en-US,en;q=0.9"
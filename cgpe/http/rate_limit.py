@@ -5,6 +5,15 @@ import random
 import time
 from dataclasses import dataclass
 
+from cgpe.metrics.registry import REGISTRY
+from cgpe.metrics.tracing import record
+
+RATE_LIMIT_WAIT = REGISTRY.histogram(
+    "cgpe_rate_limit_wait_seconds", "Time a request waited for its rate-limiter slot",
+    buckets=(0.001, 0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 300.0),
+)
+RATE_LIMIT_WAITERS = REGISTRY.gauge("cgpe_rate_limit_waiters", "Requests queued on the rate limiter")
+
 
 @dataclass
 class RateLimiter:
@@ -21,18 +30,32 @@ class RateLimiter:
         self._lock = asyncio.Lock()
         self._next_time = 0.0  # monotonic timestamp
 
+    def configure(self, *, rps: float, jitter_s: float) -> None:
+        """Retune the shared limiter in place (modules hold a reference to it)."""
+        self.rps = rps
+        self.jitter_s = jitter_s
+        self.__post_init__()
+
     async def wait(self) -> None:
-        async with self._lock:
-            now = time.monotonic()
-            if now < self._next_time:
-                await asyncio.sleep(self._next_time - now)
-
-            # schedule next slot + a bit of jitter
-            self._next_time = (
-                time.monotonic()
-                + self._min_interval
-                + random.uniform(0.0, self.jitter_s)
-            )
+        t0 = time.monotonic()
+        RATE_LIMIT_WAITERS.inc()
+        try:
+            async with self._lock:
+                now = time.monotonic()
+                if now < self._next_time:
+                    await asyncio.sleep(self._next_time - now)
+
+                # schedule next slot + a bit of jitter
+                self._next_time = (
+                    time.monotonic()
+                    + self._min_interval
+                    + random.uniform(0.0, self.jitter_s)
+                )
+        finally:
+            RATE_LIMIT_WAITERS.dec()
+        waited = time.monotonic() - t0
+        RATE_LIMIT_WAIT.observe(waited)
+        record("rate_limit_wait", wall_s=waited, items=1)
 
 
 def backoff_seconds(attempt: int, *, base: float = 1.0, cap: float = 60.0) -> float:
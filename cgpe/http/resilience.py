@@ -0,0 +1,231 @@
+# cgpe/http/resilience.py
+#
+# Load shedding for a degraded origin. A per-host retry budget caps retries
+# at a fraction of successful requests, so tens of thousands of detail
+# fetches cannot each run their own six-attempt backoff ladder; a per-host
+# circuit breaker stops sending at all once most attempts fail and lets one
+# probe through at a time until the host answers again.
+
+from __future__ import annotations
+
+import asyncio
+import time
+from collections import deque
+from typing import Deque, Dict, List, Optional
+
+from cgpe.config.http import ResilienceConfig
+from cgpe.logging.logger import setup_logger
+from cgpe.metrics.registry import REGISTRY
+from cgpe.metrics.tracing import record
+
+log = setup_logger(__name__)
+
+CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+_STATE_VALUE = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+BREAKER_STATE = REGISTRY.gauge(
+    "cgpe_http_breaker_state", "Circuit breaker state per host (0 closed, 1 half-open, 2 open)", ("host",),
+)
+BREAKER_TRIPS = REGISTRY.counter("cgpe_http_breaker_trips_total", "Closed/half-open -> open transitions", ("host",))
+BREAKER_REJECTED = REGISTRY.counter(
+    "cgpe_http_breaker_rejected_total", "Requests failed fast or timed out parked while open", ("host",),
+)
+BREAKER_PARKED = REGISTRY.gauge("cgpe_http_breaker_parked", "Requests parked on an open breaker", ("host",))
+RETRY_BUDGET_TOKENS = REGISTRY.gauge("cgpe_http_retry_budget_tokens", "Retry tokens available per host", ("host",))
+RETRY_BUDGET_DENIED = REGISTRY.counter(
+    "cgpe_http_retry_budget_denied_total", "Retries refused because the host's budget was spent", ("host",),
+)
+
+
+class CircuitOpenError(RuntimeError):
+    """The host's breaker is open and the request was not sent."""
+
+
+class RetryBudgetExceeded(RuntimeError):
+    """A retry was due but the host's retry budget is spent."""
+
+
+class RetryBudget:
+    """
+    Token bucket for retries: each success deposits `ratio` tokens, each
+    retry takes one, and `min_per_second` tokens trickle in regardless.
+    First attempts are never limited, only retries.
+    """
+
+    def __init__(self, host: str, config: ResilienceConfig) -> None:
+        self.host = host
+        self.ratio = config.retry_budget_ratio
+        self.min_per_second = config.retry_budget_min_per_second
+        self.max_tokens = config.retry_budget_max_tokens
+        self.tokens = self.max_tokens
+        self._refilled = time.monotonic()
+        RETRY_BUDGET_TOKENS.labels(host).set_function(lambda: self.tokens)
+        self._denied = RETRY_BUDGET_DENIED.labels(host)
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.tokens = min(self.max_tokens, self.tokens + (now - self._refilled) * self.min_per_second)
+        self._refilled = now
+
+    def deposit(self) -> None:
+        self.tokens = min(self.max_tokens, self.tokens + self.ratio)
+
+    def withdraw(self) -> bool:
+        self._refill()
+        if self.tokens >= 1.0:
+            self.tokens -= 1.0
+            return True
+        self._denied.inc()
+        return False
+
+
+class CircuitBreaker:
+    """
+    closed: requests flow; the last `window` outcomes are kept and the
+            breaker opens once `failure_ratio` of them failed.
+    open: nothing is sent for the cool-down; callers park (or fail fast).
+    half_open: one probe at a time; success closes the breaker, failure
+               reopens it with twice the cool-down.
+    """
+
+    def __init__(self, host: str, config: ResilienceConfig) -> None:
+        self.host = host
+        self.config = config
+        self.state = CLOSED
+        self._outcomes: Deque[bool] = deque(maxlen=config.breaker_window)
+        self._failures = 0
+        self._cooldown = config.breaker_open_seconds
+        self._opened_at = 0.0
+        self._probing = False
+        self._waiters: List[asyncio.Future] = []
+        self._parked = 0
+
+        BREAKER_STATE.labels(host).set_function(lambda: _STATE_VALUE[self.state])
+        BREAKER_PARKED.labels(host).set_function(lambda: self._parked)
+        self._trips = BREAKER_TRIPS.labels(host)
+        self._rejected = BREAKER_REJECTED.labels(host)
+
+    def _reopens_in(self) -> float:
+        return self._opened_at + self._cooldown - time.monotonic()
+
+    async def admit(self) -> bool:
+        """
+        Wait until a request may be sent. Returns True when this request is
+        the half-open probe; raises CircuitOpenError when failing fast or
+        when parked longer than `breaker_max_park_seconds`.
+        """
+        if self.state == CLOSED:
+            return False
+
+        deadline = time.monotonic() + self.config.breaker_max_park_seconds
+        parked_at = None
+        try:
+            while True:
+                if self.state == CLOSED:
+                    return False
+                if self.state == OPEN and self._reopens_in() <= 0:
+                    self._set_state(HALF_OPEN)
+                if self.state == HALF_OPEN and not self._probing:
+                    self._probing = True
+                    return True
+
+                if not self.config.breaker_park:
+                    self._rejected.inc()
+                    raise CircuitOpenError(f"circuit open for {self.host}")
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self._rejected.inc()
+                    raise CircuitOpenError(f"circuit open for {self.host} (parked {self.config.breaker_max_park_seconds:g}s)")
+
+                if parked_at is None:
+                    parked_at = time.perf_counter()
+                    self._parked += 1
+                # wake on a state change, or when the cool-down ends
+                wait_s = remaining if self.state == HALF_OPEN else min(remaining, max(self._reopens_in(), 0.0))
+                fut = asyncio.get_running_loop().create_future()
+                self._waiters.append(fut)
+                try:
+                    await asyncio.wait((fut,), timeout=wait_s)
+                finally:
+                    if fut in self._waiters:
+                        self._waiters.remove(fut)
+        finally:
+            if parked_at is not None:
+                self._parked -= 1
+                record("breaker_parked", wall_s=time.perf_counter() - parked_at, items=1)
+
+    def settle(self, probe: bool, ok: Optional[bool]) -> None:
+        """Report an attempt's outcome (None: it ended without one, e.g. cancelled)."""
+        if probe:
+            self._probing = False
+            if ok is None:
+                self._wake()  # let another waiter probe
+            elif ok:
+                log.info("Circuit for %s closed after a successful probe", self.host)
+                self._cooldown = self.config.breaker_open_seconds
+                self._outcomes.clear()
+                self._failures = 0
+                self._set_state(CLOSED)
+            else:
+                self._cooldown = min(self._cooldown * 2, self.config.breaker_max_open_seconds)
+                self._trip("probe failed")
+            return
+
+        if ok is None or self.state != CLOSED:
+            return
+        if len(self._outcomes) == self._outcomes.maxlen and not self._outcomes[0]:
+            self._failures -= 1
+        self._outcomes.append(ok)
+        if not ok:
+            self._failures += 1
+            if (
+                len(self._outcomes) >= self.config.breaker_min_requests
+                and self._failures >= self.config.breaker_failure_ratio * len(self._outcomes)
+            ):
+                self._trip(f"{self._failures}/{len(self._outcomes)} recent attempts failed")
+
+    def _trip(self, why: str) -> None:
+        self._opened_at = time.monotonic()
+        self._trips.inc()
+        log.warning("Circuit for %s opened for %.0fs: %s", self.host, self._cooldown, why)
+        self._set_state(OPEN)
+
+    def _set_state(self, state: str) -> None:
+        self.state = state
+        self._wake()
+
+    def _wake(self) -> None:
+        waiters, self._waiters = self._waiters, []
+        for fut in waiters:
+            if not fut.done():
+                fut.set_result(None)
+
+
+class HostGuards:
+    """Retry budget and circuit breaker per host, created on first use."""
+
+    def __init__(self, config: ResilienceConfig) -> None:
+        self.config = config
+        self._budgets: Dict[str, RetryBudget] = {}
+        self._breakers: Dict[str, CircuitBreaker] = {}
+
+    def budget(self, host: str) -> RetryBudget:
+        b = self._budgets.get(host)
+        if b is None:
+            b = self._budgets[host] = RetryBudget(host, self.config)
+        return b
+
+    def breaker(self, host: str) -> CircuitBreaker:
+        b = self._breakers.get(host)
+        if b is None:
+            b = self._breakers[host] = CircuitBreaker(host, self.config)
+        return b
+
+    def configure(self, config: ResilienceConfig) -> None:
+        self.config = config
+        self._budgets.clear()
+        self._breakers.clear()
+
+
+# Global shared guards (used by cgpe.http.client._fetch)
+HOST_GUARDS = HostGuards(ResilienceConfig.from_env())
@@ -0,0 +1,147 @@
+# cgpe/http/session.py
+#
+# One tuned aiohttp session per run, shared by the category, set and detail
+# stages, so keep-alive sockets and cached DNS answers carry across stages
+# instead of every stage paying for its own TCP/TLS handshakes.
+#
+#   async with http_session() as session:
+#       await run_set_pipeline(..., session=session, ...)
+#       await run_detail_pipeline(..., session=session, ...)
+
+from __future__ import annotations
+
+import ssl
+import time
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from types import SimpleNamespace
+from typing import AsyncIterator, Optional
+
+import aiohttp
+
+from cgpe.config.http import HttpConfig
+from cgpe.logging.logger import setup_logger
+from cgpe.metrics.registry import REGISTRY
+from cgpe.metrics.tracing import record
+
+log = setup_logger(__name__)
+
+HTTP_CONNECTIONS = REGISTRY.counter(
+    "cgpe_http_connections_total", "Requests by connection source (new socket or pooled keep-alive)", ("host", "kind"),
+)
+HTTP_CONNECT_SECONDS = REGISTRY.histogram(
+    "cgpe_http_connect_seconds", "DNS + TCP + TLS time for new connections", ("host",),
+)
+HTTP_POOL_WAIT_SECONDS = REGISTRY.histogram(
+    "cgpe_http_pool_wait_seconds", "Time a request queued for a free connection slot", ("host",),
+)
+HTTP_DNS = REGISTRY.counter("cgpe_http_dns_lookups_total", "Resolver cache lookups", ("result",))
+
+_SSL_CONTEXT: Optional[ssl.SSLContext] = None
+
+
+def ssl_context() -> ssl.SSLContext:
+    """
+    Process-wide client TLS context. Loading the CA bundle costs tens of ms,
+    so every connector shares one context instead of building its own.
+    """
+    global _SSL_CONTEXT
+    if _SSL_CONTEXT is None:
+        _SSL_CONTEXT = ssl.create_default_context()
+    return _SSL_CONTEXT
+
+
+@dataclass
+class ConnectionStats:
+    new: int = 0
+    reused: int = 0
+    connect_s: float = 0.0
+    dns_hits: int = 0
+    dns_misses: int = 0
+
+    @property
+    def reuse_ratio(self) -> float:
+        total = self.new + self.reused
+        return self.reused / total if total else 0.0
+
+
+def _trace_config(stats: ConnectionStats) -> aiohttp.TraceConfig:
+    tc = aiohttp.TraceConfig(trace_config_ctx_factory=SimpleNamespace)
+
+    async def on_request_start(session, ctx, params) -> None:
+        ctx.host = params.url.host or ""
+
+    async def on_queued_start(session, ctx, params) -> None:
+        ctx.t_queued = time.perf_counter()
+
+    async def on_queued_end(session, ctx, params) -> None:
+        HTTP_POOL_WAIT_SECONDS.labels(ctx.host).observe(time.perf_counter() - ctx.t_queued)
+
+    async def on_create_start(session, ctx, params) -> None:
+        ctx.t_connect = time.perf_counter()
+
+    async def on_create_end(session, ctx, params) -> None:
+        elapsed = time.perf_counter() - ctx.t_connect
+        stats.new += 1
+        stats.connect_s += elapsed
+        HTTP_CONNECTIONS.labels(ctx.host, "new").inc()
+        HTTP_CONNECT_SECONDS.labels(ctx.host).observe(elapsed)
+        record("http_connect", wall_s=elapsed, items=1)
+
+    async def on_reuse(session, ctx, params) -> None:
+        stats.reused += 1
+        HTTP_CONNECTIONS.labels(ctx.host, "reused").inc()
+        record("http_conn_reused", items=1)
+
+    async def on_dns_hit(session, ctx, params) -> None:
+        stats.dns_hits += 1
+        HTTP_DNS.labels("hit").inc()
+
+    async def on_dns_miss(session, ctx, params) -> None:
+        stats.dns_misses += 1
+        HTTP_DNS.labels("miss").inc()
+
+    tc.on_request_start.append(on_request_start)
+    tc.on_connection_queued_start.append(on_queued_start)
+    tc.on_connection_queued_end.append(on_queued_end)
+    tc.on_connection_create_start.append(on_create_start)
+    tc.on_connection_create_end.append(on_create_end)
+    tc.on_connection_reuseconn.append(on_reuse)
+    tc.on_dns_cache_hit.append(on_dns_hit)
+    tc.on_dns_cache_miss.append(on_dns_miss)
+    return tc
+
+
+def make_connector(config: HttpConfig) -> aiohttp.TCPConnector:
+    return aiohttp.TCPConnector(
+        limit=config.limit,
+        limit_per_host=config.limit_per_host,
+        keepalive_timeout=config.keepalive_timeout_seconds,
+        use_dns_cache=True,
+        ttl_dns_cache=config.dns_cache_ttl_seconds,
+        happy_eyeballs_delay=config.happy_eyeballs_delay_seconds,
+        enable_cleanup_closed=config.cleanup_closed,
+        ssl=ssl_context(),
+    )
+
+
+@asynccontextmanager
+async def http_session(config: Optional[HttpConfig] = None) -> AsyncIterator[aiohttp.ClientSession]:
+    """A ClientSession on a tuned connector; logs connection reuse when it closes."""
+    config = config or HttpConfig.from_env()
+    stats = ConnectionStats()
+    session = aiohttp.ClientSession(
+        connector=make_connector(config),
+        trace_configs=[_trace_config(stats)],
+    )
+    try:
+        yield session
+    finally:
+        await session.close()
+        total = stats.new + stats.reused
+        if total:
+            log.info(
+                "HTTP connections: %d requests, %d new (%.1f ms avg connect), %.0f%% reused, DNS %d hit / %d miss",
+                total, stats.new, 1000 * stats.connect_s / max(stats.new, 1),
+                100 * stats.reuse_ratio, stats.dns_hits, stats.dns_misses,
+            )
@@ -0,0 +1,50 @@
+# cgpe/http/stream.py
+
+from __future__ import annotations
+
+from typing import Iterable, Optional, Protocol
+
+
+class BodyScanner(Protocol):
+    def feed(self, chunk: bytes) -> bool:
+        """Consume the next body chunk; True once the rest of the body is not needed."""
+        ...
+
+
+class SectionScanner:
+    """
+    Feeds a streamed HTML body to lxml's incremental parser and reports done
+    once every element with one of `ids` has closed and a <script> containing
+    each of `scripts` has been read. Pages missing a section never finish,
+    so they are read to the end as before.
+    """
+
+    def __init__(
+        self,
+        ids: Iterable[str],
+        *,
+        scripts: Iterable[str] = (),
+        tags: Optional[Iterable[str]] = None,
+    ) -> None:
+        from lxml import etree
+
+        self.pending_ids = set(ids)
+        self.pending_scripts = set(scripts)
+        # end events only for tags that can carry a wanted section
+        self._parser = etree.HTMLPullParser(events=("end",), tag=tuple(tags) if tags else None)
+
+    @property
+    def done(self) -> bool:
+        return not self.pending_ids and not self.pending_scripts
+
+    def feed(self, chunk: bytes) -> bool:
+        self._parser.feed(chunk)
+        for _, el in self._parser.read_events():
+            if el.tag == "script":
+                if self.pending_scripts and el.text:
+                    self.pending_scripts = {m for m in self.pending_scripts if m not in el.text}
+            else:
+                self.pending_ids.discard(el.get("id"))
+            # the tree is only a side effect of the scan; keep it small
+            el.clear(keep_tail=True)
+        return self.done
@@ -1,15 +1,24 @@
+import atexit
+import copy
+import json
 import logging
 import os
-from logging.handlers import RotatingFileHandler
+import queue
+import sys
+import threading
+import time
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
 from pathlib import Path
-from dotenv import load_dotenv
+from typing import IO, Dict, Optional, Tuple
 
-load_dotenv()
+from cgpe.config.env import load_env
 
 LOG_DIR = Path("logs")
-LOG_DIR.mkdir(exist_ok=True)
 LOG_FILE = LOG_DIR / "cgpe.log"
 
+# every `cgpe.*` logger propagates here; handlers live only on this one
+ROOT_LOGGER = "cgpe"
+
 RESET = "\033[0m"
 COLORS = {
     logging.DEBUG: "\033[36m",
@@ -20,8 +29,24 @@ COLORS = {
 }
 MAGENTA = "\033[35m"
 
+BASE_FMT = "%(asctime)s | %(levelname)s | %(name)s | %(message)s"
+
+# LogRecord attributes that are not user `extra=` fields
+_RECORD_ATTRS = set(vars(logging.LogRecord("", 0, "", 0, "", None, None))) | {"message", "asctime", "suppressed"}
+
+
+# -----------------------------
+# Formatters
+# -----------------------------
 
-class ColorFormatter(logging.Formatter):
+class TextFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        s = super().format(record)
+        suppressed = getattr(record, "suppressed", 0)
+        return f"{s} (+{suppressed} similar suppressed)" if suppressed else s
+
+
+class ColorFormatter(TextFormatter):
     def format(self, record: logging.LogRecord) -> str:
         orig_levelname = record.levelname
         orig_name = record.name
@@ -35,6 +60,115 @@ class ColorFormatter(logging.Formatter):
             record.name = orig_name
 
 
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line; `extra=` fields are kept as top-level keys."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        out = {
+            "ts": self.formatTime(record),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+        }
+        for k, v in record.__dict__.items():
+            if k not in _RECORD_ATTRS:
+                out[k] = v
+        if getattr(record, "suppressed", 0):
+            out["suppressed"] = record.suppressed
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            out["exc"] = record.exc_text
+        return json.dumps(out, default=str, ensure_ascii=False)
+
+
+# -----------------------------
+# Filters / handlers
+# -----------------------------
+
+class RateLimitFilter(logging.Filter):
+    """
+    Token bucket per message template (logger name + unformatted msg), so a
+    hot-path line like "Parsed detail for card %r" is capped at `rate`/s
+    while distinct messages are unaffected. WARNING and above always pass.
+    The next record let through carries the count it stands in for.
+    """
+
+    def __init__(self, rate: float, burst: int) -> None:
+        super().__init__()
+        self.rate = rate
+        self.burst = burst
+        self._lock = threading.Lock()
+        # key -> (tokens, last refill, suppressed since last pass)
+        self._buckets: Dict[Tuple[str, str], Tuple[float, float, int]] = {}
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.WARNING:
+            return True
+
+        key = (record.name, str(record.msg))
+        now = time.monotonic()
+        with self._lock:
+            tokens, last, suppressed = self._buckets.get(key, (float(self.burst), now, 0))
+            tokens = min(float(self.burst), tokens + (now - last) * self.rate)
+            if tokens < 1.0:
+                self._buckets[key] = (tokens, now, suppressed + 1)
+                return False
+            self._buckets[key] = (tokens - 1.0, now, 0)
+
+        if suppressed:
+            record.suppressed = suppressed
+        return True
+
+
+class LazyRotatingFileHandler(RotatingFileHandler):
+    """Creates the log dir and opens the file on the first record, not at import."""
+
+    def __init__(self, filename: Path, **kwargs) -> None:
+        super().__init__(filename, delay=True, **kwargs)
+
+    def _open(self):
+        Path(self.baseFilename).parent.mkdir(parents=True, exist_ok=True)
+        return super()._open()
+
+
+class _QueueHandler(QueueHandler):
+    listener: Optional[QueueListener] = None
+    _started = False
+
+    def emit(self, record: logging.LogRecord) -> None:
+        # the listener thread starts with the first record, not at import
+        if not self._started:
+            with _lock:
+                if not self._started and self.listener is not None:
+                    self.listener.start()
+                    self._started = True
+        super().emit(record)
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # merge args on the caller's thread (they may be mutated later), but keep
+        # the traceback separate from the message so the JSON formatter can
+        # put it in its own field
+        record = copy.copy(record)
+        record.message = record.getMessage()
+        record.msg = record.message
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+# -----------------------------
+# Pipeline
+# -----------------------------
+
+_queue_handler: Optional[QueueHandler] = None
+_listener: Optional[QueueListener] = None
+_attached: list[logging.Logger] = []
+_lock = threading.RLock()
+
+
 def _resolve_log_level(default: int = logging.INFO) -> int:
     level = os.getenv("LOG_LEVEL")
     if not level:
@@ -42,39 +176,182 @@ def _resolve_log_level(default: int = logging.INFO) -> int:
     return getattr(logging, level.upper(), default)
 
 
+def _build_pipeline(
+    *,
+    fmt: str,
+    rate_limit: float,
+    rate_burst: int,
+    stream: Optional[IO[str]],
+    log_file: Optional[Path],
+) -> Tuple[QueueHandler, QueueListener]:
+    json_out = fmt == "json"
+
+    console = logging.StreamHandler(stream)
+    console.setFormatter(JsonFormatter() if json_out else ColorFormatter(BASE_FMT))
+    handlers: list[logging.Handler] = [console]
+
+    if log_file is not None:
+        file_handler = LazyRotatingFileHandler(
+            log_file,
+            maxBytes=5_000_000,
+            backupCount=3,
+            encoding="utf-8",
+        )
+        file_handler.setFormatter(JsonFormatter() if json_out else TextFormatter(BASE_FMT))
+        handlers.append(file_handler)
+
+    # callers only enqueue; formatting and I/O happen on the listener thread
+    q: queue.SimpleQueue = queue.SimpleQueue()
+    qh = _QueueHandler(q)
+    if rate_limit > 0:
+        qh.addFilter(RateLimitFilter(rate_limit, rate_burst))
+
+    listener = QueueListener(q, *handlers, respect_handler_level=True)
+    qh.listener = listener
+    return qh, listener
+
+
+def _ensure_pipeline() -> QueueHandler:
+    global _queue_handler, _listener
+    if _queue_handler is None:
+        _queue_handler, _listener = _build_pipeline(
+            fmt=os.getenv("LOG_FORMAT", "text").lower(),
+            rate_limit=float(os.getenv("LOG_RATE_LIMIT", "0")),
+            rate_burst=int(os.getenv("LOG_RATE_BURST", "20")),
+            stream=None,
+            log_file=LOG_FILE,
+        )
+        atexit.register(shutdown_logging)
+    return _queue_handler
+
+
+def _attach(logger: logging.Logger) -> None:
+    qh = _ensure_pipeline()
+    if qh not in logger.handlers:
+        logger.addHandler(qh)
+        _attached.append(logger)
+    logger.propagate = False
+
+
+def shutdown_logging() -> None:
+    """Drain the queue and close the handlers (registered with atexit)."""
+    global _queue_handler, _listener
+    with _lock:
+        if _listener is not None:
+            if _listener._thread is not None:
+                _listener.stop()
+            for h in _listener.handlers:
+                h.close()
+        for logger in _attached:
+            if _queue_handler in logger.handlers:
+                logger.removeHandler(_queue_handler)
+        _attached.clear()
+        _queue_handler, _listener = None, None
+
+
+def _reinit_after_fork() -> None:
+    """
+    Forked child: the listener thread didn't survive the fork, so records
+    would pile up in a queue nobody drains. Give the inherited handler a
+    fresh queue and an unstarted listener over the same handlers (the first
+    record starts its thread), and new locks in case another thread held one.
+    """
+    global _lock, _listener
+    _lock = threading.RLock()
+    if _queue_handler is None or _listener is None:
+        return
+
+    for f in _queue_handler.filters:
+        if isinstance(f, RateLimitFilter):
+            f._lock = threading.Lock()
+    q: queue.SimpleQueue = queue.SimpleQueue()
+    _listener = QueueListener(q, *_listener.handlers, respect_handler_level=True)
+    _queue_handler.queue = q
+    _queue_handler.listener = _listener
+    _queue_handler._started = False
+
+    # multiprocessing children leave through os._exit (no atexit); hook their
+    # own exit finalizers once the child has bootstrapped
+    mp_util = sys.modules.get("multiprocessing.util")
+    if mp_util is not None:
+        mp_util.register_after_fork(_queue_handler, _drain_at_process_exit)
+
+
+def _drain_at_process_exit(_handler: object = None) -> None:
+    from multiprocessing.util import Finalize
+    Finalize(None, shutdown_logging, exitpriority=-100)
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reinit_after_fork)
+
+
+def init_logging(
+    level: int | None = None,
+    *,
+    fmt: str | None = None,
+    rate_limit: float | None = None,
+    rate_burst: int | None = None,
+    stream: Optional[IO[str]] = None,
+    log_file: Optional[Path] = LOG_FILE,
+) -> logging.Logger:
+    """
+    Explicit startup hook for entry points: loads `.env`, then (re)builds the
+    queue pipeline from LOG_LEVEL / LOG_FORMAT (text|json) / LOG_RATE_LIMIT
+    (per-message-template records/s below WARNING; 0, the default, = off:
+    opt in for chatty DEBUG runs) / LOG_RATE_BURST.
+    Arguments override the environment. Importing cgpe modules never touches
+    the filesystem; the log file is opened on the first record.
+    """
+    global _queue_handler, _listener
+    load_env()
+
+    with _lock:
+        loggers = list(_attached)
+    shutdown_logging()
+
+    with _lock:
+        _queue_handler, _listener = _build_pipeline(
+            fmt=(fmt or os.getenv("LOG_FORMAT", "text")).lower(),
+            rate_limit=rate_limit if rate_limit is not None else float(os.getenv("LOG_RATE_LIMIT", "0")),
+            rate_burst=rate_burst if rate_burst is not None else int(os.getenv("LOG_RATE_BURST", "20")),
+            stream=stream,
+            log_file=log_file,
+        )
+    atexit.unregister(shutdown_logging)
+    atexit.register(shutdown_logging)
+    mp = sys.modules.get("multiprocessing")
+    if mp is not None and mp.parent_process() is not None:
+        # e.g. a pool initializer: this process exits without running atexit
+        _drain_at_process_exit()
+
+    root = logging.getLogger(ROOT_LOGGER)
+    root.setLevel(level if level is not None else _resolve_log_level())
+    for logger in {root, *loggers}:
+        _attach(logger)
+    return root
+
+
 def setup_logger(
     name: str,
     level: int | None = None,
 ) -> logging.Logger:
-    # env default → explicit arg override
-    level = level if level is not None else _resolve_log_level()
-
     logger = logging.getLogger(name)
-    logger.setLevel(level)
-
-    if logger.handlers:
-        return logger
-
-    base_fmt = "%(asctime)s | %(levelname)s | %(name)s | %(message)s"
-
-    # console (colored)
-    console = logging.StreamHandler()
-    console.setLevel(level)
-    console.setFormatter(ColorFormatter(base_fmt))
-
-    # file (plain)
-    file_handler = RotatingFileHandler(
-        LOG_FILE,
-        maxBytes=5_000_000,
-        backupCount=3,
-        encoding="utf-8",
-    )
-    
-    file_handler.setLevel(level)
-    file_handler.setFormatter(logging.Formatter(base_fmt))
-
-    logger.addHandler(console)
-    logger.addHandler(file_handler)
-    logger.propagate = False
+
+    if name == ROOT_LOGGER or name.startswith(ROOT_LOGGER + "."):
+        root = logging.getLogger(ROOT_LOGGER)
+        if not root.handlers:
+            # until init_logging runs: process env only, no .env read
+            root.setLevel(_resolve_log_level())
+            _attach(root)
+    else:
+        # scripts run as __main__ etc. sit outside the cgpe tree
+        if logger.level == logging.NOTSET:
+            logger.setLevel(_resolve_log_level())
+        _attach(logger)
+
+    # explicit arg override; otherwise inherit from the cgpe logger
+    if level is not None:
+        logger.setLevel(level)
 
     return logger
@@ -0,0 +1,105 @@
+# cgpe/metrics/exporter.py
+#
+# Exposition for processes that are not the web app (backfill runs): an
+# optional /metrics HTTP endpoint on a daemon thread, and/or a textfile that
+# is rewritten periodically and once more on close, so a run that finishes
+# between Prometheus scrapes still leaves its final numbers behind.
+
+from __future__ import annotations
+
+import os
+import threading
+from pathlib import Path
+from typing import Optional
+
+from cgpe.config.metrics import MetricsConfig
+from cgpe.metrics.registry import CONTENT_TYPE, REGISTRY, Registry
+from cgpe.logging.logger import setup_logger
+
+log = setup_logger(__name__)
+
+
+def write_textfile(path: str | Path, registry: Registry = REGISTRY) -> Path:
+    """Atomic write (temp file + rename) so a collector never reads half a file."""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(path.name + f".{os.getpid()}.tmp")
+    tmp.write_text(registry.render(), encoding="utf-8")
+    os.replace(tmp, path)
+    return path
+
+
+class MetricsExporter:
+    def __init__(self, config: MetricsConfig, registry: Registry = REGISTRY) -> None:
+        self.config = config
+        self.registry = registry
+        self._server = None
+        self._stop = threading.Event()
+        self._threads: list[threading.Thread] = []
+
+    def start(self) -> "MetricsExporter":
+        if self.config.port:
+            self._start_http()
+        if self.config.textfile:
+            t = threading.Thread(target=self._textfile_loop, name="cgpe-metrics-textfile", daemon=True)
+            t.start()
+            self._threads.append(t)
+        return self
+
+    def _start_http(self) -> None:
+        # only batch runs with CGPE_METRICS_PORT set pay for http.server
+        from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+        registry = self.registry
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self) -> None:
+                if self.path.split("?", 1)[0] != "/metrics":
+                    self.send_error(404)
+                    return
+                body = registry.render().encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", CONTENT_TYPE)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format: str, *args) -> None:
+                pass
+
+        self._server = ThreadingHTTPServer((self.config.addr, self.config.port), Handler)
+        self._server.daemon_threads = True
+        t = threading.Thread(target=self._server.serve_forever, name="cgpe-metrics-http", daemon=True)
+        t.start()
+        self._threads.append(t)
+        log.info("Serving metrics on http://%s:%d/metrics", self.config.addr, self._server.server_address[1])
+
+    def _textfile_loop(self) -> None:
+        while not self._stop.wait(self.config.textfile_interval_seconds):
+            try:
+                write_textfile(self.config.textfile, self.registry)
+            except OSError:
+                log.exception("Writing metrics textfile %s failed", self.config.textfile)
+
+    def close(self) -> None:
+        self._stop.set()
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+        for t in self._threads:
+            t.join(timeout=5)
+        self._threads.clear()
+        if self.config.textfile:
+            write_textfile(self.config.textfile, self.registry)
+            log.info("Wrote metrics to %s", self.config.textfile)
+
+    def __enter__(self) -> "MetricsExporter":
+        return self  # `with start_exporter():` -- already started
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+def start_exporter(config: Optional[MetricsConfig] = None) -> MetricsExporter:
+    return MetricsExporter(config or MetricsConfig.from_env()).start()
@@ -0,0 +1,22 @@
+# cgpe/metrics/pipeline.py
+#
+# Metrics shared by the category/set/detail pipelines. Stage names:
+# category_fetch, category_parse, set_fetch, set_parse, set_diff, prescreen,
+# detail_fetch, detail_parse, store.
+
+from cgpe.metrics.registry import REGISTRY
+
+STAGE_SECONDS = REGISTRY.histogram(
+    "cgpe_pipeline_stage_seconds", "Wall time of one pipeline stage run (all items of a batch)", ("stage",),
+    buckets=(0.1, 0.5, 1.0, 5.0, 10.0, 30.0, 60.0, 300.0, 900.0, 1800.0, 3600.0),
+)
+STAGE_ITEMS = REGISTRY.counter(
+    "cgpe_pipeline_items_total", "Items through a pipeline stage", ("stage", "outcome"),
+)
+STAGE_PENDING = REGISTRY.gauge(
+    "cgpe_pipeline_pending", "Items started in a stage and not finished yet", ("stage",),
+)
+PARSE_SECONDS = REGISTRY.histogram(
+    "cgpe_parse_seconds", "Time to parse one page", ("kind",),
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0),
+)
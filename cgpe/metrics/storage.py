@@ -0,0 +1,36 @@
+# cgpe/metrics/storage.py
+
+from __future__ import annotations
+
+import functools
+import time
+from typing import Callable, TypeVar
+
+from cgpe.metrics.registry import REGISTRY
+
+F = TypeVar("F", bound=Callable)
+
+DB_SECONDS = REGISTRY.histogram(
+    "cgpe_db_op_seconds", "Storage repo call latency (statement + commit)", ("op",),
+    buckets=(0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0),
+)
+DB_ROWS_WRITTEN = REGISTRY.counter(
+    "cgpe_db_rows_written_total", "Rows written by storage repo calls", ("op",),
+)
+
+
+def timed_op(op: str) -> Callable[[F], F]:
+    """Record the call's latency (errors included) under cgpe_db_op_seconds{op=...}."""
+    child = DB_SECONDS.labels(op)
+
+    def decorate(fn: F) -> F:
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            t0 = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                child.observe(time.perf_counter() - t0)
+        return wrapper  # type: ignore[return-value]
+
+    return decorate
@@ -0,0 +1,286 @@
+# cgpe/metrics/tracing.py
+#
+# Stage-level tracing for scrape runs. A run is bound to a contextvar, so
+# every span opened by the pipelines (including those in asyncio.to_thread
+# workers, which copy the context) lands in the same RunTrace without
+# passing it around. Outside a run every call here is a cheap no-op.
+#
+#   with trace_run(source, config) as run:
+#       ...
+#       with stage("detail_parse", items=len(pages)):
+#           ...
+#   run.summary()
+
+from __future__ import annotations
+
+import itertools
+import os
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+
+from cgpe.config.tracing import TraceConfig
+from cgpe.logging.logger import setup_logger
+
+log = setup_logger(__name__)
+
+_CURRENT: ContextVar[Optional["RunTrace"]] = ContextVar("cgpe_run_trace", default=None)
+
+# top allocation sites kept from the sampled spans
+_ALLOC_TOP = 10
+
+
+@dataclass
+class StageStats:
+    # wall_s sums span durations, so concurrent spans (fetches) can add up to
+    # more than the run's wall time: it is busy time, not elapsed time
+    calls: int = 0
+    items: int = 0
+    bytes: int = 0
+    wall_s: float = 0.0
+    # thread CPU of the span; for async spans that is the whole event loop
+    # thread while the span was open
+    cpu_s: float = 0.0
+    sampled: int = 0
+    alloc_peak_kb: float = 0.0
+
+
+class RunTrace:
+    def __init__(self, source: Optional[str], config: TraceConfig) -> None:
+        self.source = source
+        self.config = config
+        self.started = time.perf_counter()
+        self.started_cpu = time.process_time()
+        self.stages: Dict[str, StageStats] = {}
+        self._lock = threading.Lock()
+        self._counters: Dict[str, Iterator[int]] = {}
+        self._profiles: List["cProfile.Profile"] = []
+        self._alloc_top: List[str] = []
+        self._tracing_depth = 0
+        # cProfile hooks are process-wide (sys.monitoring on 3.12+): one at a time
+        self._profiling = threading.Lock()
+
+    def add(
+        self,
+        name: str,
+        *,
+        wall_s: float = 0.0,
+        cpu_s: float = 0.0,
+        items: int = 0,
+        nbytes: int = 0,
+        calls: int = 1,
+    ) -> None:
+        with self._lock:
+            s = self.stages.get(name)
+            if s is None:
+                s = self.stages[name] = StageStats()
+            s.calls += calls
+            s.items += items
+            s.bytes += nbytes
+            s.wall_s += wall_s
+            s.cpu_s += cpu_s
+
+    def should_sample(self, name: str) -> bool:
+        every = self.config.sample_every
+        if every <= 0 or not (self.config.cprofile or self.config.tracemalloc):
+            return False
+        with self._lock:
+            counter = self._counters.setdefault(name, itertools.count())
+            return next(counter) % every == 0
+
+    # ---- sampled capture ----
+
+    def _start_sample(self) -> Optional["cProfile.Profile"]:
+        prof = None
+        if self.config.tracemalloc:
+            import tracemalloc
+
+            with self._lock:
+                # tracemalloc is process-wide: overlapping samples share one
+                # session and their peaks include each other's allocations
+                if self._tracing_depth == 0 and not tracemalloc.is_tracing():
+                    tracemalloc.start()
+                self._tracing_depth += 1
+            tracemalloc.reset_peak()
+        if self.config.cprofile and self._profiling.acquire(blocking=False):
+            import cProfile
+
+            prof = cProfile.Profile()
+            try:
+                prof.enable()
+            except ValueError:  # another profiler (e.g. an outer cProfile run) is active
+                self._profiling.release()
+                prof = None
+        return prof
+
+    def _end_sample(self, name: str, prof: Optional["cProfile.Profile"]) -> None:
+        if prof is not None:
+            prof.disable()
+            self._profiling.release()
+        peak_kb = 0.0
+        top: List[str] = []
+        if self.config.tracemalloc:
+            import tracemalloc
+
+            peak_kb = tracemalloc.get_traced_memory()[1] / 1024
+            with self._lock:
+                self._tracing_depth -= 1
+                last = self._tracing_depth == 0
+            if last:
+                stats = tracemalloc.take_snapshot().statistics("lineno")[:_ALLOC_TOP]
+                top = [str(s) for s in stats]
+                tracemalloc.stop()
+        with self._lock:
+            s = self.stages.setdefault(name, StageStats())
+            s.sampled += 1
+            # keep the allocation sites of the heaviest sample that closed a session
+            if top and (peak_kb >= s.alloc_peak_kb or not self._alloc_top):
+                self._alloc_top = top
+            s.alloc_peak_kb = max(s.alloc_peak_kb, peak_kb)
+            if prof is not None:
+                self._profiles.append(prof)
+
+    def dump_profile(self, path: Path) -> Optional[Path]:
+        """Merge the sampled cProfile runs into one pstats file."""
+        with self._lock:
+            profiles = list(self._profiles)
+        if not profiles:
+            return None
+        import pstats
+
+        path.parent.mkdir(parents=True, exist_ok=True)
+        stats = pstats.Stats(profiles[0])
+        for p in profiles[1:]:
+            stats.add(p)
+        stats.dump_stats(str(path))
+        return path
+
+    # ---- summary ----
+
+    @property
+    def alloc_top(self) -> List[str]:
+        return list(self._alloc_top)
+
+    def wall_s(self) -> float:
+        return time.perf_counter() - self.started
+
+    def cpu_s(self) -> float:
+        return time.process_time() - self.started_cpu
+
+    def stage(self, name: str) -> StageStats:
+        with self._lock:
+            return StageStats(**asdict(self.stages.get(name, StageStats())))
+
+    def summary(self) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            return {name: asdict(s) for name, s in sorted(self.stages.items())}
+
+
+class _Span:
+    __slots__ = ("run", "name", "items", "bytes", "sample", "_t0", "_c0", "_prof")
+
+    def __init__(self, run: RunTrace, name: str, items: int, nbytes: int, sample: bool) -> None:
+        self.run = run
+        self.name = name
+        self.items = items
+        self.bytes = nbytes
+        self.sample = sample and run.should_sample(name)
+
+    def __enter__(self) -> "_Span":
+        self._prof = self.run._start_sample() if self.sample else None
+        self._t0 = time.perf_counter()
+        self._c0 = time.thread_time()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        wall = time.perf_counter() - self._t0
+        cpu = time.thread_time() - self._c0
+        if self.sample:
+            self.run._end_sample(self.name, self._prof)
+        self.run.add(self.name, wall_s=wall, cpu_s=cpu, items=self.items, nbytes=self.bytes)
+
+
+class _NoopSpan:
+    __slots__ = ()
+    items = 0
+    bytes = 0
+
+    def __enter__(self) -> "_NoopSpan":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        pass
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        pass  # `span.items += n` outside a run
+
+
+_NOOP = _NoopSpan()
+
+
+def current_run() -> Optional[RunTrace]:
+    return _CURRENT.get()
+
+
+def stage(name: str, *, items: int = 0, nbytes: int = 0, sample: bool = False):
+    """
+    Time a block as one call of stage `name`. Set `span.items` / `span.bytes`
+    inside the block when they are only known afterwards. `sample=True`
+    marks per-item spans eligible for cProfile/tracemalloc capture.
+    """
+    run = _CURRENT.get()
+    if run is None:
+        return _NOOP
+    return _Span(run, name, items, nbytes, sample)
+
+
+def record(
+    name: str,
+    *,
+    wall_s: float = 0.0,
+    cpu_s: float = 0.0,
+    items: int = 0,
+    nbytes: int = 0,
+) -> None:
+    """Add an already-measured observation (e.g. a rate-limit wait) to the current run."""
+    run = _CURRENT.get()
+    if run is not None:
+        run.add(name, wall_s=wall_s, cpu_s=cpu_s, items=items, nbytes=nbytes)
+
+
+@contextmanager
+def trace_run(source: Optional[str], config: Optional[TraceConfig] = None) -> Iterator[RunTrace]:
+    run = RunTrace(source, config or TraceConfig.from_env())
+    token = _CURRENT.set(run)
+    try:
+        yield run
+    finally:
+        _CURRENT.reset(token)
+        if run._tracing_depth:
+            import tracemalloc
+
+            tracemalloc.stop()
+
+
+def peak_rss_kb() -> Optional[int]:
+    try:
+        import resource
+    except ImportError:  # Windows
+        return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # bytes on macOS, KiB on Linux
+    return rss // 1024 if os.uname().sysname == "Darwin" else rss
+
+
+def format_stages(summary: Dict[str, Dict[str, Any]]) -> str:
+    lines = [f"{'stage':<22} {'calls':>7} {'items':>7} {'MB':>9} {'wall s':>9} {'cpu s':>9} {'sampled':>7}"]
+    for name, s in summary.items():
+        lines.append(
+            f"{name:<22} {s['calls']:>7} {s['items']:>7} {s['bytes'] / 1e6:>9.2f} "
+            f"{s['wall_s']:>9.2f} {s['cpu_s']:>9.2f} {s['sampled']:>7}"
+        )
+    return "\n".join(lines)
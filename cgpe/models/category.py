@@ -0,0 +1,65 @@
+# cgpe/models/category.py
+
+from dataclasses import dataclass
+from typing import ClassVar, Dict, Optional
+
+
+@dataclass
+class DiscoveredSet:
+    """A set link found on a source's category page (see migration 005)."""
+
+    set_link: str
+    source: Optional[str]
+    category_link: str
+    first_seen_at: str
+    last_seen_at: str
+    # set when a crawl no longer lists the link; cleared if it comes back
+    removed_at: Optional[str] = None
+
+    # --- table metadata ---
+    TABLE: ClassVar[str] = "discovered_sets"
+
+    DDL_COLUMNS: ClassVar[Dict[str, str]] = {
+        "set_link": "TEXT NOT NULL",
+        "source": "TEXT",
+        "category_link": "TEXT NOT NULL",
+        "first_seen_at": "TEXT NOT NULL",
+        "last_seen_at": "TEXT NOT NULL",
+        "removed_at": "TEXT",
+    }
+
+    UNIQUE_CONSTRAINTS: ClassVar[list[tuple[str, ...]]] = [
+        ("set_link", "source"),
+    ]
+
+    INDEXES: ClassVar[list[tuple[str, tuple[str, ...]]]] = [
+        ("idx_discovered_sets_source_first_seen", ("source", "first_seen_at")),
+    ]
+
+    COLUMNS: ClassVar[tuple[str, ...]] = tuple(DDL_COLUMNS)
+
+
+@dataclass
+class CategoryCrawl:
+    """Last successful crawl of one category page; drives the re-crawl schedule."""
+
+    category_link: str
+    source: Optional[str]
+    crawled_at: str
+    set_count: int
+    new_sets: int
+
+    # --- table metadata ---
+    TABLE: ClassVar[str] = "category_crawls"
+
+    DDL_COLUMNS: ClassVar[Dict[str, str]] = {
+        "category_link": "TEXT NOT NULL",
+        "source": "TEXT",
+        "crawled_at": "TEXT NOT NULL",
+        "set_count": "INTEGER NOT NULL",
+        "new_sets": "INTEGER NOT NULL",
+    }
+
+    UNIQUE_CONSTRAINTS: ClassVar[list[tuple[str, ...]]] = [
+        ("category_link", "source"),
+    ]
@@ -0,0 +1,52 @@
+# cgpe/models/change.py
+
+from dataclasses import dataclass
+from typing import Any, ClassVar, Dict, Optional
+
+
+@dataclass
+class CardChange:
+    """One expected_profit change on card_details, written by triggers (see migration 002)."""
+
+    seq: int
+    card_link: str
+    source: Optional[str]
+    card_name: str
+    card_num: str
+    old_profit: Optional[float]
+    new_profit: Optional[float]
+    expected_value: Optional[float]
+    changed_at: str
+
+    # --- table metadata ---
+    TABLE: ClassVar[str] = "card_changes"
+
+    DDL_COLUMNS: ClassVar[Dict[str, str]] = {
+        "seq": "INTEGER PRIMARY KEY AUTOINCREMENT",
+        "card_link": "TEXT NOT NULL",
+        "source": "TEXT",
+        "card_name": "TEXT",
+        "card_num": "TEXT",
+        "old_profit": "REAL",
+        "new_profit": "REAL",
+        "expected_value": "REAL",
+        "changed_at": "TEXT NOT NULL",
+    }
+
+    INDEXES: ClassVar[list[tuple[str, tuple[str, ...]]]] = [
+        ("idx_card_changes_changed_at", ("changed_at",)),
+    ]
+
+    @classmethod
+    def from_db_row(cls, r: Dict[str, Any]) -> "CardChange":
+        return cls(
+            seq=r["seq"],
+            card_link=r["card_link"],
+            source=r.get("source"),
+            card_name=r.get("card_name") or "",
+            card_num=r.get("card_num") or "",
+            old_profit=r.get("old_profit"),
+            new_profit=r.get("new_profit"),
+            expected_value=r.get("expected_value"),
+            changed_at=r["changed_at"],
+        )
@@ -33,6 +33,9 @@ class Detail:
     expected_profit: Optional[float] = None
 
     scraped_at: Optional[str] = None
+    # when this row was last parsed; a re-parse of an archived page keeps the
+    # fetch time in scraped_at but still needs to look new to readers
+    parsed_at: Optional[str] = None
 
     # --- table metadata ---
     TABLE: ClassVar[str] = "card_details"
@@ -62,6 +65,7 @@ class Detail:
         "expected_value",
         "expected_profit",
         "scraped_at",
+        "parsed_at",
     )
 
     DDL_COLUMNS: ClassVar[Dict[str, str]] = {
@@ -89,6 +93,7 @@ class Detail:
         "expected_value": "REAL",
         "expected_profit": "REAL",
         "scraped_at": "TEXT NOT NULL",
+        "parsed_at": "TEXT",
     }
 
     UNIQUE_CONSTRAINTS: ClassVar[list[tuple[str, ...]]] = [
@@ -98,6 +103,8 @@ class Detail:
     INDEXES: ClassVar[list[tuple[str, tuple[str, ...]]]] = [
         ("idx_card_details_source_num", ("source", "card_num")),
         ("idx_card_details_scraped_at", ("scraped_at",)),
+        ("idx_card_details_expected_profit", ("expected_profit",)),
+        ("idx_card_details_parsed_at", ("parsed_at",)),
     ]
 
     def __post_init__(self) -> None:
@@ -131,6 +138,7 @@ class Detail:
             "expected_value": self.expected_value,
             "expected_profit": self.expected_profit,
             "scraped_at": self.scraped_at or utc_now_iso(),
+            "parsed_at": self.parsed_at or utc_now_iso(),
         }
 
     @classmethod
@@ -155,6 +163,7 @@ class Detail:
             expected_value=r.get("expected_value"),
             expected_profit=r.get("expected_profit"),
             scraped_at=r.get("scraped_at"),
+            parsed_at=r.get("parsed_at"),
         )
 
     @classmethod
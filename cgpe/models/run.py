@@ -0,0 +1,83 @@
+# cgpe/models/run.py
+
+import json
+from dataclasses import dataclass, field
+from typing import Any, ClassVar, Dict, Optional
+
+
+@dataclass
+class ScrapeRun:
+    """One summary row per backfill run (see cgpe.metrics.tracing)."""
+
+    source: Optional[str]
+    started_at: str
+    finished_at: str
+    status: str  # "ok" | "failed"
+    error: Optional[str] = None
+    release: Optional[str] = None
+
+    wall_s: float = 0.0
+    cpu_s: float = 0.0
+    peak_rss_kb: Optional[int] = None
+
+    links: int = 0  # detail links discovered
+    persisted: int = 0  # details written
+    http_requests: int = 0  # attempts, retries included
+    http_retries: int = 0
+    bytes_fetched: int = 0  # decoded response bodies
+
+    # derived, stored so reports can compare releases without recomputing
+    items_per_s: Optional[float] = None
+    bytes_per_card: Optional[float] = None
+    requests_per_card: Optional[float] = None
+
+    # {stage: {calls, items, bytes, wall_s, cpu_s, sampled, ...}}
+    stages: Dict[str, Dict[str, Any]] = field(default_factory=dict)
+    profile_path: Optional[str] = None
+    run_id: Optional[int] = None
+
+    # --- table metadata ---
+    TABLE: ClassVar[str] = "scrape_runs"
+
+    DDL_COLUMNS: ClassVar[Dict[str, str]] = {
+        "run_id": "INTEGER PRIMARY KEY AUTOINCREMENT",
+        "source": "TEXT",
+        "started_at": "TEXT NOT NULL",
+        "finished_at": "TEXT NOT NULL",
+        "status": "TEXT NOT NULL",
+        "error": "TEXT",
+        "release": "TEXT",
+        "wall_s": "REAL",
+        "cpu_s": "REAL",
+        "peak_rss_kb": "INTEGER",
+        "links": "INTEGER",
+        "persisted": "INTEGER",
+        "http_requests": "INTEGER",
+        "http_retries": "INTEGER",
+        "bytes_fetched": "INTEGER",
+        "items_per_s": "REAL",
+        "bytes_per_card": "REAL",
+        "requests_per_card": "REAL",
+        "stages_json": "TEXT",
+        "profile_path": "TEXT",
+    }
+
+    INDEXES: ClassVar[list[tuple[str, tuple[str, ...]]]] = [
+        ("idx_scrape_runs_source_started", ("source", "started_at")),
+    ]
+
+    COLUMNS: ClassVar[tuple[str, ...]] = tuple(c for c in DDL_COLUMNS if c != "run_id")
+
+    def to_db_row(self) -> Dict[str, Any]:
+        row = {c: getattr(self, c) for c in self.COLUMNS if c != "stages_json"}
+        row["stages_json"] = json.dumps(self.stages, separators=(",", ":"))
+        return row
+
+    @classmethod
+    def from_db_row(cls, r: Dict[str, Any]) -> "ScrapeRun":
+        kwargs = {c: r.get(c) for c in cls.COLUMNS if c != "stages_json"}
+        return cls(
+            **kwargs,
+            stages=json.loads(r["stages_json"]) if r.get("stages_json") else {},
+            run_id=r.get("run_id"),
+        )
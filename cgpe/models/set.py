@@ -1,11 +1,103 @@
 # cgpe/models/set.py
 
-from dataclasses import dataclass
+import hashlib
+from dataclasses import dataclass, field
 from cgpe.scrape.sources.base import SourceConfig
-from typing import List
+from typing import ClassVar, Dict, List, Optional
+
+
+def _price_key(p: Optional[float]) -> str:
+    return "" if p is None else f"{p:.2f}"
+
+
+@dataclass
+class SetProduct:
+    """One record of a set's JSON listing: enough to pre-screen before fetching the detail page."""
+    detail_link: str
+    product_id: Optional[str] = None
+    name: str = ""
+    # listing columns: Ungraded / Grade 9 / PSA 10 (None when the listing shows no price)
+    ungraded_price: Optional[float] = None
+    grade9_price: Optional[float] = None
+    psa10_price: Optional[float] = None
+
+    # --- table metadata (one row per listed product, see cgpe.storage.set_repo) ---
+    TABLE: ClassVar[str] = "set_products"
+
+    DDL_COLUMNS: ClassVar[Dict[str, str]] = {
+        "set_link": "TEXT NOT NULL",
+        "source": "TEXT",
+        "detail_link": "TEXT NOT NULL",
+        "product_id": "TEXT",
+        "name": "TEXT",
+        "ungraded_price": "REAL",
+        "grade9_price": "REAL",
+        "psa10_price": "REAL",
+        "fingerprint": "TEXT NOT NULL",
+        "first_seen_at": "TEXT NOT NULL",
+        "last_seen_at": "TEXT NOT NULL",
+        "last_changed_at": "TEXT NOT NULL",
+        # set when the product drops out of the listing; cleared if it returns
+        "removed_at": "TEXT",
+    }
+
+    UNIQUE_CONSTRAINTS: ClassVar[list[tuple[str, ...]]] = [
+        ("set_link", "source", "detail_link"),
+    ]
+
+    INDEXES: ClassVar[list[tuple[str, tuple[str, ...]]]] = [
+        ("idx_set_products_detail_link", ("detail_link",)),
+    ]
+
+    def fingerprint(self) -> str:
+        """Cheap change key over the listing fields; a new value means the card moved."""
+        key = "\x1f".join((
+            self.product_id or "", self.name,
+            _price_key(self.ungraded_price), _price_key(self.grade9_price), _price_key(self.psa10_price),
+        ))
+        return hashlib.blake2b(key.encode(), digest_size=8).hexdigest()
+
 
 @dataclass
 class SetPage:
     set_link: str
     detail_links: List[str]
     source_config: SourceConfig
+    products: List[SetProduct] = field(default_factory=list)
+
+    def fingerprint(self) -> str:
+        """Change key for the whole listing: equal values mean no product was added, removed or repriced."""
+        h = hashlib.blake2b(digest_size=8)
+        for p in self.products:
+            h.update(f"{p.detail_link}\x1f{p.fingerprint()}\x1e".encode())
+        return h.hexdigest()
+
+
+@dataclass
+class SetRecord:
+    """One row per scraped set listing (see migration 004)."""
+
+    set_link: str
+    source: Optional[str]
+    product_count: int
+    fingerprint: str
+    first_seen_at: str
+    last_seen_at: str
+    last_changed_at: str
+
+    # --- table metadata ---
+    TABLE: ClassVar[str] = "sets"
+
+    DDL_COLUMNS: ClassVar[Dict[str, str]] = {
+        "set_link": "TEXT NOT NULL",
+        "source": "TEXT",
+        "product_count": "INTEGER NOT NULL",
+        "fingerprint": "TEXT NOT NULL",
+        "first_seen_at": "TEXT NOT NULL",
+        "last_seen_at": "TEXT NOT NULL",
+        "last_changed_at": "TEXT NOT NULL",
+    }
+
+    UNIQUE_CONSTRAINTS: ClassVar[list[tuple[str, ...]]] = [
+        ("set_link", "source"),
+    ]
@@ -2,6 +2,9 @@
 
 from __future__ import annotations
 
+import asyncio
+import time
+
 import aiohttp
 from typing import Iterable, List, Union, overload
 
@@ -9,9 +12,18 @@ from cgpe.scrape.sources.base import SourceConfig
 from cgpe.scrape.pricecharting.category.parse_category import parse_category_page, CategoryPage
 from cgpe.http.client import fetch_html
 from cgpe.logging.logger import setup_logger
+from cgpe.metrics.pipeline import PARSE_SECONDS, STAGE_ITEMS, STAGE_SECONDS
+from cgpe.metrics.tracing import stage
 
 log = setup_logger(__name__)
 
+_PARSE_SECONDS = PARSE_SECONDS.labels("category")
+
+
+def _parse_one(html: str, source_config: SourceConfig) -> CategoryPage:
+    with _PARSE_SECONDS.time():
+        return parse_category_page(html=html, source_config=source_config)
+
 
 @overload
 async def run_category_pipeline(
@@ -36,17 +48,22 @@ async def run_category_pipeline(
     many = isinstance(source_config, Iterable) and not isinstance(source_config, (str, bytes))
     configs = list(source_config) if many else [source_config]  # type: ignore[list-item]
 
-    pages: List[CategoryPage] = []
-    for cfg in configs:
-        log.debug("Fetching category page: %s", cfg.category_link)
-
-        html = await fetch_html(session, url=cfg.category_link)
+    # 1) fetch every category page at once
+    t0 = time.perf_counter()
+    with stage("category_fetch", items=len(configs)):
+        htmls: List[str] = await asyncio.gather(
+            *(fetch_html(session, url=cfg.category_link) for cfg in configs)
+        )
+    STAGE_SECONDS.labels("category_fetch").observe(time.perf_counter() - t0)
+    STAGE_ITEMS.labels("category_fetch", "ok").inc(len(htmls))
 
-        pages.append(
-            parse_category_page(
-                html=html,
-                source_config=cfg,
-            )
+    # 2) parse off the event loop
+    t0 = time.perf_counter()
+    with stage("category_parse", items=len(configs)):
+        pages: List[CategoryPage] = await asyncio.gather(
+            *(asyncio.to_thread(_parse_one, html, cfg) for html, cfg in zip(htmls, configs))
         )
+    STAGE_SECONDS.labels("category_parse").observe(time.perf_counter() - t0)
+    STAGE_ITEMS.labels("category_parse", "ok").inc(len(pages))
 
     return pages if many else pages[0]
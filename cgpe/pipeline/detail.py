@@ -1,22 +1,62 @@
 # cgpe/pipeline/detail.py
 
 import asyncio
-from typing import List, Sequence, Union, overload
+import time
+from typing import List, Optional, Sequence, Union, overload
 
 import aiohttp
 
-from cgpe.http.client import fetch_html
-from cgpe.scrape.pricecharting.detail.parse_detail import Detail, parse_detail_page
+from cgpe.config.scraper import ScraperConfig
+from cgpe.http.client import fetch_bytes
+from cgpe.scrape.pricecharting.detail.parse_detail import Detail, detail_scanner, parse_detail_page
 from cgpe.scrape.sources.base import SourceConfig
 from cgpe.logging.logger import setup_logger
+from cgpe.metrics.pipeline import PARSE_SECONDS, STAGE_ITEMS, STAGE_PENDING, STAGE_SECONDS
+from cgpe.metrics.tracing import stage
+from cgpe.storage.page_archive import PageArchive
 
 log = setup_logger(__name__)
 
+scraper_config = ScraperConfig.from_env()
+
+_FETCH_OK = STAGE_ITEMS.labels("detail_fetch", "ok")
+_FETCH_FAILED = STAGE_ITEMS.labels("detail_fetch", "failed")
+_FETCH_PENDING = STAGE_PENDING.labels("detail_fetch")
+_PARSE_OK = STAGE_ITEMS.labels("detail_parse", "ok")
+_PARSE_PENDING = STAGE_PENDING.labels("detail_parse")
+_PARSE_SECONDS = PARSE_SECONDS.labels("detail")
+
+
+async def _fetch_one(session: aiohttp.ClientSession, link: str, stream: bool) -> bytes:
+    try:
+        return await fetch_bytes(
+            session, url=link,
+            stop_when=detail_scanner if stream else None,
+            min_skip_bytes=scraper_config.stream_min_skip_kb * 1024,
+        )
+    finally:
+        _FETCH_PENDING.dec()
+
+
+def _parse_one(html: bytes, link: str, source_config: SourceConfig, archive: Optional[PageArchive]) -> Detail:
+    try:
+        if archive is not None:
+            with stage("archive_put", items=1, nbytes=len(html)):
+                archive.put(link, html, source=source_config.source)
+        with _PARSE_SECONDS.time(), stage("parse_detail_page", items=1, nbytes=len(html), sample=True):
+            detail = parse_detail_page(html=html, card_link=link, source_config=source_config)
+        _PARSE_OK.inc()
+        return detail
+    finally:
+        _PARSE_PENDING.dec()
+
+
 @overload
 async def run_detail_pipeline(
     session: aiohttp.ClientSession,
     source_config: SourceConfig,
     detail_link: str,
+    archive: Optional[PageArchive] = None,
 ) -> Detail: ...
 
 
@@ -25,6 +65,7 @@ async def run_detail_pipeline(
     session: aiohttp.ClientSession,
     source_config: SourceConfig,
     detail_link: Sequence[str],
+    archive: Optional[PageArchive] = None,
 ) -> List[Detail]: ...
 
 
@@ -32,38 +73,51 @@ async def run_detail_pipeline(
     session: aiohttp.ClientSession,
     source_config: SourceConfig,
     detail_link: Union[str, Sequence[str]],
+    archive: Optional[PageArchive] = None,
 ) -> Union[Detail, List[Detail]]:
+    """
+    `archive`: also store each fetched body there (before parsing, so pages
+    that fail to parse are kept). Archived pages are always fetched whole:
+    a streamed body stops after the sections today's parser reads, and a
+    re-parse for a new field needs the rest.
+    """
 
     many_links = isinstance(detail_link, Sequence) and not isinstance(detail_link, (str, bytes))
     links: List[str] = list(detail_link) if many_links else [detail_link]  # type: ignore[list-item]
 
     log.info("Running detail pipeline for %d links", len(links))
+    stream = scraper_config.stream_detail_pages and archive is None
 
     # 1) fetch ALL pages at once
-    results = await asyncio.gather(
-        *(fetch_html(session, url=l) for l in links),
-        return_exceptions=True,
-    )
+    t0 = time.perf_counter()
+    _FETCH_PENDING.inc(len(links))
+    with stage("detail_fetch", items=len(links)):
+        results = await asyncio.gather(
+            *(_fetch_one(session, l, stream) for l in links),
+            return_exceptions=True,
+        )
+    STAGE_SECONDS.labels("detail_fetch").observe(time.perf_counter() - t0)
 
     html_pages = []
     for link, r in zip(links, results):
         if isinstance(r, Exception):
+            _FETCH_FAILED.inc()
             log.warning("Failed to fetch %s: %r", link, r)
         else:
-            html_pages.append(r)
+            _FETCH_OK.inc()
+            html_pages.append((link, r))
 
     # 2) parse ALL at once
-    details: List[Detail] = await asyncio.gather(
-        *(
-            asyncio.to_thread(
-                parse_detail_page,
-                html=html,
-                card_link=link,
-                source_config=source_config,
+    t0 = time.perf_counter()
+    _PARSE_PENDING.inc(len(html_pages))
+    with stage("detail_parse", items=len(html_pages)):
+        details: List[Detail] = await asyncio.gather(
+            *(
+                asyncio.to_thread(_parse_one, html, link, source_config, archive)
+                for link, html in html_pages
             )
-            for link, html in zip(links, html_pages)
         )
-    )
+    STAGE_SECONDS.labels("detail_parse").observe(time.perf_counter() - t0)
 
     if not many_links:
         return details[0]
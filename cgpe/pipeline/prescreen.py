@@ -0,0 +1,134 @@
+# cgpe/pipeline/prescreen.py
+#
+# Between the set and detail pipelines: the set listing already carries each
+# card's Ungraded / Grade 9 / PSA 10 prices, which bound what grading it can
+# return. Expected value is a population-weighted mean of graded prices, so it
+# never exceeds the best of them; a card whose profit is negative even at that
+# ceiling cannot clear the grading cost and its detail page is not fetched.
+
+import sqlite3
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from typing import List, Optional, Sequence
+
+from cgpe.analysis.profit_analysis import calculate_profit
+from cgpe.config.prescreen import PrescreenConfig
+from cgpe.logging.logger import setup_logger
+from cgpe.metrics.pipeline import STAGE_ITEMS
+from cgpe.metrics.tracing import stage
+from cgpe.models.set import SetProduct
+from cgpe.storage.detail_repo import get_details_by_links
+from cgpe.storage.set_repo import first_listed_at
+
+log = setup_logger(__name__)
+
+
+@dataclass
+class PrescreenResult:
+    # detail links to fetch, in listing order
+    links: List[str] = field(default_factory=list)
+    passed: int = 0
+    # no usable listing prices; fetched since nothing rules them out
+    unpriced: int = 0
+    # screened out but due for the periodic sweep
+    swept: int = 0
+    skipped: int = 0
+
+
+def profit_upper_bound(product: SetProduct, margin: float = 0.0) -> Optional[float]:
+    """Best-case grading profit from listing prices; None when they can't bound it."""
+    graded = [p for p in (product.grade9_price, product.psa10_price) if p is not None]
+    if product.ungraded_price is None or not graded:
+        return None
+    return calculate_profit(
+        ungraded_price=product.ungraded_price * (1 - margin),
+        expected_value=max(graded) * (1 + margin),
+    )
+
+
+def stale_links(
+    conn: Optional[sqlite3.Connection],
+    links: Sequence[str],
+    source: Optional[str],
+    interval_hours: float,
+) -> set[str]:
+    """
+    The links last swept more than `interval_hours` ago: their stored detail
+    row is that old or, never fetched, they were first listed (set_products)
+    that long ago. Links with neither are new and not stale.
+    """
+    if conn is None or not links:
+        return set()
+    cutoff = datetime.now(timezone.utc) - timedelta(hours=interval_hours)
+    rows = get_details_by_links(conn, links, source=source, columns=("card_link", "scraped_at"))
+    swept_at = {link: row["scraped_at"] for link, row in rows.items()}
+    swept_at.update(first_listed_at(conn, [l for l in links if l not in rows], source=source))
+    due = set()
+    for link, ts in swept_at.items():
+        try:
+            swept = datetime.fromisoformat(ts)
+        except (TypeError, ValueError):
+            due.add(link)
+            continue
+        if swept.tzinfo is None:
+            swept = swept.replace(tzinfo=timezone.utc)
+        if swept < cutoff:
+            due.add(link)
+    return due
+
+
+def prescreen_products(
+    products: Sequence[SetProduct],
+    config: Optional[PrescreenConfig] = None,
+    *,
+    conn: Optional[sqlite3.Connection] = None,
+    source: Optional[str] = None,
+) -> PrescreenResult:
+    """
+    Pick the detail links worth fetching. `conn` (the run's DB) enables the
+    sweep: screened-out cards not swept within the sweep interval are fetched
+    anyway, so stored rows don't go stale and cards screened out since their
+    first listing (kept in set_products when diffing sets) still get checked.
+    """
+    config = config or PrescreenConfig.from_env()
+    result = PrescreenResult()
+
+    with stage("prescreen", items=len(products)):
+        if not config.enabled:
+            result.links = [p.detail_link for p in products]
+            result.passed = len(products)
+            return result
+
+        keep: dict[str, bool] = {}
+        rejected: List[str] = []
+        for product in products:
+            bound = profit_upper_bound(product, config.margin)
+            if bound is None:
+                result.unpriced += 1
+                keep[product.detail_link] = True
+            elif bound >= config.min_profit:
+                result.passed += 1
+                keep[product.detail_link] = True
+            else:
+                keep.setdefault(product.detail_link, False)
+                rejected.append(product.detail_link)
+
+        # a link listed twice only counts as rejected if no listing of it passed
+        rejected = [link for link in dict.fromkeys(rejected) if not keep[link]]
+        due = stale_links(conn, rejected, source, config.sweep_interval_hours)
+        for link in rejected:
+            if link in due:
+                keep[link] = True
+        result.swept = len(due)
+        result.skipped = len(rejected) - len(due)
+        result.links = [link for link, ok in keep.items() if ok]
+
+    STAGE_ITEMS.labels("prescreen", "passed").inc(result.passed)
+    STAGE_ITEMS.labels("prescreen", "unpriced").inc(result.unpriced)
+    STAGE_ITEMS.labels("prescreen", "swept").inc(result.swept)
+    STAGE_ITEMS.labels("prescreen", "skipped").inc(result.skipped)
+    log.info(
+        "Pre-screen: %d of %d cards queued for detail fetch (%d passed, %d unpriced, %d swept), %d skipped",
+        len(result.links), len(products), result.passed, result.unpriced, result.swept, result.skipped,
+    )
+    return result
@@ -1,6 +1,7 @@
 # cgpe/pipeline/set.py
 
 import asyncio
+import time
 from typing import List, Sequence, Union, overload
 
 import aiohttp
@@ -8,6 +9,15 @@ import aiohttp
 from cgpe.scrape.sources.base import SourceConfig
 from cgpe.scrape.pricecharting.set.fetch_set import fetch_set_json_pages
 from cgpe.scrape.pricecharting.set.parse_set import parse_set_data, SetPage
+from cgpe.metrics.pipeline import PARSE_SECONDS, STAGE_ITEMS, STAGE_SECONDS
+from cgpe.metrics.tracing import stage
+
+_PARSE_SECONDS = PARSE_SECONDS.labels("set")
+
+
+def _parse_one(data: List[dict], set_link: str, source_config: SourceConfig) -> SetPage:
+    with _PARSE_SECONDS.time():
+        return parse_set_data(data=data, set_link=set_link, source_config=source_config)
 
 @overload
 async def run_set_pipeline(
@@ -35,22 +45,26 @@ async def run_set_pipeline(
     urls: List[str] = list(set_url) if many_urls else [set_url]  # type: ignore[list-item]
 
     # 1) fetch ALL sets at once
-    datas: List[List[dict]] = await asyncio.gather(
-        *(fetch_set_json_pages(session=session, set_url=url) for url in urls)
-    )
+    t0 = time.perf_counter()
+    with stage("set_fetch") as span:
+        datas: List[List[dict]] = await asyncio.gather(
+            *(fetch_set_json_pages(session=session, set_url=url) for url in urls)
+        )
+        span.items = sum(len(d) for d in datas)
+    STAGE_SECONDS.labels("set_fetch").observe(time.perf_counter() - t0)
+    STAGE_ITEMS.labels("set_fetch", "ok").inc(len(datas))
 
     # 2) parse ALL at once
-    parsed: List[List[dict]] = await asyncio.gather(
-        *(
-            asyncio.to_thread(
-                parse_set_data,
-                data=data,
-                set_link=url,
-                source_config=source_config,
+    t0 = time.perf_counter()
+    with stage("set_parse", items=len(urls)):
+        parsed: List[List[dict]] = await asyncio.gather(
+            *(
+                asyncio.to_thread(_parse_one, data, url, source_config)
+                for url, data in zip(urls, datas)
             )
-            for url, data in zip(urls, datas)
         )
-    )
+    STAGE_SECONDS.labels("set_parse").observe(time.perf_counter() - t0)
+    STAGE_ITEMS.labels("set_parse", "ok").inc(len(parsed))
 
     if not many_urls:
         return parsed[0]
@@ -0,0 +1,57 @@
+# cgpe/pipeline/set_diff.py
+#
+# Between the set pipeline and the pre-screen: compare each fetched listing
+# with the catalog stored by the last run (cgpe.storage.set_repo) so routine
+# refreshes only queue the cards that are new or whose listing moved.
+
+import sqlite3
+from typing import List, Optional, Sequence
+
+from cgpe.logging.logger import setup_logger
+from cgpe.metrics.pipeline import STAGE_ITEMS
+from cgpe.metrics.tracing import stage
+from cgpe.models.set import SetPage, SetProduct
+from cgpe.pipeline.prescreen import stale_links
+from cgpe.storage.set_repo import SetDiff, diff_set_page
+
+log = setup_logger(__name__)
+
+
+def diff_set_pages(
+    conn: sqlite3.Connection,
+    set_pages: Sequence[SetPage],
+    *,
+    source: Optional[str],
+) -> List[SetDiff]:
+    with stage("set_diff", items=sum(len(p.products) for p in set_pages)):
+        diffs = [diff_set_page(conn, page, source=source) for page in set_pages]
+
+    new = sum(len(d.new) for d in diffs)
+    changed = sum(len(d.changed) for d in diffs)
+    unchanged = sum(len(d.unchanged) for d in diffs)
+    removed = sum(len(d.removed) for d in diffs)
+    STAGE_ITEMS.labels("set_diff", "new").inc(new)
+    STAGE_ITEMS.labels("set_diff", "changed").inc(changed)
+    STAGE_ITEMS.labels("set_diff", "unchanged").inc(unchanged)
+    STAGE_ITEMS.labels("set_diff", "removed").inc(removed)
+    log.info(
+        "Set diff over %d sets: %d new, %d changed, %d unchanged, %d removed",
+        len(diffs), new, changed, unchanged, removed,
+    )
+    return diffs
+
+
+def moved_products(
+    conn: sqlite3.Connection,
+    diffs: Sequence[SetDiff],
+    *,
+    source: Optional[str],
+    sweep_interval_hours: float,
+) -> List[SetProduct]:
+    """
+    New and changed products, plus unchanged ones not swept within the sweep
+    interval (sales and population move without the listing; see stale_links).
+    """
+    unchanged = [p for d in diffs for p in d.unchanged]
+    stale = stale_links(conn, [p.detail_link for p in unchanged], source, sweep_interval_hours)
+    return [p for d in diffs for p in d.moved] + [p for p in unchanged if p.detail_link in stale]
@@ -0,0 +1,7 @@
+# cgpe/scrape/index/pokemon_sets.py
+#
+# Pinned set links for POKEMON_PRICECHARTING. Leave empty to scrape every set
+# discovered from the category page (cgpe.services.discover_sets); list links
+# here only to restrict a run to them.
+
+set_links_to_scrape: list[str] = []
@@ -5,7 +5,7 @@ from urllib.parse import urlencode
 import aiohttp
 import json
 
-from cgpe.http.client import fetch_html
+from cgpe.http.client import fetch_bytes
 from cgpe.logging.logger import setup_logger
 from cgpe.config.scraper import ScraperConfig
 
@@ -21,11 +21,10 @@ async def fetch_json_list(
 
     full_url = f"{url}?{urlencode(params)}"
     log.debug("Fetching JSON data from: %s", full_url)
-    data = await fetch_html(session, full_url)
-   
-    data = '[' + data + ']'  # Wrap in list to ensure consistent shape
-    data = json.loads(data)
-    data = data[0]['products']
+    body = await fetch_bytes(session, full_url)
+
+    # json.loads decodes utf-8 bytes itself; no str copy of the page
+    data = json.loads(body)['products']
 
     if not data:
         return []
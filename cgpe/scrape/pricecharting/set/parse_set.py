@@ -1,10 +1,10 @@
 # cgpe/scrape/pricecharting/set/parse_set.py
 
-from typing import List
+from typing import Any, List, Optional
 from bs4 import BeautifulSoup
 from urllib.parse import urljoin
 
-from cgpe.models.set import SetPage
+from cgpe.models.set import SetPage, SetProduct
 from cgpe.scrape.sources.base import SourceConfig
 from cgpe.logging.logger import setup_logger
 
@@ -17,6 +17,21 @@ log = setup_logger(__name__)
 def clean_set_name(text: str) -> str:
     return text.strip()
 
+def parse_listing_price(value: Any) -> Optional[float]:
+    """'$1,234.56' / 1234.56 -> 1234.56; '', '-' and missing -> None."""
+    if value is None or isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float)):
+        return float(value)
+    t = str(value).strip().replace("$", "").replace(",", "")
+    if not t or t == "-":
+        return None
+    try:
+        return float(t)
+    except ValueError:
+        log.debug("Failed to parse listing price: %r", value)
+        return None
+
 
 # -----------------------------
 # Extractors (raw -> structured)
@@ -53,6 +68,7 @@ def parse_set_data(
     log.debug("Set JSON size: %d records", len(data))
 
     detail_links: List[str] = []
+    products: List[SetProduct] = []
     for obj in data:
         detail_link = urljoin(set_link + "/", obj.get("productUri", ""))
         if detail_link == set_link:
@@ -62,9 +78,20 @@ def parse_set_data(
         detail_link = detail_link.replace("/console/", "/game/")
         detail_links.append(detail_link)
 
+        # price columns of the set table: price1 ungraded, price2 grade 9, price3 PSA 10
+        products.append(SetProduct(
+            detail_link=detail_link,
+            product_id=str(obj["id"]) if obj.get("id") is not None else None,
+            name=obj.get("productName") or "",
+            ungraded_price=parse_listing_price(obj.get("price1")),
+            grade9_price=parse_listing_price(obj.get("price2")),
+            psa10_price=parse_listing_price(obj.get("price3")),
+        ))
+
     log.info("Parsed %d detail links from %s", len(detail_links), set_link)
     return SetPage(
         set_link=set_link,
         detail_links=detail_links,
         source_config=source_config,
+        products=products,
     )
\ No newline at end of file
@@ -0,0 +1,169 @@
+# cgpe/scripts/check_import_time.py
+#
+# Import-time budget for the entry points. Fails (exit 1) when an entry point
+# pulls in more modules than its recorded budget, got slower relative to a
+# stdlib reference import measured in the same run, eagerly imports a
+# dependency that must stay lazy, or touches the filesystem on import.
+#
+# Budgets are machine-independent: module counts are net of a bare
+# interpreter (`-c pass`, so site/.pth startup imports cancel out) and times
+# are a multiple of the reference import, not milliseconds. The module count
+# is exact and catches most regressions; the time ratio is the looser net for
+# a module that got slow without new imports.
+#
+#   python -m cgpe.scripts.check_import_time            # check
+#   python -m cgpe.scripts.check_import_time --update   # re-record budgets
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+from typing import Dict, List, Sequence, Tuple
+
+REPO_ROOT = Path(__file__).resolve().parents[2]
+BUDGET_FILE = Path(__file__).with_name("import_budget.json")
+
+ENTRY_POINTS = ("cgpe.web.app", "cgpe.services.backfill_sets")
+
+# stdlib imports timed alongside the entry points; a slower machine or a cold
+# disk slows both, so the ratio stays put
+REFERENCE = ("asyncio", "json", "sqlite3", "email.parser", "http.client", "decimal")
+
+# only needed on specific call paths; importing them up front is a regression
+MUST_STAY_LAZY = ("browserforge", "rapidfuzz")
+
+
+def _import_once(modules: Sequence[str]) -> Tuple[float, int, List[Tuple[int, str]], List[str], bool]:
+    """
+    One fresh interpreter importing `modules`: (cumulative ms of the
+    top-level imports, modules loaded, [(self_us, name)], lazy modules
+    loaded, created files?).
+    """
+    imports = f"import {', '.join(modules)}; " if modules else ""
+    probe = f"import sys; {imports}print(','.join(m for m in {MUST_STAY_LAZY!r} if m in sys.modules))"
+    with tempfile.TemporaryDirectory(prefix="cgpe-import-") as cwd:
+        env = {**os.environ, "PYTHONPATH": str(REPO_ROOT), "PYTHONDONTWRITEBYTECODE": "1"}
+        proc = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", probe],
+            cwd=cwd, env=env, capture_output=True, text=True,
+        )
+        created = any(Path(cwd).iterdir())
+
+    if proc.returncode != 0:
+        raise SystemExit(f"import {', '.join(modules)} failed:\n{proc.stderr[-2000:]}")
+
+    total_us = 0
+    selfs: List[Tuple[int, str]] = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cum_us, name = (p.strip(" ") for p in line[len("import time:"):].split("|", 2))
+        selfs.append((int(self_us), name.strip()))
+        # nested imports are indented; only top-level ones add up without double counting
+        if name.strip() in modules and not name.startswith(" "):
+            total_us += int(cum_us)
+
+    lazy_loaded = [m for m in proc.stdout.strip().split(",") if m]
+    return total_us / 1000.0, len(selfs), selfs, lazy_loaded, created
+
+
+def measure(probes: Dict[str, Sequence[str]], runs: int) -> Dict[str, Dict[str, object]]:
+    """
+    Time every probe once per round, interleaved, keeping each one's fastest
+    run: load on the box shifts a whole round, so the ratios between probes
+    hold even when absolute times don't.
+    """
+    best: Dict[str, Dict[str, object]] = {
+        label: {"ms": float("inf"), "modules": 0, "top_self": [], "lazy_loaded": [], "created_files": False}
+        for label in probes
+    }
+    # warm-up round: the first interpreter pays for a cold page cache
+    for modules in probes.values():
+        _import_once(modules)
+    for _ in range(runs):
+        for label, modules in probes.items():
+            ms, n_modules, selfs, lazy, made = _import_once(modules)
+            r = best[label]
+            r["modules"], r["lazy_loaded"] = n_modules, lazy
+            r["created_files"] = r["created_files"] or made
+            if ms < r["ms"]:
+                r["ms"], r["top_self"] = ms, sorted(selfs, reverse=True)[:8]
+    return best
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="Import-time budget check")
+    ap.add_argument("--runs", type=int, default=5, help="fresh interpreters per entry point (min is used)")
+    ap.add_argument(
+        "--tolerance", type=float, default=0.5,
+        help="allowed slowdown over the relative time budget (0.5 = +50%%; the ratio still moves ~25%% on a loaded box)",
+    )
+    ap.add_argument(
+        "--module-tolerance", type=float, default=0.05,
+        help="allowed growth over the module budget (0.05 = +5%%, room for dependency patch releases)",
+    )
+    ap.add_argument("--update", action="store_true", help=f"write the measured budgets to {BUDGET_FILE.name}")
+    args = ap.parse_args()
+
+    budgets: Dict[str, Dict[str, float]] = {}
+    if BUDGET_FILE.exists() and not args.update:
+        budgets = json.loads(BUDGET_FILE.read_text())
+    failures: List[str] = []
+    measured: Dict[str, Dict[str, float]] = {}
+
+    results = measure({"": (), "reference": REFERENCE, **{m: (m,) for m in ENTRY_POINTS}}, args.runs)
+    startup = results[""]["modules"]
+    ref = results["reference"]
+    print(f"reference ({', '.join(REFERENCE)}): {ref['ms']:.1f} ms; bare interpreter: {startup} modules")
+
+    for module in ENTRY_POINTS:
+        r = results[module]
+        modules = r["modules"] - startup
+        ratio = r["ms"] / ref["ms"]
+        measured[module] = {"modules": modules, "x_reference": round(ratio, 2)}
+        budget = budgets.get(module, {})
+
+        status = "ok"
+        if "modules" in budget and modules > budget["modules"] * (1 + args.module_tolerance):
+            status = "HEAVY"
+            failures.append(
+                f"{module}: imports {modules} modules > budget {budget['modules']} +{args.module_tolerance:.0%}"
+            )
+        if "x_reference" in budget and ratio > budget["x_reference"] * (1 + args.tolerance):
+            status = "SLOW"
+            failures.append(
+                f"{module}: {ratio:.2f}x reference > budget {budget['x_reference']:.2f}x +{args.tolerance:.0%}"
+            )
+        if r["lazy_loaded"]:
+            status = "EAGER"
+            failures.append(f"{module}: imports {', '.join(r['lazy_loaded'])} eagerly")
+        if r["created_files"]:
+            status = "SIDE EFFECT"
+            failures.append(f"{module}: creates files in the working directory on import")
+
+        print(
+            f"{module:<32} {r['ms']:>8.1f} ms = {ratio:>5.2f}x ref (budget {budget.get('x_reference', '-')}x)  "
+            f"{modules:>5} modules (budget {budget.get('modules', '-')})  {status}"
+        )
+        for self_us, name in r["top_self"]:
+            print(f"    {self_us / 1000:>7.1f} ms  {name}")
+
+    if args.update:
+        BUDGET_FILE.write_text(json.dumps(measured, indent=2) + "\n")
+        print(f"wrote {BUDGET_FILE}")
+        return
+
+    if failures:
+        print("\nimport-time check failed:")
+        for f in failures:
+            print(f"  - {f}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+# cgpe/scripts/export_db.py
+#
+# Stream card_details to NDJSON / CSV without loading the table into memory.
+#
+#   python -m cgpe.scripts.export_db --format csv --columns card_link,card_name,expected_profit \
+#       --min-profit 20 --gzip --out profitable.csv.gz
+
+import argparse
+import sys
+
+from cgpe.config.storage import StorageConfig
+from cgpe.storage.queries.export import EXPORT_FORMATS, ExportFilters, export_stream
+from cgpe.storage.sqlite_db import connect_reader
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="Export card_details")
+    ap.add_argument("--format", choices=EXPORT_FORMATS, default="ndjson")
+    ap.add_argument("--columns", help="comma separated column projection (default: all)")
+    ap.add_argument("--source")
+    ap.add_argument("--set-link")
+    ap.add_argument("--min-profit", type=float)
+    ap.add_argument("--since", help="only rows scraped at/after this ISO timestamp")
+    ap.add_argument("--gzip", action="store_true")
+    ap.add_argument("--chunk-size", type=int, default=1000)
+    ap.add_argument("--out", help="output file (default: stdout)")
+    args = ap.parse_args()
+
+    conn = connect_reader(StorageConfig.from_env())
+    out = open(args.out, "wb") if args.out else sys.stdout.buffer
+    try:
+        for chunk in export_stream(
+            conn,
+            fmt=args.format,
+            columns=args.columns.split(",") if args.columns else None,
+            filters=ExportFilters(
+                source=args.source,
+                set_link=args.set_link,
+                min_profit=args.min_profit,
+                scraped_since=args.since,
+            ),
+            gzip=args.gzip,
+            chunk_size=args.chunk_size,
+        ):
+            out.write(chunk)
+    finally:
+        if args.out:
+            out.close()
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
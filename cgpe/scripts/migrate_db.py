@@ -0,0 +1,42 @@
+# cgpe/scripts/migrate_db.py
+#
+# Run schema migrations ahead of a deploy (with progress), instead of
+# letting the first web worker do it on startup.
+
+from cgpe.config.storage import StorageConfig
+from cgpe.storage.migrations import current_version, latest_version, migrate
+from cgpe.storage.shards import list_shard_paths
+from cgpe.storage.sqlite_db import connect_sqlite
+
+
+def _progress(label: str, done: int, total: int) -> None:
+    pct = 100.0 * done / total if total else 100.0
+    print(f"  {label}: {done}/{total} ({pct:.1f}%)", flush=True)
+
+
+def _migrate_one(conn, name: str) -> None:
+    before = current_version(conn)
+    after = migrate(conn, progress=_progress)
+    print(f"{name}: schema v{before} -> v{after}")
+
+
+def main() -> None:
+    storage = StorageConfig.from_env()
+    print(f"Latest schema version: {latest_version()}")
+
+    conn = connect_sqlite(storage.db_path)
+    try:
+        _migrate_one(conn, storage.db_path)
+    finally:
+        conn.close()
+
+    for path in list_shard_paths(storage):
+        conn = connect_sqlite(path)
+        try:
+            _migrate_one(conn, str(path))
+        finally:
+            conn.close()
+
+
+if __name__ == "__main__":
+    main()
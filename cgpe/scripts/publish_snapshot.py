@@ -0,0 +1,26 @@
+# cgpe/scripts/publish_snapshot.py
+
+from pathlib import Path
+
+from cgpe.config.storage import StorageConfig
+from cgpe.storage.snapshot import publish_snapshot, snapshot_path_for
+from cgpe.storage.sqlite_db import connect_sqlite
+
+
+def main() -> None:
+    storage = StorageConfig.from_env()
+    if not Path(storage.db_path).exists():
+        print(f"Database not found at {storage.db_path}")
+        return
+
+    conn = connect_sqlite(storage.db_path)
+    try:
+        path = publish_snapshot(conn, snapshot_path_for(storage.db_path))
+    finally:
+        conn.close()
+
+    print(f"Snapshot published: {path.resolve()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+# cgpe/scripts/query_report.py
+#
+# Query latency report.
+#
+#   python -m cgpe.scripts.query_report                 # replay the web read paths against the DB
+#   python -m cgpe.scripts.query_report --url http://localhost:8000   # report from a running app
+#
+# --url needs the app's admin token (CGPE_ADMIN_TOKEN, read from the env/.env).
+
+import argparse
+import json
+import urllib.request
+
+from cgpe.config.storage import StorageConfig
+from cgpe.config.web import WebConfig
+from cgpe.storage.detail_repo import get_detail_by_link
+from cgpe.storage.profiling import PROFILER
+from cgpe.storage.queries.web_search import search_card_details
+from cgpe.storage.sqlite_db import connect_reader
+from cgpe.web.services.profit_board import iter_all_details, top_by_profit
+
+
+def replay_web_workload(storage: StorageConfig, *, samples: int) -> None:
+    conn = connect_reader(storage)
+    try:
+        sample = conn.execute(
+            "SELECT card_link, source, card_name, card_num FROM card_details ORDER BY RANDOM() LIMIT ?;",
+            (samples,),
+        ).fetchall()
+
+        for r in sample:
+            get_detail_by_link(conn, card_link=r["card_link"])
+            get_detail_by_link(conn, card_link=r["card_link"], source=r["source"])
+            search_card_details(conn=conn, q=r["card_name"])
+            search_card_details(conn=conn, q=f"{r['card_name']} {r['card_num']}")
+
+        for source in {None, *(r["source"] for r in sample)}:
+            _, rows = iter_all_details(conn, source=source)
+            top_by_profit(rows, limit=100)
+    finally:
+        conn.close()
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="SQL latency report")
+    ap.add_argument("--url", help="base URL of a running web app (reads its /admin/queries)")
+    ap.add_argument("--samples", type=int, default=25, help="cards to replay lookups/searches for")
+    ap.add_argument("--top", type=int, default=20)
+    ap.add_argument("--json", action="store_true", help="raw JSON instead of the text table")
+    args = ap.parse_args()
+
+    if args.url:
+        token = WebConfig.from_env().admin_token
+        if not token:
+            raise SystemExit("--url needs CGPE_ADMIN_TOKEN (the app serves /admin/* only with a token set)")
+        fmt = "json" if args.json else "text"
+        req = urllib.request.Request(
+            f"{args.url.rstrip('/')}/admin/queries?format={fmt}&top={args.top}",
+            headers={"Authorization": f"Bearer {token}"},
+        )
+        with urllib.request.urlopen(req) as resp:
+            print(resp.read().decode("utf-8"))
+        return
+
+    # must be on before any connection is opened
+    PROFILER.enabled = True
+    replay_web_workload(StorageConfig.from_env(), samples=args.samples)
+
+    if args.json:
+        print(json.dumps(PROFILER.snapshot(), indent=2))
+    else:
+        print(PROFILER.report_text(top=args.top))
+
+
+if __name__ == "__main__":
+    main()
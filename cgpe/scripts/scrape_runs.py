@@ -0,0 +1,61 @@
+# cgpe/scripts/scrape_runs.py
+#
+# Recent backfill runs from the scrape_runs ledger, to compare throughput
+# across releases.
+#
+#   python -m cgpe.scripts.scrape_runs --limit 10
+#   python -m cgpe.scripts.scrape_runs --stages        # per-stage breakdown of the latest run
+
+import argparse
+
+from cgpe.bench.common import format_table
+from cgpe.config.storage import StorageConfig
+from cgpe.metrics.tracing import format_stages
+from cgpe.storage.run_repo import recent_runs
+from cgpe.storage.shards import writer_db_path
+from cgpe.storage.sqlite_db import connect_sqlite
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="Show recent scrape runs")
+    ap.add_argument("--limit", type=int, default=20)
+    ap.add_argument("--source", default=None, help="filter by source (and pick its shard when sharded)")
+    ap.add_argument("--stages", action="store_true", help="print the per-stage table of the newest run")
+    args = ap.parse_args()
+
+    storage = StorageConfig.from_env()
+    conn = connect_sqlite(writer_db_path(storage, args.source))
+    try:
+        runs = recent_runs(conn, limit=args.limit, source=args.source)
+    finally:
+        conn.close()
+
+    if not runs:
+        print("No scrape runs recorded.")
+        return
+
+    rows = [
+        {
+            "run": r.run_id,
+            "started": r.started_at[:19],
+            "release": r.release or "-",
+            "status": r.status,
+            "cards": r.persisted,
+            "wall_s": r.wall_s,
+            "cards_per_s": r.items_per_s or 0.0,
+            "req_per_card": r.requests_per_card or 0.0,
+            "kb_per_card": (r.bytes_per_card or 0.0) / 1024,
+            "retries": r.http_retries,
+            "peak_rss_mb": (r.peak_rss_kb or 0) / 1024,
+        }
+        for r in runs
+    ]
+    print(format_table(rows, list(rows[0])))
+
+    if args.stages:
+        print(f"\nrun {runs[0].run_id} stages:")
+        print(format_stages(runs[0].stages))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,46 @@
+# cgpe/scripts/split_shards.py
+#
+# One-off migration from the single working DB to per-source shard files.
+
+from pathlib import Path
+
+from cgpe.config.storage import StorageConfig
+from cgpe.models.detail import Detail
+from cgpe.storage.shards import connect_shard, shard_path
+from cgpe.storage.sqlite_db import connect_sqlite
+
+
+def main() -> None:
+    storage = StorageConfig.from_env()
+    if not Path(storage.db_path).exists():
+        print(f"Database not found at {storage.db_path}")
+        return
+
+    src = connect_sqlite(storage.db_path)
+    sources = [r[0] for r in src.execute(f"SELECT DISTINCT source FROM {Detail.TABLE};").fetchall()]
+
+    cols = ", ".join(Detail.COLUMNS)
+    for source in sources:
+        # creates the shard + schema, then copy rows over with one set-based INSERT
+        connect_shard(storage, source).close()
+        path = shard_path(storage, source)
+
+        src.execute("ATTACH DATABASE ? AS shard;", (str(path),))
+        try:
+            with src:
+                cur = src.execute(
+                    f"""
+                    INSERT OR REPLACE INTO shard.{Detail.TABLE} ({cols})
+                    SELECT {cols} FROM main.{Detail.TABLE} WHERE source IS ?;
+                    """,
+                    (source,),
+                )
+            print(f"{source!r}: {cur.rowcount} rows -> {path}")
+        finally:
+            src.execute("DETACH DATABASE shard;")
+
+    src.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,55 +1,221 @@
 # cgpe/services/backfill_sets.py
 
+import sqlite3
+import time
+from contextlib import asynccontextmanager
+from pathlib import Path
+from typing import AsyncIterator
+
 import aiohttp
 
+from cgpe.http.session import http_session
 from cgpe.pipeline.set import run_set_pipeline
 from cgpe.pipeline.detail import run_detail_pipeline
-from cgpe.logging.logger import setup_logger
+from cgpe.pipeline.prescreen import prescreen_products
+from cgpe.pipeline.set_diff import diff_set_pages, moved_products
+from cgpe.services.discover_sets import discover_sets
+from cgpe.logging.logger import init_logging, setup_logger
 from cgpe.storage.detail_repo import upsert_detail
-from cgpe.storage.sqlite_db import connect_sqlite, init_schema
+from cgpe.storage.page_archive import PageArchive
+from cgpe.storage.category_repo import discovered_set_links
+from cgpe.storage.set_repo import save_set_pages
+from cgpe.storage.change_repo import prune_changes
+from cgpe.storage.sqlite_db import connect_sqlite
+from cgpe.storage.migrations import migrate
+from cgpe.storage.snapshot import SnapshotPublisher, snapshot_path_for
+from cgpe.storage.shards import shard_name, writer_db_path
 from cgpe.scrape.sources.base import SourceConfig
+from cgpe.config.discovery import DiscoveryConfig
+from cgpe.config.prescreen import PrescreenConfig
+from cgpe.config.storage import StorageConfig
+from cgpe.metrics.exporter import start_exporter
+from cgpe.metrics.pipeline import STAGE_ITEMS, STAGE_SECONDS
+from cgpe.config.tracing import TraceConfig
+from cgpe.models.run import ScrapeRun
+from cgpe.metrics.tracing import RunTrace, format_stages, peak_rss_kb, stage, trace_run
+from cgpe.storage.run_repo import insert_run
+from cgpe.utils.time import utc_now_iso
 
 logger = setup_logger(__name__)
 
 
-async def backfill_sets(config: SourceConfig) -> None:
+def _record_run(
+    conn,
+    run: RunTrace,
+    *,
+    started_at: str,
+    error: BaseException | None,
+) -> ScrapeRun:
+    """Summarize the trace into one scrape_runs row (also for failed runs)."""
+    http = run.stage("http")
+    new_conns, reused_conns = run.stage("http_connect").items, run.stage("http_conn_reused").items
+    persisted = run.stage("persist").items
+    wall = run.wall_s()
+
+    profile_path = None
+    if run.config.cprofile:
+        stamp = time.strftime("%Y%m%dT%H%M%S")
+        path = Path(run.config.profile_dir) / f"run_{shard_name(run.source)}_{stamp}.prof"
+        profile_path = run.dump_profile(path)
+
+    row = ScrapeRun(
+        source=run.source,
+        started_at=started_at,
+        finished_at=utc_now_iso(),
+        status="failed" if error is not None else "ok",
+        error=repr(error) if error is not None else None,
+        release=run.config.release,
+        wall_s=wall,
+        cpu_s=run.cpu_s(),
+        peak_rss_kb=peak_rss_kb(),
+        links=run.stage("detail_fetch").items,
+        persisted=persisted,
+        http_requests=http.items,
+        http_retries=run.stage("http_retry").items,
+        bytes_fetched=http.bytes,
+        items_per_s=persisted / wall if wall else None,
+        bytes_per_card=http.bytes / persisted if persisted else None,
+        requests_per_card=http.items / persisted if persisted else None,
+        stages=run.summary(),
+        profile_path=str(profile_path) if profile_path else None,
+    )
+    try:
+        insert_run(conn, row)
+    except sqlite3.Error:
+        logger.exception("Could not record scrape run")
+
+    logger.info(
+        "Run %s: %s in %.1fs, %d cards (%.2f/s), %.2f requests/card, %.0f bytes/card, %.0f%% connections reused\n%s",
+        row.run_id, row.status, wall, persisted, row.items_per_s or 0.0,
+        row.requests_per_card or 0.0, row.bytes_per_card or 0.0,
+        100 * reused_conns / max(new_conns + reused_conns, 1), format_stages(row.stages),
+    )
+    if run.alloc_top:
+        logger.info("Top allocation sites in sampled items:\n  %s", "\n  ".join(run.alloc_top))
+    if profile_path:
+        logger.info("Sampled cProfile stats written to %s", profile_path)
+    return row
+
+
+@asynccontextmanager
+async def _session_scope(session: aiohttp.ClientSession | None) -> AsyncIterator[aiohttp.ClientSession]:
+    if session is not None:
+        yield session  # caller owns it
+        return
+    async with http_session() as own:
+        yield own
+
+
+async def backfill_sets(
+    config: SourceConfig,
+    storage: StorageConfig | None = None,
+    trace: TraceConfig | None = None,
+    session: aiohttp.ClientSession | None = None,
+    prescreen: PrescreenConfig | None = None,
+    discovery: DiscoveryConfig | None = None,
+) -> None:
+    """
+    Scrape `config.sets_to_scrape`, or when it is empty every set discovered
+    from the category page (cgpe.services.discover_sets, re-crawled on its
+    schedule), and persist the details. Pass `session` to
+    share one connection pool with other stages of the same run; otherwise
+    the run opens its own from cgpe.http.session. Detail pages are only
+    fetched for cards whose listing moved since the last run
+    (cgpe.pipeline.set_diff) and that it doesn't rule out
+    (cgpe.pipeline.prescreen).
+    """
+    storage = storage or StorageConfig.from_env()
+    prescreen = prescreen or PrescreenConfig.from_env()
+
+    # 1. CONNECT TO SQLITE (this source's shard when sharded)
+    db_path = writer_db_path(storage, config.source)
+    conn = connect_sqlite(db_path)
+
+    # 2. ENSURE SCHEMA IS CURRENT (cheap version check when it is)
+    migrate(conn)
+
+    started_at = utc_now_iso()
+    error: BaseException | None = None
+
+    with trace_run(config.source, trace) as run:
+        archive = PageArchive(storage.archive_dir) if storage.archive_dir else None
+        try:
+            details = []
+
+            async with _session_scope(session) as session:
+                set_links = list(config.sets_to_scrape)
+                if not set_links:
+                    await discover_sets(session, [config], storage, discovery)
+                    set_links = discovered_set_links(conn, source=config.source)
+                    logger.info("Scraping %d discovered sets", len(set_links))
 
-    # 1. CONNECT TO SQLITE
-    conn = connect_sqlite("data/cgpe.sqlite3")
+                set_pages = await run_set_pipeline(
+                    set_url=set_links,
+                    session=session,
+                    source_config=config
+                )
 
-    # 2. ENSURE TABLES EXIST (safe to call every time)
-    init_schema(conn)
+                if prescreen.diff_sets:
+                    diffs = diff_set_pages(conn, set_pages, source=config.source)
+                    products = moved_products(
+                        conn, diffs, source=config.source, sweep_interval_hours=prescreen.sweep_interval_hours,
+                    )
+                else:
+                    products = [p for set_page in set_pages for p in set_page.products]
+                screened = prescreen_products(products, prescreen, conn=conn, source=config.source)
 
-    details = []
+                details = await run_detail_pipeline(
+                    detail_link=screened.links,
+                    session=session,
+                    source_config=config,
+                    archive=archive,
+                )
 
-    connector = aiohttp.TCPConnector(limit=200, limit_per_host=50)
-    async with aiohttp.ClientSession(connector=connector) as session:
-        set_pages = await run_set_pipeline(
-            set_url=config.sets_to_scrape,
-            session=session,
-            source_config=config
-        )
-        
-        detail_links = []
-        for set_page in set_pages:
-            detail_links.extend(set_page.detail_links)
+            # 3. STORE RESULTS
+            t0 = time.perf_counter()
+            publisher = SnapshotPublisher(conn, snapshot_path_for(db_path), every=storage.snapshot_every)
+            with stage("persist", items=len(details)):
+                for detail in details:
+                    upsert_detail(conn, detail.to_db_row())
+                    publisher.note_writes()
+            STAGE_SECONDS.labels("store").observe(time.perf_counter() - t0)
+            STAGE_ITEMS.labels("store", "ok").inc(len(details))
 
-        details = await run_detail_pipeline(
-            detail_link=detail_links,
-            session=session,
-            source_config=config
-        )
+            # the listings become the next run's diff baseline; cards whose
+            # detail fetch failed are held back so they count as moved again
+            if prescreen.diff_sets:
+                persisted_links = {d.card_link for d in details}
+                with stage("save_sets"):
+                    save_set_pages(
+                        conn, set_pages, source=config.source, seen_at=started_at,
+                        hold={link for link in screened.links if link not in persisted_links},
+                    )
 
-    # 3. STORE RESULTS
-    for detail in details:
-        upsert_detail(conn, detail.to_db_row())
+            # 4. PUBLISH READ SNAPSHOT FOR THE WEB TIER
+            with stage("publish_snapshot"):
+                publisher.publish()
 
-    logger.info("Backfilling completed. Total details fetched: %d", len(details))
+            # the web change feed only tails recent rows
+            pruned = prune_changes(conn, older_than_hours=storage.change_retention_hours)
+            if pruned:
+                logger.info("Pruned %d old card_changes rows", pruned)
 
-    conn.close()
+            logger.info("Backfilling completed. Total details fetched: %d", len(details))
+        except BaseException as e:
+            error = e
+            raise
+        finally:
+            if archive is not None:
+                archive.close()
+            # 5. ONE LEDGER ROW PER RUN (items/s, bytes/card, requests/card, per-stage times)
+            _record_run(conn, run, started_at=started_at, error=error)
+            conn.close()
 
 if __name__ == "__main__":
     import asyncio
     from cgpe.scrape.sources.pokemon import POKEMON_PRICECHARTING
 
-    asyncio.run(backfill_sets(POKEMON_PRICECHARTING))
\ No newline at end of file
+    init_logging()
+    # CGPE_METRICS_PORT / CGPE_METRICS_TEXTFILE; a no-op when neither is set
+    with start_exporter():
+        asyncio.run(backfill_sets(POKEMON_PRICECHARTING))
\ No newline at end of file
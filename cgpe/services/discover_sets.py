@@ -0,0 +1,121 @@
+# cgpe/services/discover_sets.py
+#
+# Set discovery: crawl each source's category page (concurrently across
+# sources), merge the set links into discovered_sets with first/last-seen
+# times, and re-crawl only once the last crawl is older than
+# CGPE_DISCOVERY_RECRAWL_HOURS. backfill_sets reads the stored links when a
+# source pins no sets_to_scrape, so new sets join the scrape on their own.
+#
+#   python -m cgpe.services.discover_sets [--force]
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import sqlite3
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional, Sequence
+
+import aiohttp
+
+from cgpe.config.discovery import DiscoveryConfig
+from cgpe.config.storage import StorageConfig
+from cgpe.http.session import http_session
+from cgpe.logging.logger import init_logging, setup_logger
+from cgpe.pipeline.category import run_category_pipeline
+from cgpe.metrics.tracing import stage
+from cgpe.scrape.sources.base import SourceConfig
+from cgpe.storage.category_repo import last_category_crawl, record_category_crawl
+from cgpe.storage.migrations import migrate
+from cgpe.storage.shards import writer_db_path
+from cgpe.storage.sqlite_db import connect_sqlite
+from cgpe.utils.time import utc_now_iso
+
+log = setup_logger(__name__)
+
+
+def crawl_due(conn: sqlite3.Connection, config: SourceConfig, discovery: DiscoveryConfig) -> bool:
+    last = last_category_crawl(conn, config.category_link, source=config.source)
+    if last is None:
+        return True
+    crawled_at = datetime.fromisoformat(last.crawled_at)
+    if crawled_at.tzinfo is None:
+        crawled_at = crawled_at.replace(tzinfo=timezone.utc)
+    return datetime.now(timezone.utc) - crawled_at >= timedelta(hours=discovery.recrawl_interval_hours)
+
+
+async def discover_sets(
+    session: aiohttp.ClientSession,
+    configs: Sequence[SourceConfig],
+    storage: Optional[StorageConfig] = None,
+    discovery: Optional[DiscoveryConfig] = None,
+    *,
+    force: bool = False,
+) -> Dict[str, List[str]]:
+    """
+    Crawl the category pages that are due (all of them with `force`) and
+    return {source: newly discovered set links}. A failed crawl is logged
+    and left due, so the next run retries it; stored links stay usable.
+    """
+    storage = storage or StorageConfig.from_env()
+    discovery = discovery or DiscoveryConfig.from_env()
+
+    due: List[tuple[SourceConfig, sqlite3.Connection]] = []
+    for cfg in configs:
+        conn = connect_sqlite(writer_db_path(storage, cfg.source))
+        migrate(conn)
+        if force or crawl_due(conn, cfg, discovery):
+            due.append((cfg, conn))
+        else:
+            conn.close()
+    if not due:
+        return {}
+
+    new_by_source: Dict[str, List[str]] = {}
+    with stage("discovery", items=len(due)):
+        pages = await asyncio.gather(
+            *(run_category_pipeline(session, cfg) for cfg, _ in due),
+            return_exceptions=True,
+        )
+        for (cfg, conn), page in zip(due, pages):
+            try:
+                if isinstance(page, BaseException):
+                    log.warning("Category crawl failed for %s (%s): %r", cfg.source, cfg.category_link, page)
+                    continue
+                if len(page.set_links) < discovery.min_sets:
+                    log.warning(
+                        "Category crawl for %s listed %d sets (< %d); keeping the stored catalog",
+                        cfg.source, len(page.set_links), discovery.min_sets,
+                    )
+                    continue
+                new = record_category_crawl(
+                    conn, cfg.category_link, page.set_links, source=cfg.source, crawled_at=utc_now_iso(),
+                )
+                new_by_source[cfg.source] = new
+                log.info("Discovered %d sets for %s (%d new)", len(page.set_links), cfg.source, len(new))
+                for link in new:
+                    log.info("New set: %s", link)
+            finally:
+                conn.close()
+
+    return new_by_source
+
+
+def main() -> None:
+    from cgpe.scrape.sources.pokemon import POKEMON_PRICECHARTING
+
+    ap = argparse.ArgumentParser(description="Crawl category pages for new sets")
+    ap.add_argument("--force", action="store_true", help="crawl even if the last crawl is recent")
+    args = ap.parse_args()
+
+    init_logging()
+
+    async def run() -> None:
+        async with http_session() as session:
+            await discover_sets(session, [POKEMON_PRICECHARTING], force=args.force)
+
+    asyncio.run(run())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,140 @@
+# cgpe/services/reparse_archive.py
+#
+# Re-run parse_detail_page (and the EV/profit enrichment it calls) over the
+# page archive and upsert the results, with no network traffic: after a
+# parser fix or a new Detail field, the catalog refreshes at local CPU speed
+# instead of a multi-hour rate-limited re-scrape.
+#
+#   python -m cgpe.services.reparse_archive --source "Pokemon PriceCharting" --workers 8
+
+from __future__ import annotations
+
+import argparse
+import os
+import time
+from collections import defaultdict, deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from itertools import islice
+from pathlib import Path
+from typing import Deque, Dict, Iterator, List, Optional, Tuple
+
+from cgpe.config.storage import StorageConfig
+from cgpe.logging.logger import init_logging, setup_logger
+from cgpe.models.detail import Detail
+from cgpe.scrape.pricecharting.detail.parse_detail import parse_detail_page
+from cgpe.scrape.sources.base import SourceConfig
+from cgpe.storage.detail_repo import upsert_details
+from cgpe.storage.migrations import migrate
+from cgpe.storage.page_archive import ArchivedPage, PageArchive, read_blob
+from cgpe.storage.shards import writer_db_path
+from cgpe.storage.snapshot import SnapshotPublisher, snapshot_path_for
+from cgpe.storage.sqlite_db import connect_sqlite
+
+log = setup_logger(__name__)
+
+
+def _parse_batch(root: str, pages: List[ArchivedPage]) -> Tuple[List[Detail], List[Tuple[str, str]]]:
+    """Worker: parse one batch; failures are returned, not raised, so one bad page doesn't sink the batch."""
+    details: List[Detail] = []
+    failed: List[Tuple[str, str]] = []
+    for page in pages:
+        try:
+            cfg = SourceConfig(source=page.source, category_link="", base_url="", sets_to_scrape=[])
+            detail = parse_detail_page(read_blob(root, page), page.url, cfg)
+            # the data is as of the fetch, not as of this re-parse (staleness
+            # checks read scraped_at); parsed_at is stamped on upsert
+            detail.scraped_at = page.fetched_at
+            details.append(detail)
+        except Exception as e:
+            failed.append((page.url, repr(e)))
+    return details, failed
+
+
+def _batches(pages: List[ArchivedPage], size: int) -> Iterator[List[ArchivedPage]]:
+    for i in range(0, len(pages), size):
+        yield pages[i:i + size]
+
+
+def reparse_archive(
+    archive_dir: str,
+    storage: Optional[StorageConfig] = None,
+    *,
+    source: Optional[str] = None,
+    workers: Optional[int] = None,
+    batch_size: int = 200,
+    limit: Optional[int] = None,
+) -> Dict[str, int]:
+    storage = storage or StorageConfig.from_env()
+    with PageArchive(archive_dir) as archive:
+        pages = list(archive.latest_pages(source=source))
+    if limit is not None:
+        pages = pages[:limit]
+
+    by_source: Dict[Optional[str], List[ArchivedPage]] = defaultdict(list)
+    for page in pages:
+        by_source[page.source].append(page)
+
+    totals = {"pages": len(pages), "parsed": 0, "failed": 0}
+    t0 = time.perf_counter()
+    root = str(Path(archive_dir))
+    workers = workers or os.cpu_count() or 1
+    # parsed batches wait in the parent for the single writer; a small window
+    # keeps workers busy without holding the whole archive's Details in memory
+    max_in_flight = 2 * workers
+
+    # each worker builds its own logging pipeline, so parse warnings reach the log
+    with ProcessPoolExecutor(max_workers=workers, initializer=init_logging) as pool:
+        for src, src_pages in by_source.items():
+            db_path = writer_db_path(storage, src)
+            conn = connect_sqlite(db_path)
+            try:
+                migrate(conn)
+                batches = _batches(src_pages, batch_size)
+                in_flight: Deque[Future] = deque(
+                    pool.submit(_parse_batch, root, batch) for batch in islice(batches, max_in_flight)
+                )
+                while in_flight:
+                    details, failed = in_flight.popleft().result()
+                    batch = next(batches, None)
+                    if batch is not None:
+                        in_flight.append(pool.submit(_parse_batch, root, batch))
+                    # one transaction per batch; upserts stay in the parent so a single writer owns the DB
+                    totals["parsed"] += upsert_details(conn, details)
+                    totals["failed"] += len(failed)
+                    for url, err in failed:
+                        log.warning("Re-parse failed for %s: %s", url, err)
+                SnapshotPublisher(conn, snapshot_path_for(db_path)).publish()
+            finally:
+                conn.close()
+
+    wall = time.perf_counter() - t0
+    log.info(
+        "Re-parsed %d/%d archived pages in %.1fs (%.0f pages/s), %d failed",
+        totals["parsed"], totals["pages"], wall, totals["parsed"] / wall if wall else 0.0, totals["failed"],
+    )
+    return totals
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="Re-parse archived detail pages into the DB (no network)")
+    ap.add_argument("--archive-dir", default=None, help="defaults to CGPE_ARCHIVE_DIR")
+    ap.add_argument("--source", default=None, help="only pages fetched for this source")
+    ap.add_argument("--workers", type=int, default=None, help="parser processes (default: CPU count)")
+    ap.add_argument("--batch-size", type=int, default=200)
+    ap.add_argument("--limit", type=int, default=None, help="first N URLs only (dry runs)")
+    args = ap.parse_args()
+
+    init_logging()
+    storage = StorageConfig.from_env()
+    archive_dir = args.archive_dir or storage.archive_dir
+    if not archive_dir:
+        raise SystemExit("No archive: pass --archive-dir or set CGPE_ARCHIVE_DIR")
+
+    reparse_archive(
+        archive_dir, storage,
+        source=args.source, workers=args.workers, batch_size=args.batch_size, limit=args.limit,
+    )
+
+
+if __name__ == "__main__":
+    main()
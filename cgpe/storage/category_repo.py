@@ -0,0 +1,90 @@
+# cgpe/storage/category_repo.py
+from __future__ import annotations
+
+import json
+import sqlite3
+from typing import List, Optional, Sequence
+
+from cgpe.models.category import CategoryCrawl, DiscoveredSet
+from cgpe.metrics.storage import DB_ROWS_WRITTEN, timed_op
+
+
+@timed_op("last_category_crawl")
+def last_category_crawl(conn: sqlite3.Connection, category_link: str, *, source: Optional[str]) -> Optional[CategoryCrawl]:
+    row = conn.execute(
+        f"SELECT category_link, source, crawled_at, set_count, new_sets FROM {CategoryCrawl.TABLE} "
+        "WHERE category_link = ? AND source IS ?;",
+        (category_link, source),
+    ).fetchone()
+    return CategoryCrawl(*row) if row is not None else None
+
+
+@timed_op("record_category_crawl")
+def record_category_crawl(
+    conn: sqlite3.Connection,
+    category_link: str,
+    set_links: Sequence[str],
+    *,
+    source: Optional[str],
+    crawled_at: str,
+) -> List[str]:
+    """
+    Merge one crawl's set links into discovered_sets and stamp the crawl, in
+    one transaction. Returns the links not listed before (or back after being
+    removed); links the crawl no longer lists are marked removed.
+    """
+    links = list(dict.fromkeys(set_links))
+    with conn:
+        known = {
+            r[0]
+            for r in conn.execute(
+                f"SELECT set_link FROM {DiscoveredSet.TABLE} "
+                "WHERE source IS ? AND removed_at IS NULL AND set_link IN (SELECT value FROM json_each(?));",
+                (source, json.dumps(links)),
+            )
+        }
+        new = [link for link in links if link not in known]
+
+        conn.executemany(
+            f"""
+            INSERT INTO {DiscoveredSet.TABLE} (set_link, source, category_link, first_seen_at, last_seen_at)
+            VALUES (?, ?, ?, ?, ?)
+            ON CONFLICT(set_link, source) DO UPDATE SET
+                category_link = excluded.category_link,
+                last_seen_at = excluded.last_seen_at,
+                removed_at = NULL;
+            """,
+            [(link, source, category_link, crawled_at, crawled_at) for link in links],
+        )
+        conn.execute(
+            f"UPDATE {DiscoveredSet.TABLE} SET removed_at = ? "
+            "WHERE category_link = ? AND source IS ? AND removed_at IS NULL "
+            "AND set_link NOT IN (SELECT value FROM json_each(?));",
+            (crawled_at, category_link, source, json.dumps(links)),
+        )
+        conn.execute(
+            f"""
+            INSERT INTO {CategoryCrawl.TABLE} (category_link, source, crawled_at, set_count, new_sets)
+            VALUES (?, ?, ?, ?, ?)
+            ON CONFLICT(category_link, source) DO UPDATE SET
+                crawled_at = excluded.crawled_at,
+                set_count = excluded.set_count,
+                new_sets = excluded.new_sets;
+            """,
+            (category_link, source, crawled_at, len(links), len(new)),
+        )
+    DB_ROWS_WRITTEN.labels("record_category_crawl").inc(len(links))
+    return new
+
+
+@timed_op("discovered_set_links")
+def discovered_set_links(conn: sqlite3.Connection, *, source: Optional[str]) -> List[str]:
+    """Currently listed set links for `source`, oldest discovery first."""
+    return [
+        r[0]
+        for r in conn.execute(
+            f"SELECT set_link FROM {DiscoveredSet.TABLE} WHERE source IS ? AND removed_at IS NULL "
+            "ORDER BY first_seen_at, set_link;",
+            (source,),
+        )
+    ]
@@ -0,0 +1,57 @@
+# cgpe/storage/change_repo.py
+from __future__ import annotations
+
+import sqlite3
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional
+
+from cgpe.models.change import CardChange
+from cgpe.models.detail import Detail
+from cgpe.metrics.storage import timed_op
+
+
+@timed_op("latest_change_seq")
+def latest_change_seq(conn: sqlite3.Connection) -> int:
+    row = conn.execute(f"SELECT MAX(seq) FROM {CardChange.TABLE};").fetchone()
+    return row[0] or 0
+
+
+@timed_op("read_changes")
+def read_changes(conn: sqlite3.Connection, *, after_seq: int, limit: int = 1000) -> List[CardChange]:
+    cur = conn.execute(
+        f"SELECT * FROM {CardChange.TABLE} WHERE seq > ? ORDER BY seq LIMIT ?;",
+        (after_seq, limit),
+    )
+    names = [d[0] for d in cur.description]
+    return [CardChange.from_db_row(dict(zip(names, r))) for r in cur.fetchall()]
+
+
+@timed_op("prune_changes")
+def prune_changes(conn: sqlite3.Connection, *, older_than_hours: float) -> int:
+    """Drop feed rows nobody will poll for anymore. Returns rows deleted."""
+    cutoff = (datetime.now(timezone.utc) - timedelta(hours=older_than_hours)).isoformat()
+    with conn:
+        cur = conn.execute(f"DELETE FROM {CardChange.TABLE} WHERE changed_at < ?;", (cutoff,))
+    return cur.rowcount
+
+
+@timed_op("top_by_expected_profit")
+def top_by_expected_profit(
+    conn: sqlite3.Connection,
+    *,
+    limit: int,
+    source: Optional[str] = None,
+) -> List[Dict[str, Any]]:
+    """Top rows straight off idx_card_details_expected_profit (no table scan)."""
+    where = "WHERE expected_profit IS NOT NULL" + (" AND source = ?" if source else "")
+    params: list[Any] = [source] if source else []
+    cur = conn.execute(
+        f"""
+        SELECT card_link, source, card_name, card_num, expected_value, expected_profit
+        FROM {Detail.TABLE} {where}
+        ORDER BY expected_profit DESC LIMIT ?;
+        """,
+        (*params, limit),
+    )
+    names = [d[0] for d in cur.description]
+    return [dict(zip(names, r)) for r in cur.fetchall()]
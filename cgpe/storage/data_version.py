@@ -0,0 +1,78 @@
+# cgpe/storage/data_version.py
+
+from __future__ import annotations
+
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Dict, Hashable, List, Tuple
+
+from cgpe.config.storage import StorageConfig
+from cgpe.storage.shards import list_shard_paths
+from cgpe.storage.snapshot import snapshot_path_for
+
+# in-process write counter, bumped by detail_repo on every commit;
+# writes from other processes show up through PRAGMA data_version instead
+_write_generation = 0
+
+
+def bump_write_generation() -> None:
+    global _write_generation
+    _write_generation += 1
+
+
+def write_generation() -> int:
+    return _write_generation
+
+
+class DataVersionWatcher:
+    """
+    Cheap "has the data changed?" token for the DB(s) the web tier reads.
+
+    Live DB files are watched through `PRAGMA data_version` on a long-lived
+    connection per file (it changes whenever another connection commits).
+    Published snapshots are immutable, so their file identity is enough.
+    """
+
+    def __init__(self, config: StorageConfig) -> None:
+        self.config = config
+        self._lock = threading.Lock()
+        self._conns: Dict[Path, sqlite3.Connection] = {}
+
+    def _watched_files(self) -> List[Tuple[Path, bool]]:
+        paths = list_shard_paths(self.config) if self.config.sharded else [Path(self.config.db_path)]
+
+        out: List[Tuple[Path, bool]] = []
+        for p in paths:
+            snapshot = snapshot_path_for(p)
+            if self.config.read_from_snapshot and snapshot.exists():
+                out.append((snapshot, True))
+            else:
+                out.append((p, False))
+        return out
+
+    def _data_version(self, path: Path) -> int:
+        conn = self._conns.get(path)
+        if conn is None:
+            if not path.exists():
+                return -1
+            conn = sqlite3.connect(str(path), check_same_thread=False)
+            self._conns[path] = conn
+        return conn.execute("PRAGMA data_version;").fetchone()[0]
+
+    def token(self) -> Hashable:
+        parts: List[Hashable] = [write_generation()]
+        with self._lock:
+            for path, immutable in self._watched_files():
+                if immutable:
+                    st = path.stat()
+                    parts.append((str(path), st.st_ino, st.st_mtime_ns, st.st_size))
+                else:
+                    parts.append((str(path), self._data_version(path)))
+        return tuple(parts)
+
+    def close(self) -> None:
+        with self._lock:
+            for conn in self._conns.values():
+                conn.close()
+            self._conns.clear()
@@ -1,24 +1,52 @@
 # cgpe/storage/detail_repo.py
 from __future__ import annotations
 
+import json
 import sqlite3
-from typing import Any, Dict, Optional, Union
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Union
 
 from cgpe.models.detail import Detail
+from cgpe.storage.data_version import bump_write_generation
+from cgpe.metrics.storage import DB_ROWS_WRITTEN, timed_op
 
+DETAIL_COLUMNS: tuple[str, ...] = ("id", *Detail.COLUMNS)
 
-def upsert_detail(conn: sqlite3.Connection, row: Union[Detail, Dict[str, Any]]) -> None:
+
+def _as_detail(row: Union[Detail, Dict[str, Any]]) -> Detail:
     if isinstance(row, Detail):
-        d = row
-    elif "graded_prices_by_grade" in row or "pop" in row or "grade7_dist" in row:
-        d = Detail(**row)  # model-shaped
-    else:
-        d = Detail.from_db_row(row)  # db-shaped
+        return row
+    if "graded_prices_by_grade" in row or "pop" in row or "grade7_dist" in row:
+        return Detail(**row)  # model-shaped
+    return Detail.from_db_row(row)  # db-shaped
 
-    conn.execute(Detail.upsert_sql(), d.to_db_row())
+
+@timed_op("upsert_detail")
+def upsert_detail(conn: sqlite3.Connection, row: Union[Detail, Dict[str, Any]]) -> None:
+    conn.execute(Detail.upsert_sql(), _as_detail(row).to_db_row())
     conn.commit()
+    bump_write_generation()
+    DB_ROWS_WRITTEN.labels("upsert_detail").inc()
 
 
+@timed_op("upsert_details")
+def upsert_details(conn: sqlite3.Connection, rows: Iterable[Union[Detail, Dict[str, Any]]]) -> int:
+    """Bulk upsert in a single transaction (one commit instead of one per row)."""
+    n = 0
+
+    def db_rows():
+        nonlocal n
+        for row in rows:
+            n += 1
+            yield _as_detail(row).to_db_row()
+
+    with conn:
+        conn.executemany(Detail.upsert_sql(), db_rows())
+    bump_write_generation()
+    DB_ROWS_WRITTEN.labels("upsert_details").inc(n)
+    return n
+
+
+@timed_op("get_detail_by_link")
 def get_detail_by_link(
     conn: sqlite3.Connection,
     *,
@@ -37,3 +65,52 @@ def get_detail_by_link(
         ).fetchone()
 
     return Detail.from_db_row(dict(r)) if r else None
+
+
+@timed_op("get_details_by_links")
+def get_details_by_links(
+    conn: sqlite3.Connection,
+    card_links: Iterable[str],
+    *,
+    source: Optional[str] = None,
+    columns: Optional[Sequence[str]] = None,
+) -> Dict[str, Dict[str, Any]]:
+    """
+    Batch form of `get_detail_by_link`: one statement for any number of links,
+    returned as {card_link: row}. Links are bound as a single JSON array and
+    joined through json_each, which probes the (card_link, source) unique
+    index per link without a variable-count limit or a temp-table write
+    (snapshot/federated readers are query_only).
+
+    `columns` projects the returned rows (default: all, with the JSON blob
+    columns still serialized). Without `source`, the most recently scraped
+    row per link wins, like the single lookup.
+    """
+    links = list(dict.fromkeys(card_links))
+    if not links:
+        return {}
+
+    cols: List[str] = list(columns) if columns else list(DETAIL_COLUMNS)
+    unknown = [c for c in cols if c not in DETAIL_COLUMNS]
+    if unknown:
+        raise ValueError(f"Unknown detail columns: {', '.join(unknown)}")
+
+    select = list(dict.fromkeys(["card_link", "scraped_at", *cols]))
+    sql = (
+        f"SELECT {', '.join('d.' + c for c in select)} "
+        f"FROM json_each(?) AS l JOIN {Detail.TABLE} AS d ON d.card_link = l.value"
+    )
+    params: list[Any] = [json.dumps(links)]
+    if source is not None:
+        sql += " AND d.source = ?"
+        params.append(source)
+    sql += " ORDER BY d.scraped_at"
+
+    cur = conn.cursor()
+    cur.row_factory = None
+
+    out: Dict[str, Dict[str, Any]] = {}
+    for r in cur.execute(sql, params):
+        row = dict(zip(select, r))
+        out[row["card_link"]] = {c: row[c] for c in cols}  # later scraped_at overwrites
+    return out
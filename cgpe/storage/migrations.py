@@ -0,0 +1,235 @@
+# cgpe/storage/migrations.py
+
+from __future__ import annotations
+
+import sqlite3
+from dataclasses import dataclass
+from typing import Callable, Optional, Sequence
+
+from cgpe.models.category import CategoryCrawl, DiscoveredSet
+from cgpe.models.change import CardChange
+from cgpe.models.detail import Detail
+from cgpe.models.run import ScrapeRun
+from cgpe.models.set import SetProduct, SetRecord
+from cgpe.storage.sqlite_db import apply_model_schema
+from cgpe.utils.time import utc_now_iso
+from cgpe.logging.logger import setup_logger
+
+log = setup_logger(__name__)
+
+# (label, done, total)
+Progress = Callable[[str, int, int], None]
+
+SCHEMA_VERSION_TABLE = "schema_version"
+
+
+def log_progress(label: str, done: int, total: int) -> None:
+    pct = 100.0 * done / total if total else 100.0
+    log.info("%s: %d/%d (%.1f%%)", label, done, total, pct)
+
+
+@dataclass(frozen=True)
+class Migration:
+    version: int
+    name: str
+    apply: Callable[[sqlite3.Connection, Progress], None]
+    # False for chunked backfills and index builds that commit as they go (must be idempotent / resumable)
+    transactional: bool = True
+
+
+# -----------------------------
+# Helpers for migration bodies
+# -----------------------------
+
+def backfill_in_batches(
+    conn: sqlite3.Connection,
+    *,
+    table: str,
+    set_sql: str,
+    where_sql: str = "1",
+    params: Sequence = (),
+    batch_size: int = 5000,
+    label: str = "backfill",
+    progress: Progress = log_progress,
+) -> int:
+    """
+    UPDATE a large table in rowid-range chunks, committing after each chunk so
+    the write lock is only held for one batch at a time. `where_sql` should
+    exclude already-updated rows so an interrupted backfill can simply rerun.
+    """
+    max_rowid = conn.execute(f"SELECT MAX(rowid) FROM {table};").fetchone()[0] or 0
+
+    updated = 0
+    lo = 0
+    while lo < max_rowid:
+        hi = lo + batch_size
+        with conn:
+            cur = conn.execute(
+                f"UPDATE {table} SET {set_sql} WHERE rowid > ? AND rowid <= ? AND ({where_sql});",
+                (*params, lo, hi),
+            )
+        updated += cur.rowcount
+        lo = hi
+        progress(label, min(lo, max_rowid), max_rowid)
+
+    return updated
+
+
+# -----------------------------
+# Migrations (append only, never renumber)
+# -----------------------------
+
+def _m001_baseline(conn: sqlite3.Connection, progress: Progress) -> None:
+    # adopts DBs created by the old sync_schema startup path as well as empty ones
+    # (indexes come from migration 7, outside the transaction)
+    apply_model_schema(conn, [Detail], indexes=False)
+
+
+def _card_change_trigger_sql(name: str, event: str, when: str, old_profit: str) -> str:
+    return f"""
+        CREATE TRIGGER IF NOT EXISTS {name}
+        AFTER {event} ON {Detail.TABLE}
+        WHEN {when}
+        BEGIN
+            INSERT INTO {CardChange.TABLE}
+                (card_link, source, card_name, card_num, old_profit, new_profit, expected_value, changed_at)
+            VALUES
+                (new.card_link, new.source, new.card_name, new.card_num,
+                 {old_profit}, new.expected_profit, new.expected_value, new.scraped_at);
+        END;
+    """
+
+
+def _m002_card_changes(conn: sqlite3.Connection, progress: Progress) -> None:
+    # change feed for live profit push: triggers catch writes from every process
+    # (the scraper and the web tier are separate); the expected_profit index for
+    # top-K is built by migration 7, not under this write lock
+    apply_model_schema(conn, [Detail], indexes=False)
+    apply_model_schema(conn, [CardChange])
+    conn.execute(_card_change_trigger_sql(
+        "trg_card_details_profit_insert", "INSERT",
+        "new.expected_profit IS NOT NULL", "NULL",
+    ))
+    conn.execute(_card_change_trigger_sql(
+        "trg_card_details_profit_update", "UPDATE OF expected_profit",
+        "old.expected_profit IS NOT new.expected_profit", "old.expected_profit",
+    ))
+
+
+def _m003_scrape_runs(conn: sqlite3.Connection, progress: Progress) -> None:
+    apply_model_schema(conn, [ScrapeRun])
+
+
+def _m004_set_catalog(conn: sqlite3.Connection, progress: Progress) -> None:
+    # persisted set listings, diffed per run so only moved cards are refetched
+    apply_model_schema(conn, [SetRecord, SetProduct])
+
+
+def _m005_set_discovery(conn: sqlite3.Connection, progress: Progress) -> None:
+    # set links found on category pages, and when each category was last crawled
+    apply_model_schema(conn, [DiscoveredSet, CategoryCrawl])
+
+
+def _m006_detail_parsed_at(conn: sqlite3.Connection, progress: Progress) -> None:
+    # parse time, separate from fetch time, so re-parsed rows reach incremental
+    # readers; left NULL on old rows (only rows written from now on need it)
+    apply_model_schema(conn, [Detail], indexes=False)
+
+
+def _m007_detail_indexes(conn: sqlite3.Connection, progress: Progress) -> None:
+    # every card_details index missing so far (expected_profit, parsed_at on
+    # upgraded DBs); each CREATE INDEX commits on its own instead of holding
+    # BEGIN IMMEDIATE for a full-table build, and IF NOT EXISTS makes reruns free
+    apply_model_schema(conn, [Detail])
+
+
+MIGRATIONS: list[Migration] = [
+    Migration(1, "baseline card_details", _m001_baseline),
+    Migration(2, "card_changes feed", _m002_card_changes),
+    Migration(3, "scrape_runs ledger", _m003_scrape_runs),
+    Migration(4, "sets + set_products catalog", _m004_set_catalog),
+    Migration(5, "discovered_sets + category_crawls", _m005_set_discovery),
+    Migration(6, "card_details.parsed_at", _m006_detail_parsed_at),
+    Migration(7, "card_details indexes", _m007_detail_indexes, transactional=False),
+]
+
+
+# -----------------------------
+# Engine
+# -----------------------------
+
+def current_version(conn: sqlite3.Connection) -> int:
+    try:
+        row = conn.execute(f"SELECT MAX(version) FROM {SCHEMA_VERSION_TABLE};").fetchone()
+    except sqlite3.OperationalError:
+        return 0
+    return row[0] or 0
+
+
+def latest_version(migrations: Sequence[Migration] = MIGRATIONS) -> int:
+    return max((m.version for m in migrations), default=0)
+
+
+def _record(conn: sqlite3.Connection, m: Migration) -> None:
+    conn.execute(
+        f"INSERT INTO {SCHEMA_VERSION_TABLE} (version, name, applied_at) VALUES (?, ?, ?);",
+        (m.version, m.name, utc_now_iso()),
+    )
+
+
+def migrate(
+    conn: sqlite3.Connection,
+    *,
+    migrations: Sequence[Migration] = MIGRATIONS,
+    progress: Optional[Progress] = None,
+) -> int:
+    """
+    Bring the DB up to the latest schema version and return it.
+
+    Up-to-date DBs cost a single indexed MAX() lookup. Transactional
+    migrations run inside BEGIN IMMEDIATE together with their version row,
+    so a crash or a concurrent migrator never leaves a half-applied step.
+    """
+    target = latest_version(migrations)
+    if current_version(conn) >= target:
+        return target
+
+    progress = progress or log_progress
+    conn.execute(
+        f"""
+        CREATE TABLE IF NOT EXISTS {SCHEMA_VERSION_TABLE} (
+            version INTEGER PRIMARY KEY,
+            name TEXT NOT NULL,
+            applied_at TEXT NOT NULL
+        );
+        """
+    )
+
+    for m in sorted(migrations, key=lambda m: m.version):
+        if m.version <= current_version(conn):
+            continue
+
+        log.info("Applying migration %03d: %s", m.version, m.name)
+
+        if not m.transactional:
+            m.apply(conn, progress)
+            # idempotent steps can run in two processes at once; first one records it
+            conn.execute("BEGIN IMMEDIATE;")
+            if m.version > current_version(conn):
+                _record(conn, m)
+            conn.commit()
+            continue
+
+        conn.execute("BEGIN IMMEDIATE;")
+        try:
+            # another process may have applied it while we waited for the lock
+            if m.version > current_version(conn):
+                m.apply(conn, progress)
+                _record(conn, m)
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            log.exception("Migration %03d failed; rolled back", m.version)
+            raise
+
+    return current_version(conn)
@@ -0,0 +1,213 @@
+# cgpe/storage/page_archive.py
+#
+# Raw fetched pages, kept so a parser fix can be replayed over the catalog
+# without re-scraping it. Bodies are deduplicated by SHA-256, zlib-compressed
+# and appended to size-capped segment files; a small SQLite index maps each
+# hash to (segment, offset, length) and each URL to the hashes fetched for it.
+#
+#   data/archive/
+#     index.sqlite3
+#     seg-000001.z
+#     seg-000002.z
+
+from __future__ import annotations
+
+import hashlib
+import sqlite3
+import threading
+import zlib
+from dataclasses import dataclass
+from pathlib import Path
+from typing import BinaryIO, Dict, Iterator, Optional
+
+from cgpe.logging.logger import setup_logger
+from cgpe.utils.time import utc_now_iso
+
+log = setup_logger(__name__)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS blobs (
+    hash TEXT PRIMARY KEY,
+    segment INTEGER NOT NULL,
+    offset INTEGER NOT NULL,
+    length INTEGER NOT NULL,
+    raw_length INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS pages (
+    url TEXT NOT NULL,
+    source TEXT,
+    hash TEXT NOT NULL,
+    first_fetched_at TEXT NOT NULL,
+    last_fetched_at TEXT NOT NULL,
+    PRIMARY KEY (url, hash)
+);
+CREATE INDEX IF NOT EXISTS idx_pages_source_url ON pages(source, url, last_fetched_at);
+"""
+
+# index rows are committed in batches; segment bytes are written first, so a
+# crash can only leave unreferenced bytes behind, never a dangling index row
+_COMMIT_EVERY = 256
+
+
+@dataclass
+class ArchivedPage:
+    url: str
+    source: Optional[str]
+    hash: str
+    fetched_at: str
+    # where the compressed body lives; see read_blob()
+    segment: int
+    offset: int
+    length: int
+
+
+def segment_path(root: str | Path, n: int) -> Path:
+    return Path(root) / f"seg-{n:06d}.z"
+
+
+def read_blob(root: str | Path, page: ArchivedPage) -> bytes:
+    """Read one body without opening the index (for worker processes)."""
+    with open(segment_path(root, page.segment), "rb") as f:
+        f.seek(page.offset)
+        return zlib.decompress(f.read(page.length))
+
+
+class PageArchive:
+    def __init__(self, root: str | Path, *, segment_bytes: int = 256 * 1024 * 1024, level: int = 6) -> None:
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.segment_bytes = segment_bytes
+        self.level = level
+
+        # puts come from the detail pipeline's to_thread workers
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.root / "index.sqlite3"), check_same_thread=False)
+        self._conn.executescript(_SCHEMA)
+        self._conn.commit()
+        self._pending = 0
+
+        row = self._conn.execute("SELECT MAX(segment) FROM blobs").fetchone()
+        self._segment = row[0] or 1
+        self._writer: Optional[BinaryIO] = None
+        self._readers: Dict[int, BinaryIO] = {}
+
+        self.stored = 0
+        self.deduped = 0
+
+    # ---- writing ----
+
+    def _open_writer(self) -> BinaryIO:
+        if self._writer is None:
+            self._writer = open(segment_path(self.root, self._segment), "ab")
+        if self._writer.tell() >= self.segment_bytes:
+            self._writer.close()
+            self._segment += 1
+            self._writer = open(segment_path(self.root, self._segment), "ab")
+        return self._writer
+
+    def put(self, url: str, body: bytes, *, source: Optional[str] = None, fetched_at: Optional[str] = None) -> str:
+        """Archive one body under `url`; returns its content hash."""
+        digest = hashlib.sha256(body).hexdigest()
+        fetched_at = fetched_at or utc_now_iso()
+
+        with self._lock:
+            known = self._conn.execute("SELECT 1 FROM blobs WHERE hash=?", (digest,)).fetchone()
+        packed = None if known else zlib.compress(body, self.level)
+
+        with self._lock:
+            if packed is not None and not self._conn.execute(
+                "SELECT 1 FROM blobs WHERE hash=?", (digest,)
+            ).fetchone():
+                w = self._open_writer()
+                offset = w.tell()
+                w.write(packed)
+                self._conn.execute(
+                    "INSERT INTO blobs (hash, segment, offset, length, raw_length) VALUES (?, ?, ?, ?, ?)",
+                    (digest, self._segment, offset, len(packed), len(body)),
+                )
+                self.stored += 1
+            else:
+                self.deduped += 1
+            self._conn.execute(
+                """
+                INSERT INTO pages (url, source, hash, first_fetched_at, last_fetched_at) VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT(url, hash) DO UPDATE SET last_fetched_at=excluded.last_fetched_at
+                """,
+                (url, source, digest, fetched_at, fetched_at),
+            )
+            self._pending += 1
+            if self._pending >= _COMMIT_EVERY:
+                self._flush_locked()
+        return digest
+
+    def _flush_locked(self) -> None:
+        if self._writer is not None:
+            self._writer.flush()
+        self._conn.commit()
+        self._pending = 0
+
+    def flush(self) -> None:
+        with self._lock:
+            self._flush_locked()
+
+    # ---- reading ----
+
+    def get(self, digest: str) -> Optional[bytes]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT segment, offset, length FROM blobs WHERE hash=?", (digest,)
+            ).fetchone()
+            if row is None:
+                return None
+            segment, offset, length = row
+            if segment == self._segment and self._writer is not None:
+                self._writer.flush()
+            f = self._readers.get(segment)
+            if f is None:
+                f = self._readers[segment] = open(segment_path(self.root, segment), "rb")
+            f.seek(offset)
+            packed = f.read(length)
+        return zlib.decompress(packed)
+
+    def latest_pages(self, *, source: Optional[str] = None) -> Iterator[ArchivedPage]:
+        """The most recent body per URL (optionally for one source), in URL order."""
+        # SQLite fills the bare columns from the row that holds the MAX()
+        sql = """
+            SELECT p.url, p.source, p.hash, MAX(p.last_fetched_at), b.segment, b.offset, b.length
+            FROM pages p JOIN blobs b ON b.hash = p.hash {where}
+            GROUP BY p.url
+            ORDER BY p.url
+        """
+        where, params = ("WHERE p.source = ?", (source,)) if source is not None else ("", ())
+        with self._lock:
+            self._flush_locked()
+            rows = self._conn.execute(sql.format(where=where), params).fetchall()
+        for row in rows:
+            yield ArchivedPage(*row)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            pages, blobs, raw, packed = self._conn.execute(
+                "SELECT (SELECT COUNT(*) FROM pages), COUNT(*), COALESCE(SUM(raw_length), 0), "
+                "COALESCE(SUM(length), 0) FROM blobs"
+            ).fetchone()
+        return {"pages": pages, "blobs": blobs, "raw_bytes": raw, "stored_bytes": packed}
+
+    def close(self) -> None:
+        with self._lock:
+            self._flush_locked()
+            if self._writer is not None:
+                self._writer.close()
+                self._writer = None
+            for f in self._readers.values():
+                f.close()
+            self._readers.clear()
+            self._conn.close()
+        if self.stored or self.deduped:
+            log.info("Page archive %s: %d bodies stored, %d deduplicated", self.root, self.stored, self.deduped)
+
+    def __enter__(self) -> "PageArchive":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
@@ -0,0 +1,314 @@
+# cgpe/storage/profiling.py
+
+from __future__ import annotations
+
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections import deque
+from dataclasses import asdict, dataclass, field
+from typing import Any, Deque, Dict, List, Optional
+
+from cgpe.config.storage import env_flag
+from cgpe.utils.time import utc_now_iso
+
+# upper bounds in ms; the last bucket catches everything slower
+LATENCY_BUCKETS_MS: tuple[float, ...] = (0.1, 0.5, 1, 5, 10, 50, 100, 500, 1000, float("inf"))
+
+_WS_RE = re.compile(r"\s+")
+_STR_RE = re.compile(r"'(?:[^']|'')*'")
+_NUM_RE = re.compile(r"\b\d+(?:\.\d+)?\b")
+_IN_LIST_RE = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+
+
+def normalize_sql(sql: str) -> str:
+    """Collapse whitespace and literals so the same statement with different values aggregates together."""
+    s = _WS_RE.sub(" ", sql).strip().rstrip(";").strip()
+    s = _STR_RE.sub("?", s)
+    s = _NUM_RE.sub("?", s)
+    return _IN_LIST_RE.sub("(?...)", s)
+
+
+def params_shape(params: Any) -> str:
+    if params is None:
+        return "()"
+    if isinstance(params, dict):
+        return "{" + ", ".join(f"{k}: {type(v).__name__}" for k, v in params.items()) + "}"
+    try:
+        return "(" + ", ".join(type(v).__name__ for v in params) + ")"
+    except TypeError:
+        return type(params).__name__
+
+
+def is_full_scan(plan: List[str]) -> bool:
+    # SEARCH = index seek. SCAN walks every row, even "SCAN t USING INDEX i"
+    # (that only means rows come back in index order, e.g. for ORDER BY).
+    # Virtual tables (json_each over bound parameters) are inputs, not tables.
+    return any(
+        d.startswith("SCAN ") and "CONSTANT ROW" not in d and "VIRTUAL TABLE" not in d
+        for d in plan
+    )
+
+
+@dataclass
+class QueryStats:
+    sql: str
+    count: int = 0
+    total_ms: float = 0.0
+    max_ms: float = 0.0
+    rows: int = 0
+    buckets: List[int] = field(default_factory=lambda: [0] * len(LATENCY_BUCKETS_MS))
+    plan: List[str] = field(default_factory=list)
+    full_scan: bool = False
+
+    @property
+    def mean_ms(self) -> float:
+        return self.total_ms / self.count if self.count else 0.0
+
+    def observe(self, elapsed_ms: float, rows: int) -> None:
+        self.count += 1
+        self.total_ms += elapsed_ms
+        self.max_ms = max(self.max_ms, elapsed_ms)
+        self.rows += rows
+        for i, bound in enumerate(LATENCY_BUCKETS_MS):
+            if elapsed_ms <= bound:
+                self.buckets[i] += 1
+                break
+
+
+@dataclass
+class SlowQuery:
+    sql: str
+    params_shape: str
+    elapsed_ms: float
+    rows: int
+    plan: List[str]
+    full_scan: bool
+    at: str
+
+
+class QueryProfiler:
+    """Process-wide statement timings, fed by ProfiledConnection."""
+
+    def __init__(self, *, enabled: bool = False, slow_ms: float = 50.0, slow_log_size: int = 200) -> None:
+        self.enabled = enabled
+        self.slow_ms = slow_ms
+        self._lock = threading.Lock()
+        self._stats: Dict[str, QueryStats] = {}
+        self._slow: Deque[SlowQuery] = deque(maxlen=slow_log_size)
+
+    def _needs_plan(self, key: str) -> bool:
+        with self._lock:
+            return key not in self._stats
+
+    def record(
+        self,
+        conn: sqlite3.Connection,
+        sql: str,
+        params: Any,
+        elapsed_ms: float,
+        rows: int,
+    ) -> None:
+        key = normalize_sql(sql)
+
+        # EXPLAIN only once per distinct statement, and for anything slow
+        plan: Optional[List[str]] = None
+        slow = elapsed_ms >= self.slow_ms
+        if self._needs_plan(key) or slow:
+            plan = explain_query_plan(conn, sql, params)
+
+        with self._lock:
+            stats = self._stats.get(key)
+            if stats is None:
+                stats = self._stats[key] = QueryStats(sql=key)
+            if plan is not None and not stats.plan:
+                stats.plan = plan
+                stats.full_scan = is_full_scan(plan)
+            stats.observe(elapsed_ms, rows)
+
+            if slow:
+                self._slow.append(
+                    SlowQuery(
+                        sql=key,
+                        params_shape=params_shape(params),
+                        elapsed_ms=elapsed_ms,
+                        rows=rows,
+                        plan=plan or [],
+                        full_scan=is_full_scan(plan or []),
+                        at=utc_now_iso(),
+                    )
+                )
+
+    def reset(self) -> None:
+        with self._lock:
+            self._stats.clear()
+            self._slow.clear()
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = sorted(self._stats.values(), key=lambda s: s.total_ms, reverse=True)
+            return {
+                "enabled": self.enabled,
+                "slow_ms": self.slow_ms,
+                "buckets_ms": [b if b != float("inf") else "+Inf" for b in LATENCY_BUCKETS_MS],
+                "queries": [
+                    {**asdict(s), "mean_ms": s.mean_ms}
+                    for s in stats
+                ],
+                "slow": [asdict(q) for q in reversed(self._slow)],
+            }
+
+    def report_text(self, *, top: int = 20) -> str:
+        snap = self.snapshot()
+        lines = [
+            f"{'calls':>7} {'total ms':>10} {'mean ms':>9} {'max ms':>9} {'rows':>8}  scan  sql",
+            "-" * 100,
+        ]
+        for q in snap["queries"][:top]:
+            lines.append(
+                f"{q['count']:>7} {q['total_ms']:>10.1f} {q['mean_ms']:>9.2f} {q['max_ms']:>9.2f} "
+                f"{q['rows']:>8}  {'FULL' if q['full_scan'] else '    '}  {q['sql'][:160]}"
+            )
+            for step in q["plan"]:
+                lines.append(f"{'':>49}  plan: {step}")
+
+        if snap["slow"]:
+            lines += ["", f"slow queries (>= {self.slow_ms:.0f} ms, newest first):"]
+            for s in snap["slow"][:top]:
+                lines.append(
+                    f"  {s['at']}  {s['elapsed_ms']:.1f} ms  rows={s['rows']}  params={s['params_shape']}"
+                    f"{'  FULL SCAN' if s['full_scan'] else ''}\n    {s['sql'][:200]}"
+                )
+        return "\n".join(lines)
+
+
+def explain_query_plan(conn: sqlite3.Connection, sql: str, params: Any) -> List[str]:
+    head = sql.lstrip().split(None, 1)[0].upper() if sql.strip() else ""
+    if head not in ("SELECT", "WITH", "UPDATE", "DELETE", "INSERT", "REPLACE"):
+        return []
+    try:
+        # plain Cursor: EXPLAIN itself must not be profiled
+        cur = sqlite3.Connection.cursor(conn, sqlite3.Cursor)
+        rows = cur.execute(f"EXPLAIN QUERY PLAN {sql}", params if params is not None else ()).fetchall()
+    except sqlite3.Error:
+        return []
+    return [r[-1] for r in rows]
+
+
+PROFILER = QueryProfiler(
+    enabled=env_flag("CGPE_SQL_PROFILE"),
+    slow_ms=float(os.getenv("CGPE_SLOW_QUERY_MS", "50")),
+)
+
+
+class ProfiledCursor(sqlite3.Cursor):
+    """
+    Times execute() plus every fetch, and reports the statement to PROFILER
+    once its results are exhausted, the cursor is reused, or it is dropped.
+    """
+
+    _pending: Optional[tuple[str, Any]] = None
+    _elapsed: float = 0.0
+    _rows: int = 0
+
+    def _finish(self) -> None:
+        pending, self._pending = self._pending, None
+        if pending is None:
+            return
+        sql, params = pending
+        PROFILER.record(self.connection, sql, params, self._elapsed * 1000.0, self._rows)
+
+    def _start(self, sql: str, params: Any) -> None:
+        self._finish()
+        self._pending = (sql, params)
+        self._elapsed = 0.0
+        self._rows = 0
+
+    def execute(self, sql: str, parameters: Any = (), /):  # type: ignore[override]
+        self._start(sql, parameters)
+        t0 = time.perf_counter()
+        try:
+            return super().execute(sql, parameters)
+        finally:
+            self._elapsed += time.perf_counter() - t0
+            if self.description is None:
+                # no result set (DML / DDL): nothing left to fetch
+                self._rows = max(self.rowcount, 0)
+                self._finish()
+
+    def executemany(self, sql: str, seq_of_parameters: Any, /):  # type: ignore[override]
+        self._start(sql, None)
+        t0 = time.perf_counter()
+        try:
+            return super().executemany(sql, seq_of_parameters)
+        finally:
+            self._elapsed += time.perf_counter() - t0
+            self._rows = max(self.rowcount, 0)
+            self._finish()
+
+    def fetchone(self):
+        t0 = time.perf_counter()
+        row = super().fetchone()
+        self._elapsed += time.perf_counter() - t0
+        if row is None:
+            self._finish()
+        else:
+            self._rows += 1
+        return row
+
+    def fetchmany(self, size: int = -1):
+        t0 = time.perf_counter()
+        rows = super().fetchmany(self.arraysize if size < 0 else size)
+        self._elapsed += time.perf_counter() - t0
+        self._rows += len(rows)
+        if not rows:
+            self._finish()
+        return rows
+
+    def fetchall(self):
+        t0 = time.perf_counter()
+        rows = super().fetchall()
+        self._elapsed += time.perf_counter() - t0
+        self._rows += len(rows)
+        self._finish()
+        return rows
+
+    def __next__(self):
+        t0 = time.perf_counter()
+        try:
+            row = super().__next__()
+        except StopIteration:
+            self._elapsed += time.perf_counter() - t0
+            self._finish()
+            raise
+        self._elapsed += time.perf_counter() - t0
+        self._rows += 1
+        return row
+
+    def close(self) -> None:
+        self._finish()
+        super().close()
+
+    def __del__(self) -> None:
+        try:
+            self._finish()
+        except Exception:
+            pass
+
+
+class ProfiledConnection(sqlite3.Connection):
+    def cursor(self, factory: Any = None):  # type: ignore[override]
+        return super().cursor(factory or ProfiledCursor)
+
+    def execute(self, sql: str, parameters: Any = (), /):  # type: ignore[override]
+        return self.cursor().execute(sql, parameters)
+
+    def executemany(self, sql: str, seq_of_parameters: Any, /):  # type: ignore[override]
+        return self.cursor().executemany(sql, seq_of_parameters)
+
+
+def connection_factory() -> type[sqlite3.Connection]:
+    """`factory=` for sqlite3.connect: instrumented only while profiling is on."""
+    return ProfiledConnection if PROFILER.enabled else sqlite3.Connection
@@ -0,0 +1,129 @@
+# cgpe/storage/queries/export.py
+
+from __future__ import annotations
+
+import csv
+import io
+import json
+import sqlite3
+import zlib
+from dataclasses import dataclass
+from typing import Any, Iterable, Iterator, List, Optional, Sequence
+
+from cgpe.models.detail import Detail
+
+EXPORT_COLUMNS: tuple[str, ...] = ("id", *Detail.COLUMNS)
+EXPORT_FORMATS = ("ndjson", "csv")
+
+# flush encoded output roughly every this many bytes
+_FLUSH_BYTES = 64 * 1024
+
+
+@dataclass
+class ExportFilters:
+    source: Optional[str] = None
+    set_link: Optional[str] = None
+    min_profit: Optional[float] = None
+    scraped_since: Optional[str] = None
+
+
+def resolve_columns(columns: Optional[Sequence[str]]) -> List[str]:
+    if not columns:
+        return list(EXPORT_COLUMNS)
+    unknown = [c for c in columns if c not in EXPORT_COLUMNS]
+    if unknown:
+        raise ValueError(f"Unknown export columns: {', '.join(unknown)}")
+    return list(columns)
+
+
+def iter_export_rows(
+    conn: sqlite3.Connection,
+    *,
+    columns: Sequence[str],
+    filters: ExportFilters,
+    chunk_size: int = 1000,
+) -> Iterator[tuple]:
+    """Stream rows with fetchmany so memory stays flat regardless of table size."""
+    where = []
+    params: list[Any] = []
+
+    if filters.source:
+        where.append("source = ?")
+        params.append(filters.source)
+    if filters.set_link:
+        where.append("set_link = ?")
+        params.append(filters.set_link)
+    if filters.min_profit is not None:
+        where.append("expected_profit >= ?")
+        params.append(filters.min_profit)
+    if filters.scraped_since:
+        where.append("scraped_at >= ?")
+        params.append(filters.scraped_since)
+
+    where_sql = f"WHERE {' AND '.join(where)}" if where else ""
+
+    # plain tuples: no sqlite3.Row / dict allocation per row
+    cur = conn.cursor()
+    cur.row_factory = None
+    cur.execute(f"SELECT {', '.join(columns)} FROM {Detail.TABLE} {where_sql}", params)
+
+    while True:
+        rows = cur.fetchmany(chunk_size)
+        if not rows:
+            break
+        yield from rows
+
+
+def encode_ndjson(columns: Sequence[str], rows: Iterable[tuple]) -> Iterator[bytes]:
+    buf: List[str] = []
+    size = 0
+    for row in rows:
+        line = json.dumps(dict(zip(columns, row)), ensure_ascii=False, separators=(",", ":"))
+        buf.append(line)
+        size += len(line) + 1
+        if size >= _FLUSH_BYTES:
+            yield ("\n".join(buf) + "\n").encode("utf-8")
+            buf, size = [], 0
+    if buf:
+        yield ("\n".join(buf) + "\n").encode("utf-8")
+
+
+def encode_csv(columns: Sequence[str], rows: Iterable[tuple]) -> Iterator[bytes]:
+    out = io.StringIO()
+    writer = csv.writer(out)
+    writer.writerow(columns)
+    for row in rows:
+        writer.writerow(row)
+        if out.tell() >= _FLUSH_BYTES:
+            yield out.getvalue().encode("utf-8")
+            out.seek(0)
+            out.truncate()
+    if out.tell():
+        yield out.getvalue().encode("utf-8")
+
+
+def gzip_chunks(chunks: Iterable[bytes], *, level: int = 6) -> Iterator[bytes]:
+    z = zlib.compressobj(level, zlib.DEFLATED, 31)  # wbits=31 -> gzip container
+    for chunk in chunks:
+        data = z.compress(chunk)
+        if data:
+            yield data
+    yield z.flush()
+
+
+def export_stream(
+    conn: sqlite3.Connection,
+    *,
+    fmt: str = "ndjson",
+    columns: Optional[Sequence[str]] = None,
+    filters: Optional[ExportFilters] = None,
+    gzip: bool = False,
+    chunk_size: int = 1000,
+) -> Iterator[bytes]:
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"Unknown export format: {fmt!r} (expected one of {', '.join(EXPORT_FORMATS)})")
+
+    cols = resolve_columns(columns)
+    rows = iter_export_rows(conn, columns=cols, filters=filters or ExportFilters(), chunk_size=chunk_size)
+    chunks = encode_ndjson(cols, rows) if fmt == "ndjson" else encode_csv(cols, rows)
+    return gzip_chunks(chunks) if gzip else chunks
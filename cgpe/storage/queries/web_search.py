@@ -2,7 +2,6 @@
 
 import re
 from typing import Any, Optional
-from rapidfuzz import fuzz
 import sqlite3
 import logging
 
@@ -36,7 +35,9 @@ def search_card_details(
     limit: int = 25,
     candidate_limit: int = 250,
 ) -> list[dict[str, Any]]:
-    
+    # lazy: keeps rapidfuzz's C extension out of app import time
+    from rapidfuzz import fuzz
+
     q_raw = q or ""
     q_num = _extract_num(q_raw)
     q_text = _strip_num(q_raw)
@@ -0,0 +1,33 @@
+# cgpe/storage/run_repo.py
+from __future__ import annotations
+
+import sqlite3
+from typing import List, Optional
+
+from cgpe.models.run import ScrapeRun
+
+
+def insert_run(conn: sqlite3.Connection, run: ScrapeRun) -> int:
+    row = run.to_db_row()
+    cols = list(row)
+    with conn:
+        cur = conn.execute(
+            f"INSERT INTO {ScrapeRun.TABLE} ({', '.join(cols)}) VALUES ({', '.join('?' for _ in cols)});",
+            [row[c] for c in cols],
+        )
+    run.run_id = cur.lastrowid
+    return run.run_id
+
+
+def recent_runs(conn: sqlite3.Connection, *, limit: int = 20, source: Optional[str] = None) -> List[ScrapeRun]:
+    sql = f"SELECT * FROM {ScrapeRun.TABLE}"
+    params: list = []
+    if source is not None:
+        sql += " WHERE source = ?"
+        params.append(source)
+    sql += " ORDER BY started_at DESC LIMIT ?;"
+    params.append(limit)
+
+    cur = conn.execute(sql, params)
+    names = [d[0] for d in cur.description]
+    return [ScrapeRun.from_db_row(dict(zip(names, r))) for r in cur.fetchall()]
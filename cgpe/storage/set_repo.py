@@ -0,0 +1,168 @@
+# cgpe/storage/set_repo.py
+from __future__ import annotations
+
+import json
+import sqlite3
+from dataclasses import dataclass, field
+from typing import AbstractSet, Dict, List, Optional, Sequence
+
+from cgpe.models.set import SetPage, SetProduct, SetRecord
+from cgpe.metrics.storage import DB_ROWS_WRITTEN, timed_op
+
+
+@dataclass
+class SetDiff:
+    """A fetched set listing compared against the stored one."""
+    set_link: str
+    new: List[SetProduct] = field(default_factory=list)
+    changed: List[SetProduct] = field(default_factory=list)
+    unchanged: List[SetProduct] = field(default_factory=list)
+    # detail links listed last time and missing now
+    removed: List[str] = field(default_factory=list)
+
+    @property
+    def moved(self) -> List[SetProduct]:
+        return self.new + self.changed
+
+
+@timed_op("diff_set_page")
+def diff_set_page(conn: sqlite3.Connection, page: SetPage, *, source: Optional[str]) -> SetDiff:
+    diff = SetDiff(set_link=page.set_link)
+
+    row = conn.execute(
+        f"SELECT fingerprint FROM {SetRecord.TABLE} WHERE set_link = ? AND source IS ?;",
+        (page.set_link, source),
+    ).fetchone()
+    if row is not None and row[0] == page.fingerprint():
+        # nothing added, removed or repriced: skip the per-product compare
+        diff.unchanged = list(page.products)
+        return diff
+
+    stored: Dict[str, tuple[str, Optional[str]]] = {
+        r[0]: (r[1], r[2])
+        for r in conn.execute(
+            f"SELECT detail_link, fingerprint, removed_at FROM {SetProduct.TABLE} "
+            "WHERE set_link = ? AND source IS ?;",
+            (page.set_link, source),
+        )
+    }
+
+    listed = set()
+    for p in page.products:
+        listed.add(p.detail_link)
+        prev = stored.get(p.detail_link)
+        if prev is None or prev[1] is not None:
+            diff.new.append(p)  # first listing, or back after being removed
+        elif prev[0] != p.fingerprint():
+            diff.changed.append(p)
+        else:
+            diff.unchanged.append(p)
+
+    diff.removed = [link for link, (_, removed_at) in stored.items() if removed_at is None and link not in listed]
+    return diff
+
+
+_UPSERT_SET = f"""
+INSERT INTO {SetRecord.TABLE}
+    (set_link, source, product_count, fingerprint, first_seen_at, last_seen_at, last_changed_at)
+VALUES (:set_link, :source, :product_count, :fingerprint, :seen_at, :seen_at, :seen_at)
+ON CONFLICT(set_link, source) DO UPDATE SET
+    product_count = excluded.product_count,
+    last_changed_at = CASE WHEN {SetRecord.TABLE}.fingerprint IS NOT excluded.fingerprint
+        THEN excluded.last_changed_at ELSE {SetRecord.TABLE}.last_changed_at END,
+    fingerprint = excluded.fingerprint,
+    last_seen_at = excluded.last_seen_at;
+"""
+
+_UPSERT_PRODUCT = f"""
+INSERT INTO {SetProduct.TABLE}
+    (set_link, source, detail_link, product_id, name, ungraded_price, grade9_price, psa10_price,
+     fingerprint, first_seen_at, last_seen_at, last_changed_at, removed_at)
+VALUES
+    (:set_link, :source, :detail_link, :product_id, :name, :ungraded_price, :grade9_price, :psa10_price,
+     :fingerprint, :seen_at, :seen_at, :seen_at, NULL)
+ON CONFLICT(set_link, source, detail_link) DO UPDATE SET
+    product_id = excluded.product_id,
+    name = excluded.name,
+    ungraded_price = excluded.ungraded_price,
+    grade9_price = excluded.grade9_price,
+    psa10_price = excluded.psa10_price,
+    last_changed_at = CASE
+        WHEN {SetProduct.TABLE}.fingerprint IS NOT excluded.fingerprint OR {SetProduct.TABLE}.removed_at IS NOT NULL
+        THEN excluded.last_changed_at ELSE {SetProduct.TABLE}.last_changed_at END,
+    fingerprint = excluded.fingerprint,
+    last_seen_at = excluded.last_seen_at,
+    removed_at = NULL;
+"""
+
+
+@timed_op("first_listed_at")
+def first_listed_at(conn: sqlite3.Connection, links: Sequence[str], *, source: Optional[str]) -> Dict[str, str]:
+    """When each detail link was first seen in any stored listing (links never listed are absent)."""
+    if not links:
+        return {}
+    rows = conn.execute(
+        f"SELECT detail_link, MIN(first_seen_at) FROM {SetProduct.TABLE} "
+        "WHERE source IS ? AND detail_link IN (SELECT value FROM json_each(?)) "
+        "GROUP BY detail_link;",
+        (source, json.dumps(list(links))),
+    )
+    return {r[0]: r[1] for r in rows}
+
+
+@timed_op("save_set_pages")
+def save_set_pages(
+    conn: sqlite3.Connection,
+    pages: Sequence[SetPage],
+    *,
+    source: Optional[str],
+    seen_at: str,
+    hold: AbstractSet[str] = frozenset(),
+) -> int:
+    """
+    Store the listings as the baseline for the next diff, in one transaction.
+
+    Links in `hold` (queued for a detail fetch that didn't land) keep their
+    previous row, so the next run sees them as moved again and retries.
+    Products missing from a listing are marked removed, not deleted.
+    """
+    n = 0
+    with conn:
+        for page in pages:
+            held = hold.intersection(p.detail_link for p in page.products)
+            # a held product must not hide behind an unchanged set fingerprint
+            fingerprint = "" if held else page.fingerprint()
+            conn.execute(_UPSERT_SET, {
+                "set_link": page.set_link,
+                "source": source,
+                "product_count": len(page.products),
+                "fingerprint": fingerprint,
+                "seen_at": seen_at,
+            })
+
+            rows = [
+                {
+                    "set_link": page.set_link,
+                    "source": source,
+                    "detail_link": p.detail_link,
+                    "product_id": p.product_id,
+                    "name": p.name,
+                    "ungraded_price": p.ungraded_price,
+                    "grade9_price": p.grade9_price,
+                    "psa10_price": p.psa10_price,
+                    "fingerprint": p.fingerprint(),
+                    "seen_at": seen_at,
+                }
+                for p in page.products if p.detail_link not in held
+            ]
+            conn.executemany(_UPSERT_PRODUCT, rows)
+            n += len(rows)
+
+            conn.execute(
+                f"UPDATE {SetProduct.TABLE} SET removed_at = ? "
+                "WHERE set_link = ? AND source IS ? AND removed_at IS NULL "
+                "AND detail_link NOT IN (SELECT value FROM json_each(?));",
+                (seen_at, page.set_link, source, json.dumps([p.detail_link for p in page.products])),
+            )
+    DB_ROWS_WRITTEN.labels("save_set_pages").inc(n)
+    return n
@@ -0,0 +1,133 @@
+# cgpe/storage/shards.py
+
+from __future__ import annotations
+
+import re
+import sqlite3
+from pathlib import Path
+from typing import Iterable, List, Optional, Sequence, Type
+
+from cgpe.config.storage import StorageConfig
+from cgpe.models.detail import Detail
+from cgpe.storage.profiling import connection_factory
+from cgpe.storage.snapshot import snapshot_path_for
+from cgpe.storage.sqlite_db import connect_sqlite, sync_schema
+from cgpe.storage.migrations import migrate
+from cgpe.logging.logger import setup_logger
+
+log = setup_logger(__name__)
+
+_SLUG_RE = re.compile(r"[^a-z0-9]+")
+
+# tables that exist in every shard and get a federated view on read connections
+FEDERATED_MODELS: tuple[Type, ...] = (Detail,)
+
+
+def shard_name(source: Optional[str]) -> str:
+    """'Pokemon PriceCharting' -> 'pokemon_pricecharting'"""
+    slug = _SLUG_RE.sub("_", (source or "").lower()).strip("_")
+    return slug or "default"
+
+
+def shard_path(config: StorageConfig, source: Optional[str]) -> Path:
+    return Path(config.shard_dir) / f"{shard_name(source)}.sqlite3"
+
+
+def writer_db_path(config: StorageConfig, source: Optional[str]) -> Path:
+    """Where a scrape of `source` writes: its own shard when sharded, else the single DB."""
+    return shard_path(config, source) if config.sharded else Path(config.db_path)
+
+
+def list_shard_paths(config: StorageConfig) -> List[Path]:
+    shard_dir = Path(config.shard_dir)
+    if not shard_dir.exists():
+        return []
+    return sorted(
+        p for p in shard_dir.glob("*.sqlite3")
+        if not p.name.endswith(".snapshot.sqlite3")
+    )
+
+
+def connect_shard(config: StorageConfig, source: Optional[str]) -> sqlite3.Connection:
+    """Writer connection for one source's shard (each shard has its own writer lock)."""
+    conn = connect_sqlite(shard_path(config, source))
+    migrate(conn)
+    return conn
+
+
+def _union_view_sql(table: str, aliases: Sequence[str]) -> str:
+    selects = "\n            UNION ALL\n            ".join(
+        f"SELECT * FROM {alias}.{table}" for alias in aliases
+    )
+    return f"""
+        CREATE TEMP VIEW {table} AS
+            {selects};
+    """.strip()
+
+
+def connect_federated(
+    paths: Iterable[str | Path],
+    *,
+    immutable: bool = False,
+    mmap_bytes: int = 0,
+    check_same_thread: bool = True,
+    models: Sequence[Type] = FEDERATED_MODELS,
+) -> sqlite3.Connection:
+    """
+    Read connection over several shard files.
+
+    Every shard is ATTACHed read-only as shard0..shardN and each model table
+    gets a TEMP view of the same name (`UNION ALL` over the shards), so
+    existing queries against e.g. `card_details` work unchanged.
+    """
+    paths = [Path(p) for p in paths]
+
+    conn = sqlite3.connect(
+        "file::memory:",
+        uri=True,
+        factory=connection_factory(),
+        check_same_thread=check_same_thread,
+    )
+    conn.row_factory = sqlite3.Row
+
+    if not paths:
+        # nothing scraped yet: expose empty tables so readers still work
+        sync_schema(conn, models)
+        return conn
+
+    max_attached = conn.getlimit(sqlite3.SQLITE_LIMIT_ATTACHED)
+    if len(paths) > max_attached:
+        conn.close()
+        raise ValueError(f"Too many shards to federate: {len(paths)} > SQLITE_LIMIT_ATTACHED={max_attached}")
+
+    mode = "mode=ro&immutable=1" if immutable else "mode=ro"
+    aliases = []
+    for i, path in enumerate(paths):
+        alias = f"shard{i}"
+        conn.execute(f"ATTACH DATABASE ? AS {alias};", (f"{path.resolve().as_uri()}?{mode}",))
+        if mmap_bytes:
+            conn.execute(f"PRAGMA {alias}.mmap_size={int(mmap_bytes)};")
+        aliases.append(alias)
+
+    for m in models:
+        conn.execute(_union_view_sql(m.TABLE, aliases))
+
+    log.debug("Federated %d shards: %s", len(paths), ", ".join(str(p) for p in paths))
+    return conn
+
+
+def connect_federated_reader(config: StorageConfig, *, check_same_thread: bool = True) -> sqlite3.Connection:
+    """Federated read connection; uses each shard's published snapshot when enabled and present."""
+    shards = list_shard_paths(config)
+
+    if config.read_from_snapshot:
+        snapshots = [snapshot_path_for(p) for p in shards]
+        if snapshots and all(s.exists() for s in snapshots):
+            return connect_federated(
+                snapshots,
+                immutable=True,
+                mmap_bytes=config.snapshot_mmap_bytes,
+                check_same_thread=check_same_thread,
+            )
+
+    return connect_federated(shards, check_same_thread=check_same_thread)
@@ -0,0 +1,93 @@
+# cgpe/storage/snapshot.py
+
+from __future__ import annotations
+
+import os
+import sqlite3
+from pathlib import Path
+
+from cgpe.storage.profiling import connection_factory
+from cgpe.logging.logger import setup_logger
+
+log = setup_logger(__name__)
+
+
+def snapshot_path_for(db_path: str | Path) -> Path:
+    """data/cgpe.sqlite3 -> data/cgpe.snapshot.sqlite3"""
+    db_path = Path(db_path)
+    return db_path.with_name(f"{db_path.stem}.snapshot{db_path.suffix}")
+
+
+def publish_snapshot(conn: sqlite3.Connection, snapshot_path: str | Path) -> Path:
+    """
+    Publish a consistent, read-only copy of `conn`'s main database.
+
+    The copy is built next to the target with the online backup API (a single
+    read transaction, so WAL writers are never blocked), converted to a
+    standalone rollback-journal file, and then atomically renamed over the
+    previous snapshot. Readers that already have the old file open keep
+    reading it; new connections see the new one.
+    """
+    snapshot_path = Path(snapshot_path)
+    snapshot_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = snapshot_path.with_name(f".{snapshot_path.name}.{os.getpid()}.tmp")
+
+    dst = sqlite3.connect(str(tmp_path))
+    try:
+        conn.backup(dst)
+        # immutable readers must never need a -wal / -shm sidecar
+        dst.execute("PRAGMA journal_mode=DELETE;")
+        dst.commit()
+    except Exception:
+        dst.close()
+        tmp_path.unlink(missing_ok=True)
+        raise
+    dst.close()
+
+    os.replace(tmp_path, snapshot_path)
+
+    # web readers are off the working DB now, so checkpoints can actually finish
+    conn.execute("PRAGMA wal_checkpoint(PASSIVE);")
+
+    log.info("Published snapshot %s (%d bytes)", snapshot_path, snapshot_path.stat().st_size)
+    return snapshot_path
+
+
+def connect_snapshot(
+    snapshot_path: str | Path,
+    *,
+    mmap_bytes: int = 256 * 1024 * 1024,
+    check_same_thread: bool = True,
+) -> sqlite3.Connection:
+    """
+    Open a published snapshot read-only. `immutable=1` skips all locking and
+    change detection, which is safe because snapshots are only ever replaced
+    (new inode), never modified in place.
+    """
+    uri = f"{Path(snapshot_path).resolve().as_uri()}?mode=ro&immutable=1"
+    conn = sqlite3.connect(uri, uri=True, factory=connection_factory(), check_same_thread=check_same_thread)
+    conn.row_factory = sqlite3.Row
+
+    conn.execute(f"PRAGMA mmap_size={int(mmap_bytes)};")
+    conn.execute("PRAGMA query_only=ON;")
+
+    return conn
+
+
+class SnapshotPublisher:
+    """Publishes a snapshot after every `every` persisted rows (0 = only on explicit publish)."""
+
+    def __init__(self, conn: sqlite3.Connection, snapshot_path: str | Path, *, every: int = 0) -> None:
+        self.conn = conn
+        self.snapshot_path = Path(snapshot_path)
+        self.every = every
+        self._pending = 0
+
+    def note_writes(self, n: int = 1) -> None:
+        self._pending += n
+        if self.every and self._pending >= self.every:
+            self.publish()
+
+    def publish(self) -> Path:
+        self._pending = 0
+        return publish_snapshot(self.conn, self.snapshot_path)
@@ -4,6 +4,10 @@ import sqlite3
 from pathlib import Path
 from typing import Iterable, Type
 
+from cgpe.config.storage import StorageConfig
+from cgpe.storage.profiling import connection_factory
+from cgpe.storage.snapshot import connect_snapshot, snapshot_path_for
+
 
 def _table_exists(conn: sqlite3.Connection, table: str) -> bool:
     row = conn.execute(
@@ -45,47 +49,81 @@ def _ensure_indexes(conn: sqlite3.Connection, model: Type) -> None:
         conn.execute(f"CREATE INDEX IF NOT EXISTS {name} ON {model.TABLE}({cols_sql});")
 
 
-def sync_schema(conn: sqlite3.Connection, models: Iterable[Type]) -> None:
+def apply_model_schema(conn: sqlite3.Connection, models: Iterable[Type], *, indexes: bool = True) -> None:
     """
     Forward-only schema sync:
       - create missing tables
       - add missing columns
-      - create missing indexes
+      - create missing indexes (unless `indexes=False`)
     Never drops/renames columns automatically.
+
+    Runs in the caller's transaction (no commit), so migrations can wrap it.
+    Indexes on an existing table scan every row; migrations that must stay
+    short inside BEGIN IMMEDIATE skip them and build them in a later step.
     """
-    with conn:
-        for m in models:
-            if not hasattr(m, "TABLE") or not hasattr(m, "DDL_COLUMNS"):
-                raise ValueError(f"Model {m} missing TABLE / DDL_COLUMNS")
+    for m in models:
+        if not hasattr(m, "TABLE") or not hasattr(m, "DDL_COLUMNS"):
+            raise ValueError(f"Model {m} missing TABLE / DDL_COLUMNS")
 
-            if not _table_exists(conn, m.TABLE):
-                conn.executescript(_create_table_sql(m))
+        if not _table_exists(conn, m.TABLE):
+            conn.execute(_create_table_sql(m))
+            if indexes:
                 _ensure_indexes(conn, m)
-                continue
+            continue
 
-            existing = _existing_columns(conn, m.TABLE)
+        existing = _existing_columns(conn, m.TABLE)
 
-            for col, ddl in m.DDL_COLUMNS.items():
-                if col in existing:
-                    continue
+        for col, ddl in m.DDL_COLUMNS.items():
+            if col in existing:
+                continue
 
-                # SQLite limitations: can't add PK via ALTER TABLE
-                if "PRIMARY KEY" in ddl.upper():
-                    raise ValueError(f"Cannot ALTER ADD PRIMARY KEY column: {m.TABLE}.{col}")
+            # SQLite limitations: can't add PK via ALTER TABLE
+            if "PRIMARY KEY" in ddl.upper():
+                raise ValueError(f"Cannot ALTER ADD PRIMARY KEY column: {m.TABLE}.{col}")
 
-                conn.execute(f"ALTER TABLE {m.TABLE} ADD COLUMN {col} {ddl};")
+            conn.execute(f"ALTER TABLE {m.TABLE} ADD COLUMN {col} {ddl};")
 
+        if indexes:
             _ensure_indexes(conn, m)
 
-def connect_sqlite(db_path: str | Path) -> sqlite3.Connection:
+
+def sync_schema(conn: sqlite3.Connection, models: Iterable[Type]) -> None:
+    """apply_model_schema in its own transaction."""
+    with conn:
+        apply_model_schema(conn, models)
+
+
+def connect_sqlite(db_path: str | Path, *, check_same_thread: bool = True) -> sqlite3.Connection:
     db_path = Path(db_path)
     db_path.parent.mkdir(parents=True, exist_ok=True)
 
-    conn = sqlite3.connect(str(db_path))
+    conn = sqlite3.connect(str(db_path), factory=connection_factory(), check_same_thread=check_same_thread)
     conn.row_factory = sqlite3.Row
 
     conn.execute("PRAGMA journal_mode=WAL;")
     conn.execute("PRAGMA foreign_keys=ON;")
     conn.execute("PRAGMA busy_timeout=5000;")
 
-    return conn
\ No newline at end of file
+    return conn
+
+
+def connect_reader(config: StorageConfig, *, check_same_thread: bool = True) -> sqlite3.Connection:
+    """
+    Connection for read-only consumers (web tier): the federated shards when
+    sharded, the published snapshot when enabled, else the working DB.
+    """
+    if config.sharded:
+        # local import: shards builds on this module
+        from cgpe.storage.shards import connect_federated_reader
+        return connect_federated_reader(config, check_same_thread=check_same_thread)
+
+    if config.read_from_snapshot:
+        snapshot = snapshot_path_for(config.db_path)
+        if snapshot.exists():
+            return connect_snapshot(
+                snapshot,
+                mmap_bytes=config.snapshot_mmap_bytes,
+                check_same_thread=check_same_thread,
+            )
+
+    return connect_sqlite(config.db_path, check_same_thread=check_same_thread)
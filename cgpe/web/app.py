@@ -1,51 +1,186 @@
 # cgpe/web/app.py
 
+from dataclasses import asdict
 from pathlib import Path
-from typing import Optional, Generator
-from contextlib import asynccontextmanager
+import asyncio
+import hmac
+from typing import Any, Callable, Dict, Optional, Generator, Iterator
+from contextlib import asynccontextmanager, contextmanager
 
 from fastapi import FastAPI, HTTPException, Query, Request, Depends
-from fastapi.responses import HTMLResponse
+from fastapi.responses import HTMLResponse, PlainTextResponse, Response, StreamingResponse
 from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
+from pydantic import BaseModel
 import sqlite3
 
-from cgpe.storage.sqlite_db import connect_sqlite, sync_schema
-from cgpe.models.detail import Detail
-from cgpe.storage.detail_repo import get_detail_by_link
+from cgpe.config.storage import StorageConfig
+from cgpe.config.web import WebConfig
+from cgpe.logging.logger import init_logging
+from cgpe.storage.sqlite_db import connect_reader, connect_sqlite
+from cgpe.storage.migrations import migrate
+from cgpe.storage.detail_repo import get_detail_by_link, get_details_by_links
 from cgpe.web.services.profit_board import iter_all_details, top_by_profit
+from cgpe.web.services.suggest import SuggestIndex
+from cgpe.web.services.change_feed import ChangeFeed, SubscriberFilter
 from cgpe.storage.queries.web_search import search_card_details
+from cgpe.storage.queries.export import ExportFilters, export_stream
+from cgpe.storage.profiling import PROFILER
+from cgpe.storage.data_version import DataVersionWatcher
+from cgpe.web.cache import ResponseCache, cache_key, etag_matches
+from cgpe.web.responses import COMPRESS_MIN_BYTES, SHAPES, compress, dumps_json, negotiate_encoding, to_columnar
+from cgpe.web.metrics import MetricsMiddleware
+from cgpe.metrics.registry import CONTENT_TYPE as METRICS_CONTENT_TYPE, REGISTRY
 
 BASE_DIR = Path(__file__).resolve().parent
-DB_PATH = "data/cgpe.sqlite3"
+STORAGE = StorageConfig.from_env()
+DB_PATH = STORAGE.db_path
+WEB = WebConfig.from_env()
 
-app = FastAPI(title="CGPE Web")
-app.mount("/static", StaticFiles(directory=BASE_DIR / "static"), name="static")
-templates = Jinja2Templates(directory=str(BASE_DIR / "templates"))
+
+def _change_feed(storage: StorageConfig) -> ChangeFeed:
+    return ChangeFeed(
+        storage,
+        poll_seconds=WEB.change_poll_seconds,
+        queue_size=WEB.sse_queue_size,
+        max_top_k=WEB.sse_max_top_k,
+    )
+
+
+RESPONSE_CACHE = ResponseCache(max_bytes=WEB.response_cache_bytes, max_entries=WEB.response_cache_entries)
+_watcher: Optional[DataVersionWatcher] = None
+SUGGEST_INDEX = SuggestIndex()
+CHANGE_FEED = _change_feed(STORAGE)
+
+
+def configure(storage: StorageConfig) -> None:
+    """
+    Point the app at another database (benchmarks, tools). Call before
+    startup: everything derived from STORAGE is rebuilt, including the
+    migrated DB_PATH, the change feed, the data-version watcher and the
+    caches keyed by its tokens.
+    """
+    global STORAGE, DB_PATH, CHANGE_FEED, RESPONSE_CACHE, SUGGEST_INDEX, _watcher
+    STORAGE = storage
+    DB_PATH = storage.db_path
+    CHANGE_FEED = _change_feed(storage)
+    RESPONSE_CACHE = ResponseCache(max_bytes=WEB.response_cache_bytes, max_entries=WEB.response_cache_entries)
+    SUGGEST_INDEX = SuggestIndex()
+    if _watcher is not None:
+        _watcher.close()
+        _watcher = None
+
+
+SSE_KEEPALIVE_SECONDS = 15.0
+
+# read at scrape time, so they cost nothing between scrapes
+REGISTRY.gauge("cgpe_response_cache_entries", "Entries in the JSON response cache").set_function(
+    lambda: RESPONSE_CACHE.stats()["entries"]
+)
+REGISTRY.gauge("cgpe_response_cache_bytes", "Bytes held by the JSON response cache").set_function(
+    lambda: RESPONSE_CACHE.stats()["bytes"]
+)
+REGISTRY.gauge("cgpe_sse_subscribers", "Connected /api/profit/stream clients").set_function(
+    lambda: CHANGE_FEED.subscriber_count
+)
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     # ---- startup ----
+    init_logging()
     conn = connect_sqlite(DB_PATH)
     try:
-        sync_schema(conn, [Detail])
+        # O(1) when the schema is current; run scripts/migrate_db.py for big upgrades
+        migrate(conn)
     finally:
         conn.close()
 
+    with open_conn() as conn:
+        SUGGEST_INDEX.build(conn, token=data_token())
+
     yield
     # ---- shutdown ----
-    # nothing to clean up (per-request conns)
+    # per-request conns; only the data-version watcher and change feed are long-lived
+    await CHANGE_FEED.close()
+    global _watcher
+    if _watcher is not None:
+        _watcher.close()
+        _watcher = None
 
 
-def get_conn() -> Generator[sqlite3.Connection, None, None]:
-    conn = connect_sqlite(DB_PATH)
+app = FastAPI(title="CGPE Web", lifespan=lifespan)
+app.add_middleware(MetricsMiddleware)
+app.mount("/static", StaticFiles(directory=BASE_DIR / "static"), name="static")
+templates = Jinja2Templates(directory=str(BASE_DIR / "templates"))
+
+
+@contextmanager
+def open_conn() -> Iterator[sqlite3.Connection]:
+    # per-request conns: a freshly published snapshot is picked up by the next request
+    conn = connect_reader(STORAGE)
     try:
         yield conn
     finally:
         conn.close()
 
 
+def get_conn() -> Generator[sqlite3.Connection, None, None]:
+    with open_conn() as conn:
+        yield conn
+
+
+def data_token():
+    global _watcher
+    if _watcher is None:
+        _watcher = DataVersionWatcher(STORAGE)
+    return _watcher.token()
+
+
+def cached_json(
+    request: Request,
+    endpoint: str,
+    params: Dict[str, Any],
+    compute: Callable[[], Any],
+) -> Response:
+    """
+    Serve `compute()` as JSON from RESPONSE_CACHE while the DB is unchanged.
+    `compute` opens its own connection, so cache hits never touch SQLite.
+
+    `params["shape"] == "columns"` switches list payloads to the compact
+    columnar form. Bodies over COMPRESS_MIN_BYTES are br/gzip encoded per
+    Accept-Encoding; each encoded variant is cached with its own ETag.
+    """
+    token = data_token()
+    key = cache_key(endpoint, params)
+
+    entry = RESPONSE_CACHE.get(key, token)
+    if entry is None:
+        payload = compute()
+        if params.get("shape") == "columns":
+            payload = to_columnar(payload)
+        entry = RESPONSE_CACHE.put(key, token, dumps_json(payload))
+
+    encoding = negotiate_encoding(request.headers.get("accept-encoding"))
+    if encoding and len(entry.body) >= COMPRESS_MIN_BYTES:
+        variant_key = cache_key(f"{endpoint}|{encoding}", params)
+        variant = RESPONSE_CACHE.get(variant_key, token)
+        if variant is None:
+            variant = RESPONSE_CACHE.put(
+                variant_key, token, compress(entry.body, encoding),
+                content_encoding=encoding,
+                etag=f'{entry.etag[:-1]}-{encoding}"',
+            )
+        entry = variant
+
+    headers = {"ETag": entry.etag, "Cache-Control": "no-cache", "Vary": "Accept-Encoding"}
+    if etag_matches(request.headers.get("if-none-match"), entry.etag):
+        return Response(status_code=304, headers=headers)
+    if entry.content_encoding:
+        headers["Content-Encoding"] = entry.content_encoding
+    return Response(entry.body, media_type=entry.media_type, headers=headers)
+
+
 @app.get("/", response_class=HTMLResponse)
 def search_page(request: Request):
     return templates.TemplateResponse("search.html", {"request": request})
@@ -53,13 +188,34 @@ def search_page(request: Request):
 
 @app.get("/api/search")
 def search_api(
+    request: Request,
     q: str = Query(...),
     source: Optional[str] = None,
     limit: int = 25,
-    conn: sqlite3.Connection = Depends(get_conn),
+    shape: str = Query("rows", pattern=f"^({'|'.join(SHAPES)})$"),
+):
+    def compute():
+        with open_conn() as conn:
+            rows = search_card_details(conn=conn, q=q, source=source, limit=limit)
+        return {"query": q, "count": len(rows), "rows": rows}
+
+    return cached_json(request, "search", {"q": q, "source": source, "limit": limit, "shape": shape}, compute)
+
+
+@app.get("/api/suggest")
+def suggest_api(
+    q: str = Query(...),
+    source: Optional[str] = None,
+    limit: int = Query(8, ge=1, le=50),
 ):
-    rows = search_card_details(conn=conn, q=q, source=source, limit=limit)
-    return {"query": q, "count": len(rows), "rows": rows}
+    """Keystroke-level typeahead from the in-memory prefix index (no SQL on the hot path)."""
+    token = data_token()
+    if token != SUGGEST_INDEX.token:
+        with open_conn() as conn:
+            SUGGEST_INDEX.refresh(conn, token=token)
+
+    rows = SUGGEST_INDEX.lookup(q, limit=limit, source=source)
+    return {"query": q, "suggestions": [asdict(s) for s in rows]}
 
 
 @app.get("/card", response_class=HTMLResponse)
@@ -80,14 +236,73 @@ def card_page(
 
 @app.get("/api/card")
 def card_api(
+    request: Request,
     link: str = Query(...),
     source: Optional[str] = None,
-    conn: sqlite3.Connection = Depends(get_conn),
 ):
-    card = get_detail_by_link(conn, card_link=link, source=source)
-    if not card:
-        raise HTTPException(404, "Card not found")
-    return card.to_db_row()
+    def compute():
+        with open_conn() as conn:
+            card = get_detail_by_link(conn, card_link=link, source=source)
+        if not card:
+            raise HTTPException(404, "Card not found")
+        return card.to_db_row()
+
+    return cached_json(request, "card", {"link": link, "source": source}, compute)
+
+
+def _cards_response(
+    request: Request,
+    link: list[str],
+    source: Optional[str],
+    cols: Optional[list[str]],
+    max_links: int,
+) -> Response:
+    links = sorted(set(link))
+    if len(links) > max_links:
+        raise HTTPException(400, f"At most {max_links} links per request")
+
+    def compute():
+        with open_conn() as conn:
+            try:
+                cards = get_details_by_links(conn, links, source=source, columns=cols)
+            except ValueError as e:
+                raise HTTPException(400, str(e))
+        return {
+            "count": len(cards),
+            "missing": [l for l in links if l not in cards],
+            "cards": cards,
+        }
+
+    return cached_json(
+        request, "cards",
+        {"link": tuple(links), "source": source, "columns": tuple(cols) if cols else None},
+        compute,
+    )
+
+
+@app.get("/api/cards")
+def cards_api(
+    request: Request,
+    link: list[str] = Query(...),
+    source: Optional[str] = None,
+    columns: Optional[str] = None,
+):
+    """Small batch lookup: `?link=a&link=b[&columns=card_name,ungraded_price]` -> {link: row}."""
+    cols = [c.strip() for c in columns.split(",") if c.strip()] if columns else None
+    return _cards_response(request, link, source, cols, WEB.batch_max_get_links)
+
+
+class CardsQuery(BaseModel):
+    links: list[str]
+    source: Optional[str] = None
+    columns: Optional[list[str]] = None
+
+
+@app.post("/api/cards")
+def cards_batch_api(request: Request, query: CardsQuery):
+    """Large batch lookup: `{"links": [...], "source": ..., "columns": [...]}` -> same body as GET."""
+    cols = [c.strip() for c in query.columns if c.strip()] if query.columns else None
+    return _cards_response(request, query.links, query.source, cols, WEB.batch_max_links)
 
 
 @app.get("/profit", response_class=HTMLResponse)
@@ -97,10 +312,128 @@ def profit_page(request: Request):
 
 @app.get("/api/profit")
 def profit_api(
+    request: Request,
     source: Optional[str] = None,
     limit: int = 100,
-    conn: sqlite3.Connection = Depends(get_conn),
+    shape: str = Query("rows", pattern=f"^({'|'.join(SHAPES)})$"),
 ):
-    scanned, it = iter_all_details(conn, source=source)
-    rows = top_by_profit(it, limit=limit)
-    return {"count": len(rows), "scanned": scanned, "rows": rows}
+    def compute():
+        with open_conn() as conn:
+            scanned, it = iter_all_details(conn, source=source)
+            rows = top_by_profit(it, limit=limit)
+        return {"count": len(rows), "scanned": scanned, "rows": rows}
+
+    return cached_json(request, "profit", {"source": source, "limit": limit, "shape": shape}, compute)
+
+
+@app.get("/api/profit/stream")
+async def profit_stream(
+    request: Request,
+    threshold: Optional[float] = None,
+    top: int = Query(0, ge=0),
+    source: Optional[str] = None,
+):
+    """
+    Server-Sent Events instead of polling /api/profit:
+      event: threshold  expected_profit crossed `threshold` (direction above/below)
+      event: rank       a card entered, left or moved within the top `top`
+      event: top        initial top-K snapshot on connect
+      event: lagged     this client fell behind and `dropped` events were discarded
+    """
+    if threshold is None and not top:
+        raise HTTPException(400, "Pass threshold and/or top")
+
+    sub = await CHANGE_FEED.subscribe(SubscriberFilter(threshold=threshold, top_k=top, source=source))
+
+    async def events():
+        try:
+            for ev in sub.initial:
+                yield ev.encode()
+            while not await request.is_disconnected():
+                try:
+                    ev = await asyncio.wait_for(sub.queue.get(), timeout=SSE_KEEPALIVE_SECONDS)
+                except asyncio.TimeoutError:
+                    yield b": keepalive\n\n"
+                    continue
+                if sub.dropped:
+                    yield f"event: lagged\ndata: {{\"dropped\":{sub.dropped}}}\n\n".encode("utf-8")
+                    sub.dropped = 0
+                yield ev.encode()
+        finally:
+            CHANGE_FEED.unsubscribe(sub)
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@app.get("/api/export")
+def export_api(
+    format: str = "ndjson",
+    columns: Optional[str] = None,
+    source: Optional[str] = None,
+    set_link: Optional[str] = None,
+    min_profit: Optional[float] = None,
+    since: Optional[str] = None,
+    gzip: bool = False,
+):
+    """Full-catalog export, streamed in chunks (constant memory)."""
+    # iterated from threadpool workers, so the conn may hop threads between chunks
+    conn = connect_reader(STORAGE, check_same_thread=False)
+    try:
+        chunks = export_stream(
+            conn,
+            fmt=format,
+            columns=[c.strip() for c in columns.split(",") if c.strip()] if columns else None,
+            filters=ExportFilters(source=source, set_link=set_link, min_profit=min_profit, scraped_since=since),
+            gzip=gzip,
+        )
+    except ValueError as e:
+        conn.close()
+        raise HTTPException(400, str(e))
+
+    def body():
+        try:
+            yield from chunks
+        finally:
+            conn.close()
+
+    filename = f"card_details.{format}" + (".gz" if gzip else "")
+    media_type = "application/gzip" if gzip else ("text/csv" if format == "csv" else "application/x-ndjson")
+    return StreamingResponse(
+        body(),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
+
+@app.get("/metrics")
+def metrics():
+    """Prometheus text exposition of the in-process registry."""
+    return Response(REGISTRY.render(), media_type=METRICS_CONTENT_TYPE)
+
+
+def require_admin(request: Request) -> None:
+    """/admin/* needs `Authorization: Bearer $CGPE_ADMIN_TOKEN`; without a configured token the routes don't exist."""
+    if not WEB.admin_token:
+        raise HTTPException(404)
+    scheme, _, token = request.headers.get("authorization", "").partition(" ")
+    if scheme.lower() != "bearer" or not hmac.compare_digest(token.encode(), WEB.admin_token.encode()):
+        raise HTTPException(401, headers={"WWW-Authenticate": "Bearer"})
+
+
+@app.get("/admin/queries", dependencies=[Depends(require_admin)])
+def admin_queries(format: str = "json", top: int = 20):
+    """Per-statement latency histograms + slow-query log (set CGPE_SQL_PROFILE=1)."""
+    if format == "text":
+        return PlainTextResponse(PROFILER.report_text(top=top))
+    return {**PROFILER.snapshot(), "response_cache": RESPONSE_CACHE.stats()}
+
+
+@app.post("/admin/queries/reset", dependencies=[Depends(require_admin)])
+def admin_queries_reset():
+    """Clear the query histograms and slow-query log (e.g. between load-test phases)."""
+    PROFILER.reset()
+    return {"reset": True}
@@ -0,0 +1,117 @@
+# cgpe/web/cache.py
+
+from __future__ import annotations
+
+import hashlib
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Hashable, Mapping, Optional, Tuple
+
+CacheKey = Tuple[str, Tuple[Tuple[str, str], ...]]
+
+
+def cache_key(endpoint: str, params: Mapping[str, Any]) -> CacheKey:
+    """Order-insensitive key; unset (None) params are dropped so `?source=` and no source collide."""
+    return (endpoint, tuple(sorted((k, str(v)) for k, v in params.items() if v is not None)))
+
+
+def strong_etag(body: bytes) -> str:
+    return '"' + hashlib.blake2b(body, digest_size=16).hexdigest() + '"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    candidates = [t.strip() for t in if_none_match.split(",")]
+    # If-None-Match uses weak comparison (RFC 9110 13.1.2)
+    return "*" in candidates or any(t.removeprefix("W/") == etag for t in candidates)
+
+
+@dataclass
+class CachedResponse:
+    body: bytes
+    etag: str
+    media_type: str
+    content_encoding: Optional[str] = None
+
+
+class ResponseCache:
+    """
+    LRU of rendered response bodies, bounded by entry count and total bytes.
+
+    Every entry belongs to one data generation `token`; the first get/put
+    with a different token drops the whole cache, so nothing computed from
+    older data is ever served.
+    """
+
+    def __init__(self, *, max_bytes: int, max_entries: int) -> None:
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[CacheKey, CachedResponse] = OrderedDict()
+        self._bytes = 0
+        self._token: Hashable = None
+
+        self.hits = 0
+        self.misses = 0
+
+    def _sync_token(self, token: Hashable) -> None:
+        if token != self._token:
+            self._entries.clear()
+            self._bytes = 0
+            self._token = token
+
+    def get(self, key: CacheKey, token: Hashable) -> Optional[CachedResponse]:
+        with self._lock:
+            self._sync_token(token)
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry
+
+    def put(
+        self,
+        key: CacheKey,
+        token: Hashable,
+        body: bytes,
+        media_type: str = "application/json",
+        *,
+        content_encoding: Optional[str] = None,
+        etag: Optional[str] = None,
+    ) -> CachedResponse:
+        entry = CachedResponse(
+            body=body,
+            etag=etag or strong_etag(body),
+            media_type=media_type,
+            content_encoding=content_encoding,
+        )
+        if len(body) > self.max_bytes:
+            return entry
+
+        with self._lock:
+            self._sync_token(token)
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._bytes -= len(old.body)
+
+            self._entries[key] = entry
+            self._bytes += len(body)
+
+            while self._entries and (self._bytes > self.max_bytes or len(self._entries) > self.max_entries):
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= len(evicted.body)
+
+        return entry
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+            }
@@ -0,0 +1,52 @@
+# cgpe/web/metrics.py
+
+from __future__ import annotations
+
+import time
+
+from cgpe.metrics.registry import REGISTRY
+
+WEB_REQUESTS = REGISTRY.counter(
+    "cgpe_web_requests_total", "HTTP requests served", ("route", "method", "status"),
+)
+WEB_SECONDS = REGISTRY.histogram(
+    "cgpe_web_request_seconds", "Request handling time (SSE: stream lifetime)", ("route", "method"),
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0),
+)
+WEB_IN_FLIGHT = REGISTRY.gauge("cgpe_web_in_flight", "Requests being handled")
+
+
+class MetricsMiddleware:
+    """
+    Plain ASGI middleware (no BaseHTTPMiddleware, so streaming responses pass
+    through untouched). Requests are labelled by route template, e.g.
+    "/api/card", never by raw path, to keep label cardinality bounded.
+    """
+
+    def __init__(self, app) -> None:
+        self.app = app
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+
+        async def send_wrapper(message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        t0 = time.perf_counter()
+        WEB_IN_FLIGHT.inc()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            WEB_IN_FLIGHT.dec()
+            # FastAPI puts the matched route into the scope during routing
+            route = getattr(scope.get("route"), "path", None) or "unmatched"
+            method = scope["method"]
+            WEB_SECONDS.labels(route, method).observe(time.perf_counter() - t0)
+            WEB_REQUESTS.labels(route, method, status).inc()
@@ -0,0 +1,85 @@
+# cgpe/web/responses.py
+
+from __future__ import annotations
+
+import gzip
+import json
+from typing import Any, Dict, List, Optional
+
+# optional accelerators from the `web` extra (`uv sync --extra web`, installed in the Docker image)
+try:
+    import orjson
+except ImportError:  # pragma: no cover - depends on environment
+    orjson = None
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - depends on environment
+    brotli = None
+
+# below this, compression costs more than it saves
+COMPRESS_MIN_BYTES = 1024
+
+SHAPES = ("rows", "columns")
+
+
+def dumps_json(payload: Any) -> bytes:
+    """
+    Encode JSON-native payloads (dicts/lists of str, int, float, None) straight
+    to bytes, skipping FastAPI's jsonable_encoder walk.
+    """
+    if orjson is not None:
+        return orjson.dumps(payload)
+    return json.dumps(payload, ensure_ascii=False, allow_nan=False, separators=(",", ":")).encode("utf-8")
+
+
+def to_columnar(payload: Dict[str, Any], *, rows_key: str = "rows") -> Dict[str, Any]:
+    """{"rows": [{a: 1, b: 2}, ...]} -> {"columns": ["a", "b"], "rows": [[1, 2], ...]}"""
+    rows: List[Dict[str, Any]] = payload.get(rows_key) or []
+    columns: List[str] = list(rows[0].keys()) if rows else []
+    return {
+        **payload,
+        "columns": columns,
+        rows_key: [[r.get(c) for c in columns] for r in rows],
+    }
+
+
+def _accepted_codings(accept_encoding: Optional[str]) -> Dict[str, float]:
+    out: Dict[str, float] = {}
+    for part in (accept_encoding or "").split(","):
+        name, _, params = part.strip().partition(";")
+        name = name.strip().lower()
+        if not name:
+            continue
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        out[name] = q
+    return out
+
+
+def negotiate_encoding(accept_encoding: Optional[str]) -> Optional[str]:
+    """Pick br (if available) or gzip from Accept-Encoding; None means identity."""
+    accepted = _accepted_codings(accept_encoding)
+    wildcard = accepted.get("*", 0.0)
+
+    candidates = (["br"] if brotli is not None else []) + ["gzip"]
+    best: Optional[str] = None
+    best_q = 0.0
+    for coding in candidates:
+        q = accepted.get(coding, wildcard)
+        if q > best_q:
+            best, best_q = coding, q
+    return best
+
+
+def compress(body: bytes, encoding: str) -> bytes:
+    if encoding == "br":
+        return brotli.compress(body, quality=5)
+    if encoding == "gzip":
+        return gzip.compress(body, compresslevel=6, mtime=0)
+    raise ValueError(f"Unsupported content-coding: {encoding}")
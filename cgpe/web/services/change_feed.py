@@ -0,0 +1,267 @@
+# cgpe/web/services/change_feed.py
+from __future__ import annotations
+
+import asyncio
+import heapq
+import json
+import sqlite3
+import threading
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from cgpe.config.storage import StorageConfig
+from cgpe.models.change import CardChange
+from cgpe.storage.change_repo import latest_change_seq, read_changes, top_by_expected_profit
+from cgpe.storage.shards import list_shard_paths
+from cgpe.logging.logger import setup_logger
+
+log = setup_logger(__name__)
+
+# changes read per file per poll; a backlog drains over successive polls
+_READ_BATCH = 5000
+
+Board = List[Dict[str, Any]]
+
+
+@dataclass
+class FeedEvent:
+    event: str
+    data: Dict[str, Any]
+
+    def encode(self) -> bytes:
+        return f"event: {self.event}\ndata: {json.dumps(self.data, separators=(',', ':'))}\n\n".encode("utf-8")
+
+
+@dataclass
+class SubscriberFilter:
+    # emit "threshold" events when expected_profit crosses this value (either way)
+    threshold: Optional[float] = None
+    # emit "rank" events when a card enters, leaves or moves within the top K
+    top_k: int = 0
+    source: Optional[str] = None
+
+
+@dataclass(eq=False)
+class Subscriber:
+    filter: SubscriberFilter
+    queue: asyncio.Queue
+    dropped: int = 0
+    initial: List[FeedEvent] = field(default_factory=list)
+
+    def offer(self, event: FeedEvent) -> None:
+        # bounded: a slow client loses its oldest events, never stalls the feed
+        if self.queue.full():
+            self.queue.get_nowait()
+            self.dropped += 1
+        self.queue.put_nowait(event)
+
+
+def _card_key(row: Dict[str, Any]) -> Tuple[str, Optional[str]]:
+    return row["card_link"], row["source"]
+
+
+def threshold_event(change: CardChange, threshold: float) -> Optional[FeedEvent]:
+    old_above = change.old_profit is not None and change.old_profit >= threshold
+    new_above = change.new_profit is not None and change.new_profit >= threshold
+    if old_above == new_above:
+        return None
+    return FeedEvent(
+        "threshold",
+        {
+            "direction": "above" if new_above else "below",
+            "threshold": threshold,
+            "card_link": change.card_link,
+            "source": change.source,
+            "card_name": change.card_name,
+            "card_num": change.card_num,
+            "old_profit": change.old_profit,
+            "new_profit": change.new_profit,
+            "expected_value": change.expected_value,
+            "changed_at": change.changed_at,
+        },
+    )
+
+
+def rank_events(old: Board, new: Board, k: int) -> List[FeedEvent]:
+    old_ranks = {_card_key(r): i + 1 for i, r in enumerate(old[:k])}
+    new_ranks = {_card_key(r): i + 1 for i, r in enumerate(new[:k])}
+
+    events = []
+    for row in new[:k]:
+        key = _card_key(row)
+        if old_ranks.get(key) != new_ranks[key]:
+            events.append(FeedEvent("rank", {**row, "old_rank": old_ranks.get(key), "new_rank": new_ranks[key]}))
+    for row in old[:k]:
+        if _card_key(row) not in new_ranks:
+            events.append(FeedEvent("rank", {**row, "old_rank": old_ranks[_card_key(row)], "new_rank": None}))
+    return events
+
+
+class ChangeFeed:
+    """
+    Tails the `card_changes` table of every live DB file (the single DB, or
+    each shard) and fans events out to SSE subscribers.
+
+    Triggers on card_details fill card_changes from whichever process
+    writes, so the web tier sees scraper updates without any IPC. One
+    background task polls while anyone is subscribed; each subscriber has
+    its own filter and bounded queue.
+    """
+
+    def __init__(
+        self,
+        storage: StorageConfig,
+        *,
+        poll_seconds: float = 0.5,
+        queue_size: int = 256,
+        max_top_k: int = 100,
+    ) -> None:
+        self.storage = storage
+        self.poll_seconds = poll_seconds
+        self.queue_size = queue_size
+        self.max_top_k = max_top_k
+
+        self._db_lock = threading.Lock()
+        self._conns: Dict[Path, sqlite3.Connection] = {}
+        self._cursors: Dict[Path, int] = {}
+        self._boards: Dict[Optional[str], Board] = {}
+
+        self._subscribers: Set[Subscriber] = set()
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def subscriber_count(self) -> int:
+        return len(self._subscribers)
+
+    # ---- blocking DB side (runs in worker threads) ----
+
+    def _live_files(self) -> List[Path]:
+        if self.storage.sharded:
+            return list_shard_paths(self.storage)
+        path = Path(self.storage.db_path)
+        return [path] if path.exists() else []
+
+    def _conn(self, path: Path) -> sqlite3.Connection:
+        conn = self._conns.get(path)
+        if conn is None:
+            # the live file, not the snapshot: changes must show up as they commit
+            conn = sqlite3.connect(f"{path.resolve().as_uri()}?mode=ro", uri=True, check_same_thread=False)
+            self._conns[path] = conn
+        return conn
+
+    def _board(self, source: Optional[str]) -> Board:
+        per_file = []
+        for path in self._live_files():
+            try:
+                per_file.append(top_by_expected_profit(self._conn(path), limit=self.max_top_k, source=source))
+            except sqlite3.OperationalError:
+                continue
+        merged = heapq.merge(*per_file, key=lambda r: r["expected_profit"], reverse=True)
+        return list(merged)[: self.max_top_k]
+
+    def _prime(self, source: Optional[str], want_board: bool, reset: bool) -> Board:
+        with self._db_lock:
+            if reset:
+                # feed was idle: start from "now" rather than replaying what nobody saw
+                self._cursors.clear()
+                self._boards.clear()
+            for path in self._live_files():
+                if path not in self._cursors:
+                    try:
+                        self._cursors[path] = latest_change_seq(self._conn(path))
+                    except sqlite3.OperationalError:
+                        continue  # not migrated yet; picked up on a later poll
+            if want_board and source not in self._boards:
+                self._boards[source] = self._board(source)
+            return list(self._boards.get(source, []))
+
+    def _poll(self, sources: Set[Optional[str]]) -> Tuple[List[CardChange], Dict[Optional[str], Tuple[Board, Board]]]:
+        changes: List[CardChange] = []
+        with self._db_lock:
+            for path in self._live_files():
+                try:
+                    batch = read_changes(self._conn(path), after_seq=self._cursors.get(path, 0), limit=_READ_BATCH)
+                except sqlite3.OperationalError:
+                    continue
+                if batch:
+                    self._cursors[path] = batch[-1].seq
+                    changes.extend(batch)
+
+            boards: Dict[Optional[str], Tuple[Board, Board]] = {}
+            for source in sources:
+                if source not in self._boards:
+                    self._boards[source] = self._board(source)
+                elif changes:
+                    old, new = self._boards[source], self._board(source)
+                    self._boards[source] = new
+                    boards[source] = (old, new)
+
+        changes.sort(key=lambda c: c.changed_at)
+        return changes, boards
+
+    # ---- event loop side ----
+
+    async def subscribe(self, filt: SubscriberFilter) -> Subscriber:
+        top_k = min(max(filt.top_k, 0), self.max_top_k)
+        filt = SubscriberFilter(threshold=filt.threshold, top_k=top_k, source=filt.source)
+
+        idle = self._task is None or self._task.done()
+        board = await asyncio.to_thread(self._prime, filt.source, top_k > 0, idle)
+
+        sub = Subscriber(filter=filt, queue=asyncio.Queue(maxsize=self.queue_size))
+        if top_k:
+            sub.initial.append(FeedEvent("top", {"top_k": top_k, "rows": board[:top_k]}))
+        self._subscribers.add(sub)
+
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+        return sub
+
+    def unsubscribe(self, sub: Subscriber) -> None:
+        self._subscribers.discard(sub)
+
+    async def _run(self) -> None:
+        log.info("Change feed started (%d subscriber(s))", len(self._subscribers))
+        while self._subscribers:
+            sources = {s.filter.source for s in self._subscribers if s.filter.top_k}
+            try:
+                changes, boards = await asyncio.to_thread(self._poll, sources)
+            except Exception:
+                log.exception("Change feed poll failed")
+                changes, boards = [], {}
+
+            if changes:
+                self._dispatch(changes, boards)
+            await asyncio.sleep(self.poll_seconds)
+        log.info("Change feed stopped")
+
+    def _dispatch(self, changes: List[CardChange], boards: Dict[Optional[str], Tuple[Board, Board]]) -> None:
+        for sub in list(self._subscribers):
+            f = sub.filter
+            if f.threshold is not None:
+                for c in changes:
+                    if f.source is not None and c.source != f.source:
+                        continue
+                    ev = threshold_event(c, f.threshold)
+                    if ev is not None:
+                        sub.offer(ev)
+
+            if f.top_k and f.source in boards:
+                old, new = boards[f.source]
+                for ev in rank_events(old, new, f.top_k):
+                    sub.offer(ev)
+
+    async def close(self) -> None:
+        self._subscribers.clear()
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        with self._db_lock:
+            for conn in self._conns.values():
+                conn.close()
+            self._conns.clear()
@@ -0,0 +1,295 @@
+# cgpe/web/services/suggest.py
+from __future__ import annotations
+
+import heapq
+import re
+import sqlite3
+import threading
+from bisect import bisect_left, insort
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Dict, Hashable, Iterable, List, Optional, Tuple
+
+from cgpe.logging.logger import setup_logger
+
+log = setup_logger(__name__)
+
+_WS_RE = re.compile(r"\s+")
+
+# prefixes matching more keys than this get their top-K precomputed;
+# anything narrower is scanned exactly at lookup time
+HEAVY_PREFIX_KEYS = 256
+HEAVY_PREFIX_TOP_K = 50
+
+# incremental refresh inserts one key at a time; past this, a rebuild is cheaper
+REBUILD_THRESHOLD = 5000
+
+# parsed_at is stamped before the write commits, and shard writers and
+# re-parse batches commit concurrently, so a row can land with a stamp below
+# the watermark; every refresh re-reads this far back (unchanged rows are skipped)
+REFRESH_LAG_SECONDS = 300
+
+_KEY_END = "\U0010ffff"
+
+_SELECT = """
+    SELECT card_link, source, card_name, card_num, card_img_link,
+           COALESCE(expected_value, ungraded_price, 0) AS weight,
+           parsed_at
+    FROM card_details
+"""
+
+
+def _behind(watermark: str, seconds: float) -> str:
+    if not watermark:
+        return ""
+    try:
+        t = datetime.fromisoformat(watermark)
+    except ValueError:
+        return ""
+    return (t - timedelta(seconds=seconds)).isoformat(timespec="microseconds")
+
+
+def normalize_key(s: str) -> str:
+    return _WS_RE.sub(" ", (s or "").lower().replace("#", " ")).strip()
+
+
+@dataclass
+class Suggestion:
+    card_link: str
+    source: Optional[str]
+    card_name: str
+    card_num: str
+    card_img_link: Optional[str]
+    weight: float
+
+
+def _keys_for(s: Suggestion) -> List[str]:
+    """Full name, every later word of the name ("ex", "vmax"), the card number (with and without set size), and name + number."""
+    name = normalize_key(s.card_name)
+    words = name.split(" ")
+    keys = {name, *(" ".join(words[i:]) for i in range(1, len(words)))}
+
+    num = normalize_key(s.card_num).replace(" ", "")
+    if num:
+        keys.add(num)
+        keys.add(num.split("/", 1)[0].lstrip("0") or "0")
+        keys.add(f"{name} {num}")
+
+    return [k for k in keys if k]
+
+
+class _SourceKeys:
+    """
+    One source's keys: a sorted list of (key, card_id) tuples, so every prefix
+    is a contiguous range found with two bisects, plus the precomputed top-K
+    of its heavy prefixes.
+    """
+
+    def __init__(self, cards: List[Suggestion], keys: List[Tuple[str, int]]) -> None:
+        self.cards = cards
+        self.keys = keys
+        self.top: Dict[str, List[int]] = {}
+
+    def range(self, prefix: str) -> Tuple[int, int]:
+        lo = bisect_left(self.keys, (prefix, -1))
+        hi = bisect_left(self.keys, (prefix + _KEY_END, -1), lo)
+        return lo, hi
+
+    def top_of(self, lo: int, hi: int, k: int) -> List[int]:
+        cards = self.cards
+        ids = {cid for _, cid in self.keys[lo:hi]}
+        return heapq.nlargest(k, ids, key=lambda i: cards[i].weight)
+
+    def rebuild_top(self, prefixes: Optional[Iterable[str]] = None) -> None:
+        """Recompute top-K for heavy prefixes (all of them, or just the ones given)."""
+        if prefixes is not None:
+            for p in set(prefixes):
+                lo, hi = self.range(p)
+                if hi - lo > HEAVY_PREFIX_KEYS:
+                    self.top[p] = self.top_of(lo, hi, HEAVY_PREFIX_TOP_K)
+                else:
+                    self.top.pop(p, None)
+            return
+
+        self.top = {}
+        self._heavy_top("", 0, len(self.keys))
+
+    def _heavy_top(self, p: str, lo: int, hi: int) -> List[int]:
+        """
+        Post-order walk of the heavy part of the implicit trie: a prefix's
+        top-K is merged from its heavy children's top-K plus the ids of its
+        light children, so each key is ranked roughly once per build.
+        """
+        cards = self.cards
+        keys = self.keys
+        n = len(p)
+        ids: set[int] = set()
+
+        i = lo
+        while i < hi:
+            key = keys[i][0]
+            if len(key) <= n:
+                ids.add(keys[i][1])
+                i += 1
+                continue
+            child = key[: n + 1]
+            c_hi = bisect_left(keys, (child + _KEY_END, -1), i, hi)
+            if c_hi - i > HEAVY_PREFIX_KEYS:
+                ids.update(self._heavy_top(child, i, c_hi))
+            else:
+                ids.update(cid for _, cid in keys[i:c_hi])
+            i = c_hi
+
+        top = heapq.nlargest(HEAVY_PREFIX_TOP_K, ids, key=lambda j: cards[j].weight)
+        if p:
+            self.top[p] = top
+        return top
+
+    def lookup(self, prefix: str, limit: int) -> List[int]:
+        top = self.top.get(prefix)
+        if top is not None and limit <= HEAVY_PREFIX_TOP_K:
+            return top[:limit]
+        # narrow prefix (at most HEAVY_PREFIX_KEYS keys), or a limit past the precomputed K
+        lo, hi = self.range(prefix)
+        return self.top_of(lo, hi, limit)
+
+
+class SuggestIndex:
+    """
+    In-memory prefix index over card names and numbers, one key list per
+    source. Broad prefixes ("c", "char") have their top cards by value
+    precomputed; narrow ones are ranked on the fly. A source filter reads
+    only that source's keys; an unfiltered lookup merges each source's best.
+
+    Built at startup and refreshed incrementally from `parsed_at` whenever
+    the data token changes, re-reading REFRESH_LAG_SECONDS behind the
+    watermark for rows that committed late; a refresh that finds fewer rows
+    in the DB than cards in the index (something was deleted) rebuilds instead.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._cards: List[Suggestion] = []
+        self._ids: Dict[Tuple[str, Optional[str]], int] = {}
+        self._sources: Dict[Optional[str], _SourceKeys] = {}
+        self._watermark: str = ""
+        self.token: Hashable = None
+
+    def __len__(self) -> int:
+        return len(self._cards)
+
+    # ---- build / refresh ----
+
+    def build(self, conn: sqlite3.Connection, *, token: Hashable = None) -> None:
+        cards: List[Suggestion] = []
+        ids: Dict[Tuple[str, Optional[str]], int] = {}
+        keys: Dict[Optional[str], List[Tuple[str, int]]] = {}
+        watermark = ""
+
+        for r in conn.execute(_SELECT):
+            s = Suggestion(r[0], r[1], r[2] or "", r[3] or "", r[4], float(r[5] or 0))
+            cid = len(cards)
+            cards.append(s)
+            ids[(s.card_link, s.source)] = cid
+            keys.setdefault(s.source, []).extend((k, cid) for k in _keys_for(s))
+            watermark = max(watermark, r[6] or "")
+
+        sources: Dict[Optional[str], _SourceKeys] = {}
+        for source, source_keys in keys.items():
+            source_keys.sort()
+            sources[source] = _SourceKeys(cards, source_keys)
+            sources[source].rebuild_top()
+
+        with self._lock:
+            self._cards, self._ids, self._sources = cards, ids, sources
+            self._watermark = watermark
+            self.token = token
+
+        log.info(
+            "Suggest index built: %d cards, %d keys over %d sources",
+            len(cards), sum(len(k) for k in keys.values()), len(sources),
+        )
+
+    def refresh(self, conn: sqlite3.Connection, *, token: Hashable = None) -> int:
+        """Apply rows (re)parsed since the last build/refresh. Returns the number of cards touched."""
+        rows = conn.execute(
+            _SELECT + " WHERE parsed_at > ? ORDER BY parsed_at",
+            (_behind(self._watermark, REFRESH_LAG_SECONDS),),
+        ).fetchall()
+        stored = conn.execute("SELECT COUNT(*) FROM card_details").fetchone()[0]
+
+        with self._lock:
+            # the lag window re-reads rows already applied; keep only real changes
+            fresh: List[Suggestion] = []
+            for r in rows:
+                s = Suggestion(r[0], r[1], r[2] or "", r[3] or "", r[4], float(r[5] or 0))
+                cid = self._ids.get((s.card_link, s.source))
+                if cid is None or self._cards[cid] != s:
+                    fresh.append(s)
+            watermark = max([self._watermark, *(r[6] or "" for r in rows)])
+
+            # the index only ever gains cards, so once the new ones are in it
+            # holds every live row; any surplus was deleted from the DB
+            added = len({(s.card_link, s.source) for s in fresh} - self._ids.keys())
+            rebuild = len(fresh) > REBUILD_THRESHOLD or stored != len(self._cards) + added
+            if not rebuild:
+                self._apply(fresh)
+                self._watermark = watermark
+                self.token = token
+
+        if rebuild:
+            self.build(conn, token=token)
+        elif fresh:
+            log.info("Suggest index refreshed: %d cards", len(fresh))
+        return len(fresh)
+
+    def _apply(self, cards: List[Suggestion]) -> None:
+        """Insert or update cards in place (caller holds the lock)."""
+        touched: Dict[Optional[str], set[str]] = {}
+        for s in cards:
+            index = self._sources.get(s.source)
+            if index is None:
+                index = self._sources[s.source] = _SourceKeys(self._cards, [])
+            prefixes = touched.setdefault(s.source, set())
+
+            cid = self._ids.get((s.card_link, s.source))
+            if cid is None:
+                cid = len(self._cards)
+                self._cards.append(s)
+                self._ids[(s.card_link, s.source)] = cid
+                new_keys = _keys_for(s)
+            else:
+                old_keys = set(_keys_for(self._cards[cid]))
+                self._cards[cid] = s
+                new_keys = [k for k in _keys_for(s) if k not in old_keys]
+                # a changed weight re-ranks every prefix the card is under
+                prefixes.update(k[:n] for k in old_keys for n in range(1, len(k) + 1))
+                for k in old_keys - set(_keys_for(s)):
+                    i = bisect_left(index.keys, (k, cid))
+                    if i < len(index.keys) and index.keys[i] == (k, cid):
+                        del index.keys[i]
+
+            for k in new_keys:
+                insort(index.keys, (k, cid))
+                prefixes.update(k[:n] for n in range(1, len(k) + 1))
+
+        for source, prefixes in touched.items():
+            if prefixes:
+                self._sources[source].rebuild_top(prefixes)
+
+    # ---- lookup ----
+
+    def lookup(self, q: str, *, limit: int = 8, source: Optional[str] = None) -> List[Suggestion]:
+        prefix = normalize_key(q)
+        if not prefix:
+            return []
+
+        with self._lock:
+            if source is not None:
+                index = self._sources.get(source)
+                best = index.lookup(prefix, limit) if index is not None else []
+            else:
+                # every source's own best `limit` contains its share of the overall best
+                hits = [cid for index in self._sources.values() for cid in index.lookup(prefix, limit)]
+                best = heapq.nlargest(limit, hits, key=lambda i: self._cards[i].weight)
+            return [self._cards[i] for i in best]